@@ -3,23 +3,75 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set
+import ast
+import json
 import logging
 import os
+import threading
 
-import pandas as pd
 from flask import Flask, jsonify, render_template, request, session, redirect, url_for
 from dotenv import load_dotenv
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
 
-from data_loading import charger_films_prepares
-from emotion_detection import detecter_emotion_image, image_base64_to_bytes
-from recommendation import rechercher_par_titre, recommander_par_emotion
+# Streaming de la webcam par WebSocket (optionnel) : sans flask-sock, le front interroge /api/face-quality
+try:
+    from flask_sock import Sock
+except ImportError:
+    Sock = None
+
+from catalogue import Catalogue
+from data_loading import charger_films_enrichis, charger_films_prepares, films_enrichis_depuis_dataframe
+from detection_visage import metriques_detecteurs, prechauffer_detecteurs
+from emotion_detection import (
+    DEEPFACE_AVAILABLE,
+    SuiviVisage,
+    analyser_qualite_visage,
+    detecter_emotion_image,
+    image_base64_to_bytes,
+    prechauffer_classifieur_emotions,
+)
+from inference_emotions import (
+    INFERENCE_EMOTIONS_WORKERS,
+    FileInferencePleine,
+    ServiceInferenceEmotions,
+    ServiceInferenceIndisponible,
+)
+from recommendation import (
+    TableEmotions,
+    construire_index_genres,
+    construire_table_emotions,
+    rechercher_par_titre,
+)
+from recherche_semantique import IndexSemantique
+from recherche_titres import NB_SUGGESTIONS, IndexTitres
+from similarite import MoteurSimilarite
+from snapshot_catalogue import DOSSIER_SNAPSHOT, charger_snapshot
 from sentiment import ajouter_sentiment_aux_films
 from sound_manager import add_sound_to_film, get_emotion_sound
-from tmdb_api import enrichir_film_avec_api, enrichir_liste_films
-from cache_manager import get_cached_films, cache_films
+from tmdb_api import (
+    TRADUCTION_EN_LIGNE,
+    enrichir_film_tmdb,
+    enrichir_film_sans_doublon,
+    enrichir_liste_films,
+    executeur_tmdb,
+    traduire_textes,
+)
+from cache_manager import (
+    annoncer_enrichissements,
+    IMAGE_PAR_DEFAUT,
+    cache_film,
+    definir_rafraichissement,
+    enrichir_coordonne,
+    enrichissements_annonces,
+    get_cached_film,
+    get_cached_films,
+    load_cache,
+    save_cache,
+    statistiques_cache,
+    terminer_enrichissement,
+)
 
 # Charger les variables d'environnement depuis .env
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -33,6 +85,8 @@ DATASET_TMBD = BASE_DIR / "dataset" / "tmdb_5000_movies.csv"
 # Configuration Hugging Face (depuis .env)
 HF_REPO_NAME = os.getenv("HF_DATASET_REPO", "Gkop/moviemood-dataset")
 USE_HUGGINGFACE = os.getenv("USE_HF", "true").lower() == "true"  # Par défaut activé pour alléger le projet
+# /search affiche les résultats tout de suite et enrichit les films non en cache en arrière-plan
+ENRICHISSEMENT_PROGRESSIF = os.getenv("ENRICHISSEMENT_PROGRESSIF", "true").lower() == "true"
 
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
 logging.basicConfig(
@@ -45,6 +99,7 @@ app = Flask(__name__)
 # Clé secrète pour les sessions (à surcharger en prod via variable d'environnement)
 app.secret_key = os.getenv("SECRET_KEY", "dev-secret-key-change-me")
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max pour les uploads
+sock = Sock(app) if Sock is not None else None
 
 # ===== Configuration base de données (SQLite simple) =====
 DB_PATH = BASE_DIR / "data" / "users.db"
@@ -87,17 +142,7 @@ def _charger_depuis_huggingface() -> Optional[List[Dict]]:
         
         # Charger depuis Hugging Face
         dataset = load_dataset(HF_REPO_NAME, split="train")
-        df = dataset.to_pandas()
-        films = df.to_dict(orient="records")
-        
-        # Convertir les genres de string en liste si nécessaire
-        for film in films:
-            if isinstance(film.get("genres"), str):
-                try:
-                    import ast
-                    film["genres"] = ast.literal_eval(film["genres"])
-                except Exception:
-                    film["genres"] = []
+        films = films_enrichis_depuis_dataframe(dataset.to_pandas())
         
         logger.info(f"✅ {len(films)} films chargés depuis Hugging Face")
         return films
@@ -120,32 +165,14 @@ def _charger_catalogue() -> List[Dict]:
     if DATA_ENRICHED_COMPLETE.exists():
         logger.info(f"📥 Fallback: Chargement depuis fichier local: {DATA_ENRICHED_COMPLETE}")
         logger.info("   💡 Pour alléger le projet, utilisez Hugging Face (configurez .env)")
-        df = pd.read_csv(DATA_ENRICHED_COMPLETE)
-        films = df.to_dict(orient="records")
-        # Convertir les genres de string en liste si nécessaire
-        for film in films:
-            if isinstance(film.get("genres"), str):
-                try:
-                    import ast
-                    film["genres"] = ast.literal_eval(film["genres"])
-                except Exception:
-                    film["genres"] = []
+        films = charger_films_enrichis(str(DATA_ENRICHED_COMPLETE))
         logger.info(f"✅ {len(films)} films chargés depuis fichier local enrichi")
         return films
     
     # 3. Si cache enrichi partiel existe, l'utiliser
     if DATA_ENRICHED.exists():
         logger.info(f"📥 Chargement depuis cache partiel: {DATA_ENRICHED}")
-        df = pd.read_csv(DATA_ENRICHED)
-        films = df.to_dict(orient="records")
-        # Convertir les genres de string en liste si nécessaire
-        for film in films:
-            if isinstance(film.get("genres"), str):
-                try:
-                    import ast
-                    film["genres"] = ast.literal_eval(film["genres"])
-                except Exception:
-                    film["genres"] = []
+        films = charger_films_enrichis(str(DATA_ENRICHED))
         logger.info(f"✅ {len(films)} films chargés depuis cache partiel")
         return films
 
@@ -159,9 +186,9 @@ def _charger_catalogue() -> List[Dict]:
         title = film.get("title", "Film") or "Film"
         # Coerce poster/backdrop à une chaîne non vide si absent
         if not film.get("poster_url"):
-            film["poster_url"] = f"https://via.placeholder.com/500x750?text={title[:20].replace(' ', '+')}"
+            film["poster_url"] = f"{IMAGE_PAR_DEFAUT}500x750?text={title[:20].replace(' ', '+')}"
         if not film.get("backdrop_url"):
-            film["backdrop_url"] = f"https://via.placeholder.com/1280x720?text={title[:30].replace(' ', '+')}"
+            film["backdrop_url"] = f"{IMAGE_PAR_DEFAUT}1280x720?text={title[:30].replace(' ', '+')}"
         if not film.get("streaming_links"):
             film["streaming_links"] = []
         add_sound_to_film(film)
@@ -185,6 +212,15 @@ def _dedupe_films(films: List[Dict]) -> List[Dict]:
     return uniques
 
 
+def _annee_sortie(film: Dict) -> Optional[int]:
+    """Retourne l'année de sortie en int (les CSV la chargent en float, NaN si absente)."""
+    annee = film.get("release_year")
+    try:
+        return int(annee)
+    except (TypeError, ValueError):
+        return None
+
+
 def _enrichir_films(films: List[Dict]) -> List[Dict]:
     """Enrichit les films avec API TMDB et sons (avec cache pour optimiser les performances)."""
     if not films:
@@ -195,20 +231,12 @@ def _enrichir_films(films: List[Dict]) -> List[Dict]:
     
     logger.info(f"📦 {len(films_cached)} films depuis le cache, {len(films_to_enrich)} à enrichir")
     
-    # Enrichir uniquement les films qui ne sont pas en cache
+    # Enrichir uniquement les films qui ne sont pas en cache (appels TMDB en parallèle)
     if films_to_enrich:
         try:
-            films_enriched_new = []
-            for film in films_to_enrich:
-                try:
-                    film_enriched = enrichir_film_avec_api(film)
-                    films_enriched_new.append(film_enriched)
-                except Exception as e:
-                    logger.warning(f"⚠️ Erreur enrichissement film {film.get('id')}: {e}")
-                    films_enriched_new.append(film)
-            
-            # Mettre en cache les nouveaux films enrichis
-            cache_films(films_enriched_new)
+            # Les films enrichis avec succès sont mis en cache par enrichir_coordonne ;
+            # ceux dont l'appel TMDB a échoué sont retournés tels quels, sans être mis en cache
+            films_enriched_new = enrichir_liste_films(films_to_enrich, enrichir=_enrichir_film_partage)
             
             # Combiner avec les films en cache
             films = films_cached + films_enriched_new
@@ -218,45 +246,303 @@ def _enrichir_films(films: List[Dict]) -> List[Dict]:
     else:
         films = films_cached
     
+    # Résumés manquants : lus en une fois dans le cache des traductions
+    _traduire_resumes(films, en_ligne=TRADUCTION_EN_LIGNE)
+    
     # Ajouter fallbacks pour posters/backdrops/trailers si manquants
     for film in films:
-        # Si pas de poster_url, utiliser une image par défaut
-        if not film.get("poster_url"):
-            film["poster_url"] = f"https://via.placeholder.com/500x750?text={film.get('title', 'Film')[:20]}"
-        
-        # Si pas de backdrop_url, utiliser backdrop par défaut
-        if not film.get("backdrop_url"):
-            film["backdrop_url"] = f"https://via.placeholder.com/1280x720?text={film.get('title', 'Film')[:20]}"
-        
-        # Si pas de overview_fr, utiliser overview EN ET traduire si nécessaire
-        if not film.get("overview_fr") or film.get("overview_fr") == "Pas de description disponible.":
-            overview = film.get("overview", "Pas de description disponible.")
-            if overview and len(overview) > 10:
-                # Essayer traduction rapide côté serveur (synchrone)
-                from tmdb_api import traduire_texte_avec_google_translate
-                film["overview_fr"] = traduire_texte_avec_google_translate(overview, "en", "fr")
-            else:
-                film["overview_fr"] = overview
-        
-        # Si pas de trailer_url, laisser vide (pas de fallback pour video)
-        if not film.get("trailer_url"):
-            film["trailer_url"] = None
-        
-        # Si pas de streaming_links, créer liste vide
-        if not film.get("streaming_links"):
-            film["streaming_links"] = []
-        
-        add_sound_to_film(film)
+        _completer_film(film)
     
     return films
 
 
-# Charger le catalogue avec message de progression
-logger.info("🚀 Initialisation de l'application...")
-logger.info("📥 Chargement du catalogue de films (cela peut prendre quelques secondes)...")
-catalogue_films = _charger_catalogue()
-logger.info(f"✅ Catalogue chargé : {len(catalogue_films)} films disponibles")
-logger.info("🌐 Application prête à recevoir les requêtes")
+def _resume_a_traduire(film: Dict) -> bool:
+    """True si le film n'a pas encore de résumé en français (absent, texte par défaut ou resté identique à overview).
+
+    Mêmes règles que `resumes_a_traduire` de scripts/utils/traduire_resumes.py.
+    """
+    overview_fr = film.get("overview_fr")
+    return (
+        not overview_fr
+        or overview_fr == "Pas de description disponible."
+        or overview_fr == film.get("overview")
+    )
+
+
+def _traduire_resumes(films: List[Dict], en_ligne: bool) -> None:
+    """Renseigne overview_fr des films qui n'en ont pas, en un seul appel à `traduire_textes`.
+
+    Sans `en_ligne`, simple lecture du cache des traductions (rempli hors ligne par
+    scripts/utils/traduire_resumes.py) ; un film sans traduction connue reste à traduire.
+    """
+    films_a_traduire = [
+        film for film in films
+        if _resume_a_traduire(film) and len(film.get("overview") or "") > 10
+    ]
+    if not films_a_traduire:
+        return
+    traductions = traduire_textes([film["overview"] for film in films_a_traduire], "en", "fr", en_ligne=en_ligne)
+    for film, traduction in zip(films_a_traduire, traductions):
+        if traduction != film["overview"]:
+            film["overview_fr"] = traduction
+
+
+def _completer_film(film: Dict, traduire: bool = True) -> Dict:
+    """Ajoute les valeurs par défaut d'affichage (images, résumé FR, son) à un film.
+
+    Le résumé FR doit avoir été cherché avant (`_traduire_resumes`). À défaut, le
+    résumé anglais en tient lieu ; sans `traduire`, overview_fr reste vide (le gabarit
+    affiche alors le résumé anglais) et le film reste à traduire.
+    """
+    # Si pas de poster_url, utiliser une image par défaut
+    if not film.get("poster_url"):
+        film["poster_url"] = f"{IMAGE_PAR_DEFAUT}500x750?text={film.get('title', 'Film')[:20]}"
+    
+    # Si pas de backdrop_url, utiliser backdrop par défaut
+    if not film.get("backdrop_url"):
+        film["backdrop_url"] = f"{IMAGE_PAR_DEFAUT}1280x720?text={film.get('title', 'Film')[:20]}"
+    
+    # Si pas de overview_fr, utiliser overview EN
+    if traduire and _resume_a_traduire(film):
+        film["overview_fr"] = film.get("overview", "Pas de description disponible.")
+    
+    # Si pas de trailer_url, laisser vide (pas de fallback pour video)
+    if not film.get("trailer_url"):
+        film["trailer_url"] = None
+    
+    # Liens de streaming : liste (les CSV la stockent sous forme de chaîne "[{...}]")
+    liens = film.get("streaming_links")
+    if isinstance(liens, str):
+        try:
+            liens = ast.literal_eval(liens)
+        except (ValueError, SyntaxError):
+            liens = []
+    film["streaming_links"] = liens if isinstance(liens, list) else []
+    
+    add_sound_to_film(film)
+    return film
+
+
+# Champs mis à jour côté navigateur quand l'enrichissement en arrière-plan se termine
+CHAMPS_ENRICHIS = (
+    "poster_url", "backdrop_url", "trailer_url", "overview_fr",
+    "runtime", "streaming_links", "theme_sound",
+)
+
+# Films dont l'enrichissement en arrière-plan a été lancé par ce processus ; les autres
+# processus les voient dans la table des attentes du cache partagé
+_enrichissements_en_cours: Set[int] = set()
+_verrou_enrichissements = threading.Lock()
+
+
+def _enrichir_film_partage(film: Dict) -> Dict:
+    """Enrichit un film via TMDB, un seul appel à la fois par film.
+
+    Dans ce processus, les requêtes concurrentes partagent le résultat ; entre
+    processus, le bail du cache partagé désigne celui qui appelle TMDB.
+    Lève EchecEnrichissement si TMDB n'a pas répondu (rien n'est alors mis en cache).
+    """
+    return enrichir_film_sans_doublon(film, lambda f: enrichir_coordonne(f, enrichir_film_tmdb))
+
+
+def _enrichir_et_completer(film: Dict, depuis_api: bool) -> Dict:
+    """Tâche d'arrière-plan : enrichit un film (TMDB si absent du cache ou périmé), le met en cache et le complète.
+
+    Si l'appel TMDB échoue, rien n'est mis en cache : l'entrée existante garde sa date.
+    Une simple traduction du résumé ne rafraîchit pas non plus la date de l'entrée.
+    Le film est mis en cache avant `_completer_film` : les valeurs de repli d'affichage
+    (images par défaut, résumé anglais) ne doivent pas masquer le catalogue aux requêtes suivantes.
+    """
+    if depuis_api:
+        try:
+            film = _enrichir_film_partage(film)
+        except Exception as e:
+            logger.warning(f"⚠️ Erreur enrichissement film {film.get('id')}: {e}")
+            return _completer_film(film)
+    _traduire_resumes([film], en_ligne=TRADUCTION_EN_LIGNE)
+    cache_film(film, conserver_date=not depuis_api)
+    return _completer_film(dict(film))
+
+
+def _lancer_enrichissements(films: List[tuple]) -> None:
+    """Soumet les (film, depuis_api) au pool TMDB ; un film déjà en cours n'est pas resoumis.
+
+    Les films sont annoncés dans le cache partagé avant d'être soumis : /api/enrichissement
+    les signale en attente quel que soit le worker qui reçoit la requête. Chaque film est
+    écrit dans la base avant d'être retiré des attentes.
+    """
+    a_soumettre = []
+    with _verrou_enrichissements:
+        for film, depuis_api in films:
+            film_id = int(film["id"])
+            if film_id in _enrichissements_en_cours:
+                continue
+            _enrichissements_en_cours.add(film_id)
+            a_soumettre.append((film_id, film, depuis_api))
+
+    if not a_soumettre:
+        return
+    annoncer_enrichissements([film_id for film_id, _, _ in a_soumettre])
+
+    def terminer(film_id: int) -> None:
+        save_cache()
+        terminer_enrichissement(film_id)
+        with _verrou_enrichissements:
+            _enrichissements_en_cours.discard(film_id)
+
+    for film_id, film, depuis_api in a_soumettre:
+        tache = executeur_tmdb().submit(_enrichir_et_completer, dict(film), depuis_api)
+        tache.add_done_callback(lambda _tache, film_id=film_id: terminer(film_id))
+
+
+def _rafraichir_films_perimes(films: List[Dict]) -> None:
+    """Films périmés servis par le cache : nouvel enrichissement TMDB en arrière-plan."""
+    _lancer_enrichissements([(film, True) for film in films if film.get("id")])
+
+
+definir_rafraichissement(_rafraichir_films_perimes)
+
+
+def _preparer_films_progressifs(films: List[Dict]) -> List[Dict]:
+    """Prépare les films pour un affichage immédiat et lance leur enrichissement en arrière-plan.
+
+    Les films en cache sont complétés tout de suite ; les autres sont affichés avec
+    les champs du catalogue et des images par défaut, marqués `enrichissement_en_attente`,
+    et leurs affiches, bandes annonces et résumés FR sont servis ensuite par
+    /api/enrichissement. L'ordre des films est conservé.
+    """
+    fusionnes = []
+    for film in films:
+        cached = get_cached_film(film["id"]) if film.get("id") else None
+        fusionnes.append(({**film, **cached} if cached else dict(film), cached is not None))
+    # Résumés FR : lecture du cache des traductions uniquement (jamais d'appel réseau ici)
+    _traduire_resumes([film for film, _ in fusionnes], en_ligne=False)
+
+    prets, a_lancer = [], []
+    for film, en_cache in fusionnes:
+        # Hors cache : enrichissement TMDB ; résumé non traduit : traduction en arrière-plan si activée
+        en_attente = bool(film.get("id")) and (
+            not en_cache or (TRADUCTION_EN_LIGNE and _resume_a_traduire(film))
+        )
+        if en_attente:
+            a_lancer.append((film, not en_cache))
+        film = _completer_film(dict(film), traduire=False)
+        film["enrichissement_en_attente"] = en_attente
+        prets.append(film)
+
+    if a_lancer:
+        logger.info(f"⏳ {len(a_lancer)} films enrichis en arrière-plan")
+        _lancer_enrichissements(a_lancer)
+    return prets
+
+
+# Nombre de recommandations affichées par page pour une émotion
+NB_RECOMMANDATIONS_EMOTION = 20
+# Profondeur de la table précalculée (pages servies sans calcul) ; au-delà, calcul via l'index
+PROFONDEUR_TABLE_EMOTIONS = 5 * NB_RECOMMANDATIONS_EMOTION + 1
+# Nombre maximum de suggestions de titres renvoyées par /api/suggestions
+NB_SUGGESTIONS_MAX = 20
+# Nombre maximum de films similaires renvoyés par /api/similaires
+NB_SIMILAIRES_MAX = 50
+# Nombre maximum de films renvoyés par /api/recherche-semantique
+NB_RESULTATS_SEMANTIQUES_MAX = 50
+
+catalogue: Optional[Catalogue] = None
+table_emotions: Optional[TableEmotions] = None
+index_titres: Optional[IndexTitres] = None
+# Moteur de similarité construit à la première demande (vectorisation des résumés)
+moteur_similarite: Optional[MoteurSimilarite] = None
+_verrou_moteur_similarite = threading.Lock()
+# Index de recherche sémantique (construit hors ligne), chargé à la première requête
+index_semantique: Optional[IndexSemantique] = None
+_index_semantique_charge = False
+_verrou_index_semantique = threading.Lock()
+
+
+def recharger_catalogue() -> None:
+    """(Re)charge le catalogue et reconstruit les structures précalculées qui en dépendent.
+
+    Le catalogue par colonnes est lu depuis le snapshot binaire
+    (scripts/utils/construire_snapshot_catalogue.py) seulement s'il a été construit
+    à partir de DATA_ENRICHED_COMPLETE tel qu'il est sur disque (empreinte du
+    manifeste) ; sinon il est construit à partir des films chargés (Hugging Face,
+    puis CSV local). L'index des genres, la table des recommandations par
+    émotion et l'index des titres sont reconstruits à chaque chargement, puis
+    publiés ensemble.
+    """
+    global catalogue, table_emotions, index_titres, moteur_similarite
+
+    nouveau = charger_snapshot(DOSSIER_SNAPSHOT, source=DATA_ENRICHED_COMPLETE)
+    if nouveau is not None:
+        logger.info(
+            f"⚡ Source du catalogue: snapshot binaire {DOSSIER_SNAPSHOT} "
+            f"(identique à {DATA_ENRICHED_COMPLETE.name}, Hugging Face non consulté)"
+        )
+    else:
+        logger.info("📥 Source du catalogue: films chargés (Hugging Face, sinon CSV local), pas de snapshot à jour")
+        nouveau = Catalogue.depuis_films(_charger_catalogue())
+    index = construire_index_genres(nouveau)
+    table = construire_table_emotions(nouveau, index=index, profondeur=PROFONDEUR_TABLE_EMOTIONS)
+    titres = IndexTitres(nouveau)
+
+    catalogue, table_emotions, index_titres = nouveau, table, titres
+    moteur_similarite = None
+    logger.info(f"📋 Table des recommandations par émotion précalculée (version {table.version})")
+
+
+def _moteur_similarite() -> MoteurSimilarite:
+    """Retourne le moteur de similarité du catalogue courant (construit une seule fois)."""
+    global moteur_similarite
+    moteur = moteur_similarite
+    if moteur is not None and moteur.catalogue is catalogue:
+        return moteur
+    with _verrou_moteur_similarite:
+        if moteur_similarite is None or moteur_similarite.catalogue is not catalogue:
+            moteur = MoteurSimilarite.construire(catalogue)
+            moteur.charger_voisins()
+            moteur_similarite = moteur
+        return moteur_similarite
+
+
+def _index_semantique() -> Optional[IndexSemantique]:
+    """Retourne l'index sémantique, chargé (mappé en mémoire) au premier appel ; None s'il est absent."""
+    global index_semantique, _index_semantique_charge
+    if _index_semantique_charge:
+        return index_semantique
+    with _verrou_index_semantique:
+        if not _index_semantique_charge:
+            index_semantique = IndexSemantique.charger()
+            if index_semantique is None:
+                logger.warning("⚠️  Index sémantique absent - lancez scripts/utils/construire_index_semantique.py")
+            else:
+                logger.info(f"🔎 Index sémantique chargé ({len(index_semantique)} films)")
+            _index_semantique_charge = True
+        return index_semantique
+
+
+# Processus des workers d'inférence ("spawn") : `python app.py` y est réimporté sous le nom
+# __mp_main__ ; ils n'ont besoin que de leur modèle, pas du catalogue ni des services ci-dessous
+service_inference: Optional[ServiceInferenceEmotions] = None
+if __name__ != "__mp_main__":
+    # Charger le catalogue avec message de progression
+    logger.info("🚀 Initialisation de l'application...")
+    logger.info("📥 Chargement du catalogue de films (cela peut prendre quelques secondes)...")
+    recharger_catalogue()
+    logger.info(f"✅ Catalogue chargé : {len(catalogue)} films disponibles")
+    load_cache()
+    prechauffer_detecteurs()
+    # Classification des émotions par un pool de workers (un modèle chacun), ou dans le thread de la requête
+    service_inference = (
+        ServiceInferenceEmotions() if DEEPFACE_AVAILABLE and INFERENCE_EMOTIONS_WORKERS > 0 else None
+    )
+    if service_inference is not None:
+        # Workers démarrés en "spawn" : chacun charge son modèle dans un processus neuf, sans retarder le démarrage
+        service_inference.demarrer()
+        threading.Thread(target=service_inference.prechauffer, name="prechauffage-emotions", daemon=True).start()
+    else:
+        # Le modèle d'émotions (plusieurs secondes à construire) est chargé sans retarder le démarrage
+        threading.Thread(target=prechauffer_classifieur_emotions, name="prechauffage-emotions", daemon=True).start()
+    logger.info("🌐 Application prête à recevoir les requêtes")
 
 
 @app.get("/")
@@ -369,21 +655,33 @@ def search():
 
     titre = request.args.get("titre", "").strip()
     emotion = request.args.get("emotion", "").strip().lower()
+    page = max(request.args.get("page", 1, type=int), 1)
 
     resultats: List[Dict] = []
+    page_suivante = False
 
-    if titre:
-        film = rechercher_par_titre(titre, catalogue_films)
+    if titre and page == 1:
+        film = rechercher_par_titre(titre, catalogue, index=index_titres)
         if film:
             resultats.append(film)
 
     if emotion:
-        resultats.extend(recommander_par_emotion(emotion, catalogue_films, n=20))
+        # Un film de plus que la page pour savoir s'il existe une page suivante
+        recommandations = table_emotions.recommander(
+            emotion,
+            n=NB_RECOMMANDATIONS_EMOTION + 1,
+            offset=(page - 1) * NB_RECOMMANDATIONS_EMOTION,
+        )
+        page_suivante = len(recommandations) > NB_RECOMMANDATIONS_EMOTION
+        resultats.extend(recommandations[:NB_RECOMMANDATIONS_EMOTION])
 
     resultats = _dedupe_films(resultats)
     
-    # Enrichir avec API TMDB et sons
-    resultats = _enrichir_films(resultats)
+    # Enrichir avec API TMDB et sons (en arrière-plan en mode progressif)
+    if ENRICHISSEMENT_PROGRESSIF:
+        resultats = _preparer_films_progressifs(resultats)
+    else:
+        resultats = _enrichir_films(resultats)
 
     # Ajouter le son d'émotion si une émotion est sélectionnée
     emotion_sound = get_emotion_sound(emotion) if emotion else None
@@ -393,10 +691,205 @@ def search():
         titre=titre,
         emotion=emotion,
         films=resultats,
-        emotion_sound=emotion_sound
+        emotion_sound=emotion_sound,
+        page=page,
+        page_suivante=page_suivante,
     )
 
 
+@app.get("/api/suggestions")
+def api_suggestions():
+    """Suggestions de titres pendant la saisie (préfixe, classées par popularité)."""
+    if "user_id" not in session:
+        return jsonify({"error": "Non autorisé. Veuillez vous connecter."}), 401
+
+    prefixe = request.args.get("q", "").strip()
+    n = min(request.args.get("n", NB_SUGGESTIONS, type=int), NB_SUGGESTIONS_MAX)
+
+    films = index_titres.suggerer(prefixe, n=n) if index_titres else []
+    return jsonify({
+        "suggestions": [
+            {
+                "id": film.get("id"),
+                "title": film.get("title"),
+                "release_year": _annee_sortie(film),
+            }
+            for film in films
+        ]
+    }), 200
+
+
+@app.get("/api/enrichissement")
+def api_enrichissement():
+    """État de l'enrichissement en arrière-plan des films `ids` (liste séparée par des virgules)."""
+    if "user_id" not in session:
+        return jsonify({"error": "Non autorisé. Veuillez vous connecter."}), 401
+
+    ids = []
+    for valeur in request.args.get("ids", "").split(",")[:NB_RECOMMANDATIONS_EMOTION * 2]:
+        try:
+            ids.append(int(valeur))
+        except ValueError:
+            continue
+
+    # En cours dans ce processus ou annoncés par un autre worker (cache partagé)
+    with _verrou_enrichissements:
+        en_cours = {film_id for film_id in ids if film_id in _enrichissements_en_cours}
+    en_cours |= enrichissements_annonces(ids)
+
+    films, en_attente = {}, []
+    for film_id in ids:
+        if film_id in en_cours:
+            en_attente.append(film_id)
+            continue
+        film = get_cached_film(film_id)
+        if film:
+            films[str(film_id)] = {champ: film.get(champ) for champ in CHAMPS_ENRICHIS}
+    return jsonify({"films": films, "en_attente": en_attente}), 200
+
+
+@app.get("/api/statistiques-cache")
+def api_statistiques_cache():
+    """Compteurs du cache des films enrichis (hits, hits périmés, misses, évictions...)."""
+    if "user_id" not in session:
+        return jsonify({"error": "Non autorisé. Veuillez vous connecter."}), 401
+    return jsonify(statistiques_cache()), 200
+
+
+@app.get("/api/statistiques-detection")
+def api_statistiques_detection():
+    """Détecteur de visages utilisé, métriques de chargement et état du service d'inférence des émotions."""
+    if "user_id" not in session:
+        return jsonify({"error": "Non autorisé. Veuillez vous connecter."}), 401
+    statistiques = metriques_detecteurs()
+    statistiques["inference_emotions"] = service_inference.statistiques() if service_inference is not None else None
+    return jsonify(statistiques), 200
+
+
+@app.get("/api/similaires/<int:film_id>")
+def api_similaires(film_id: int):
+    """Films similaires à un film du catalogue ("plus comme celui-ci")."""
+    if "user_id" not in session:
+        return jsonify({"error": "Non autorisé. Veuillez vous connecter."}), 401
+
+    n = min(max(request.args.get("n", 5, type=int), 0), NB_SIMILAIRES_MAX)
+    offset = max(request.args.get("offset", 0, type=int), 0)
+
+    moteur = _moteur_similarite()
+    ligne = moteur.catalogue.ligne(film_id)
+    if ligne is None:
+        return jsonify({"error": "Film introuvable."}), 404
+
+    lignes, scores = moteur.similaires(ligne, n=n, offset=offset)
+    return jsonify({
+        "similaires": [
+            {
+                "id": film.get("id"),
+                "title": film.get("title"),
+                "release_year": _annee_sortie(film),
+                "score_similarite": round(float(score), 3),
+            }
+            for film, score in zip(moteur.catalogue.films(lignes), scores)
+        ]
+    }), 200
+
+
+@app.get("/api/recherche-semantique")
+def api_recherche_semantique():
+    """Recherche en texte libre dans les résumés ("un film de braquage avec un twist")."""
+    if "user_id" not in session:
+        return jsonify({"error": "Non autorisé. Veuillez vous connecter."}), 401
+
+    requete = request.args.get("q", "").strip()
+    n = min(max(request.args.get("n", 10, type=int), 0), NB_RESULTATS_SEMANTIQUES_MAX)
+    if not requete:
+        return jsonify({"resultats": []}), 200
+
+    index = _index_semantique()
+    if index is None:
+        return jsonify({"error": "Recherche sémantique indisponible."}), 503
+
+    ids, scores = index.rechercher(requete, n=n)
+    courant = catalogue
+    lignes = courant.lignes(ids)
+    connus = lignes >= 0
+    return jsonify({
+        "resultats": [
+            {
+                "id": film.get("id"),
+                "title": film.get("title"),
+                "release_year": _annee_sortie(film),
+                "score": round(float(score), 3),
+            }
+            for film, score in zip(courant.films(lignes[connus]), scores[connus])
+        ]
+    }), 200
+
+
+@app.post("/api/face-quality")
+def api_face_quality():
+    """Encadrement du visage et qualité de l'image pour le suivi webcam (sans classification d'émotion)."""
+    if "user_id" not in session:
+        return jsonify({"error": "Non autorisé. Veuillez vous connecter."}), 401
+    if 'image' not in request.files:
+        return jsonify({"error": "Aucune image fournie"}), 400
+
+    file = request.files['image']
+    if file.filename == '':
+        return jsonify({"error": "Fichier vide"}), 400
+
+    try:
+        return jsonify(analyser_qualite_visage(file.read())), 200
+    except Exception as e:
+        logger.error(f"Erreur analyse qualité visage: {e}")
+        return jsonify({
+            "error": str(e),
+            "face_bbox": None,
+            "quality": {
+                "brightness": 0,
+                "brightness_status": "erreur",
+                "face_detected": False,
+                "face_size_ratio": 0,
+                "messages": [f"❌ Erreur: {str(e)}"]
+            }
+        }), 500
+
+
+if sock is not None:
+    @sock.route("/ws/face-quality")
+    def ws_face_quality(ws):
+        """
+        Suivi du visage en continu : le client envoie des images JPEG réduites (messages binaires),
+        le serveur répond à chacune par face_bbox, quality et detection (JSON).
+        Détection sautée si l'image a peu changé, cherchée d'abord autour du dernier visage sinon.
+        """
+        if "user_id" not in session:
+            ws.send(json.dumps({"error": "Non autorisé. Veuillez vous connecter."}))
+            ws.close()
+            return
+        suivi = SuiviVisage()
+        while True:
+            image_data = ws.receive()
+            if not isinstance(image_data, (bytes, bytearray)):
+                continue
+            try:
+                resultat = suivi.analyser(bytes(image_data))
+            except Exception as e:
+                logger.error(f"Erreur suivi visage: {e}")
+                resultat = {
+                    "error": str(e),
+                    "face_bbox": None,
+                    "quality": {
+                        "brightness": 0,
+                        "brightness_status": "erreur",
+                        "face_detected": False,
+                        "face_size_ratio": 0,
+                        "messages": [f"❌ Erreur: {str(e)}"]
+                    }
+                }
+            ws.send(json.dumps(resultat))
+
+
 @app.post("/api/detect-emotion")
 def api_detect_emotion():
     """API endpoint pour détecter l'émotion depuis une image uploadée."""
@@ -411,11 +904,19 @@ def api_detect_emotion():
 
     try:
         image_data = file.read()
-        result = detecter_emotion_image(image_data)
+        result = detecter_emotion_image(
+            image_data, predire=service_inference.predire if service_inference is not None else None
+        )
         
         # Retourner toutes les informations (emotion, face_bbox, quality, confidence)
         return jsonify(result), 200
 
+    except FileInferencePleine as e:
+        # File d'attente pleine : le client réessaie un peu plus tard
+        return jsonify({"error": str(e)}), 429, {"Retry-After": "1"}
+    except ServiceInferenceIndisponible as e:
+        logger.warning(f"⚠️  Service d'inférence des émotions indisponible: {e}")
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "5"}
     except Exception as e:
         logger.error(f"Erreur détection émotion: {e}")
         return jsonify({
@@ -1,56 +1,320 @@
-"""Gestionnaire de cache pour les films enrichis."""
+"""Gestionnaire de cache pour les films enrichis.
+
+Les films enrichis sont stockés dans une base SQLite (mode WAL) indexée par id :
+lecture ponctuelle d'un film, écriture des seuls films modifiés, chargement à la
+demande. Les films les plus récemment utilisés sont gardés en mémoire (LRU borné).
+
+Fraîcheur : chaque champ enrichi a une durée de validité (les plateformes de
+streaming changent plus vite que les affiches). Un film dont un champ a expiré
+est « périmé » : il est servi tout de suite et son rafraîchissement est demandé
+en arrière-plan (stale-while-revalidate). Au-delà de CACHE_AGE_MAX_HEURES, il
+est considéré comme absent du cache.
+
+Plusieurs processus (workers Gunicorn) partagent la même base : chaque film est
+écrit dans sa propre transaction (pas de mise à jour perdue), et une table de
+baux garantit qu'un seul processus à la fois enrichit un film donné via TMDB
+(`enrichir_coordonne`) ; les autres attendent son résultat dans la base. La
+table des attentes indique à tous les processus quels films sont en cours
+d'enrichissement en arrière-plan (`enrichissements_annonces`).
+"""
 
 from __future__ import annotations
 
 import json
 import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
 logger = logging.getLogger(__name__)
 
-# Cache en mémoire
-_enrichment_cache: Dict[int, Dict] = {}
+# Durée de validité (heures) des champs enrichis ; les autres champs suivent TTL_DEFAUT_HEURES
+TTL_CHAMPS_HEURES = {
+    "streaming_links": 24,
+    "streaming_providers": 24,
+    "trailer_url": 24 * 7,
+    "trailer_key": 24 * 7,
+    "poster_url": 24 * 30,
+    "backdrop_url": 24 * 30,
+    "overview_fr": 24 * 30,
+}
+TTL_DEFAUT_HEURES = 24 * 30
+# Âge (heures) au-delà duquel un film en cache est ignoré (il sera de nouveau enrichi)
+CACHE_AGE_MAX_HEURES = float(os.getenv("CACHE_AGE_MAX_HEURES", str(24 * 90)))
+# Nombre maximal de films gardés en mémoire, et dans la base (les plus anciens sont supprimés)
+CACHE_TAILLE_MEMOIRE = int(os.getenv("CACHE_TAILLE_MEMOIRE", "2000"))
+CACHE_NB_FILMS_MAX = int(os.getenv("CACHE_NB_FILMS_MAX", "100000"))
+# Durée (s) d'un bail d'enrichissement : au-delà, un processus bloqué ne retient plus les autres
+CACHE_BAIL_SECONDES = float(os.getenv("CACHE_BAIL_SECONDES", "15"))
+# Durée (s) après laquelle un enrichissement en arrière-plan annoncé mais jamais terminé est oublié
+CACHE_ATTENTE_MAX_SECONDES = float(os.getenv("CACHE_ATTENTE_MAX_SECONDES", "120"))
+# Intervalle (s) entre deux lectures de la base en attendant le film enrichi par un autre processus
+CACHE_ATTENTE_SECONDES = 0.1
+# Attente maximale (s) d'un verrou d'écriture posé par un autre processus
+CACHE_DELAI_VERROU_SECONDES = 10.0
+# Délai (s) avant de redemander le rafraîchissement d'un film dont l'enrichissement a échoué
+CACHE_DELAI_NOUVEL_ESSAI_SECONDES = float(os.getenv("CACHE_DELAI_NOUVEL_ESSAI_SECONDES", "300"))
+# Préfixe des images par défaut ajoutées pour l'affichage (jamais mises en cache)
+IMAGE_PAR_DEFAUT = "https://via.placeholder.com/"
+
+# Cache en mémoire : id -> (film, date d'écriture), du moins au plus récemment utilisé
+_enrichment_cache: "OrderedDict[int, Tuple[Dict, float]]" = OrderedDict()
+# Films ajoutés depuis la dernière sauvegarde (écrits par save_cache)
+_films_modifies: Dict[int, Tuple[Dict, float]] = {}
+_cache_db = Path(__file__).parent.parent / "data" / "enrichment_cache.sqlite3"
+# Ancien cache JSON, importé dans la base à la première ouverture
 _cache_file = Path(__file__).parent.parent / "data" / "enrichment_cache.json"
+_connexion: Optional[sqlite3.Connection] = None
+# Processus propriétaire de la connexion (une connexion héritée d'un fork n'est pas réutilisée)
+_pid_connexion: Optional[int] = None
+# Sérialise les accès à la base (le cache est aussi alimenté par les enrichissements en arrière-plan)
+_verrou = threading.RLock()
+# Nombre maximal d'ids par requête SQL "IN (...)"
+TAILLE_LOT_SQL = 500
 
+# Compteurs exposés par statistiques_cache()
+_compteurs = {
+    "hits": 0, "hits_perimes": 0, "misses": 0, "expirations": 0, "evictions": 0, "elagages": 0,
+    "enrichissements": 0, "enrichissements_partages": 0, "echecs_enrichissement": 0,
+}
+# Date du dernier échec d'enrichissement de chaque film (pas de nouvel essai avant le délai)
+_echecs_enrichissement: Dict[int, float] = {}
+# Appelée (hors verrou) avec les films périmés servis, pour les rafraîchir en arrière-plan
+_rafraichissement: Optional[Callable[[List[Dict]], None]] = None
 
-def load_cache() -> None:
-    """Charge le cache depuis le fichier."""
-    global _enrichment_cache
+
+def _json_par_defaut(valeur):
+    """Convertit les scalaires numpy (catalogue en colonnes) en types Python pour json."""
+    if hasattr(valeur, "item"):
+        return valeur.item()
+    raise TypeError(f"Type non sérialisable: {type(valeur).__name__}")
+
+
+def _base() -> sqlite3.Connection:
+    """Connexion à la base du cache, ouverte (et migrée depuis le JSON) au premier appel."""
+    global _connexion, _pid_connexion
+    with _verrou:
+        if _connexion is not None and _pid_connexion != os.getpid():
+            # Processus issu d'un fork (workers Gunicorn avec --preload) : nouvelle connexion,
+            # et les écritures en attente restent à la charge du processus parent
+            _connexion = None
+            _films_modifies.clear()
+        if _connexion is None:
+            _cache_db.parent.mkdir(parents=True, exist_ok=True)
+            connexion = sqlite3.connect(
+                str(_cache_db), timeout=CACHE_DELAI_VERROU_SECONDES, check_same_thread=False
+            )
+            connexion.execute("PRAGMA journal_mode=WAL")
+            connexion.execute("PRAGMA synchronous=NORMAL")
+            connexion.execute(
+                "CREATE TABLE IF NOT EXISTS films ("
+                " id INTEGER PRIMARY KEY, donnees TEXT NOT NULL, maj_le REAL NOT NULL)"
+            )
+            connexion.execute("CREATE INDEX IF NOT EXISTS films_maj_le ON films (maj_le)")
+            connexion.execute("CREATE TABLE IF NOT EXISTS meta (cle TEXT PRIMARY KEY, valeur TEXT)")
+            connexion.execute(
+                "CREATE TABLE IF NOT EXISTS baux ("
+                " id INTEGER PRIMARY KEY, proprietaire TEXT NOT NULL, expire_le REAL NOT NULL)"
+            )
+            connexion.execute(
+                "CREATE TABLE IF NOT EXISTS attentes (id INTEGER PRIMARY KEY, expire_le REAL NOT NULL)"
+            )
+            connexion.commit()
+            _migrer_json(connexion)
+            _connexion, _pid_connexion = connexion, os.getpid()
+        return _connexion
+
+
+def _migrer_json(connexion: sqlite3.Connection) -> None:
+    """Importe une seule fois l'ancien cache JSON dans la base."""
+    if connexion.execute("SELECT 1 FROM meta WHERE cle = 'migration_json'").fetchone():
+        return
+    nb_films = 0
     if _cache_file.exists():
         try:
             with open(_cache_file, 'r', encoding='utf-8') as f:
-                _enrichment_cache = json.load(f)
-            logger.info(f"📦 Cache chargé: {len(_enrichment_cache)} films en cache")
+                anciens = json.load(f)
+            maintenant = time.time()
+            with connexion:
+                connexion.executemany(
+                    "INSERT OR IGNORE INTO films (id, donnees, maj_le) VALUES (?, ?, ?)",
+                    (
+                        (int(film_id), json.dumps(film, ensure_ascii=False, default=_json_par_defaut), maintenant)
+                        for film_id, film in anciens.items()
+                    ),
+                )
+            nb_films = len(anciens)
+            logger.info(f"📦 Cache JSON importé dans {_cache_db.name}: {nb_films} films")
         except Exception as e:
-            logger.warning(f"⚠️  Erreur lors du chargement du cache: {e}")
-            _enrichment_cache = {}
+            logger.warning(f"⚠️  Erreur lors de l'import du cache JSON: {e}")
+            return
+    with connexion:
+        connexion.execute("INSERT OR REPLACE INTO meta (cle, valeur) VALUES ('migration_json', ?)", (str(nb_films),))
+
+
+def load_cache() -> None:
+    """Ouvre la base du cache et supprime les films trop anciens (les autres sont lus à la demande)."""
+    try:
+        elaguer_cache()
+        nb_films = _base().execute("SELECT COUNT(*) FROM films").fetchone()[0]
+        logger.info(f"📦 Cache chargé: {nb_films} films en cache")
+    except Exception as e:
+        logger.warning(f"⚠️  Erreur lors du chargement du cache: {e}")
 
 
 def save_cache() -> None:
-    """Sauvegarde le cache dans le fichier."""
+    """Écrit dans la base les films ajoutés depuis la dernière sauvegarde (une transaction)."""
+    with _verrou:
+        if not _films_modifies:
+            return
+        # Copie : d'autres threads peuvent ajouter des films pendant l'écriture
+        modifies = dict(_films_modifies)
+        _films_modifies.clear()
+        try:
+            with _base() as base:
+                base.executemany(
+                    "INSERT OR REPLACE INTO films (id, donnees, maj_le) VALUES (?, ?, ?)",
+                    [
+                        (film_id, json.dumps(film, ensure_ascii=False, default=_json_par_defaut), maj_le)
+                        for film_id, (film, maj_le) in modifies.items()
+                    ],
+                )
+            logger.debug(f"💾 Cache sauvegardé: {len(modifies)} films")
+        except Exception as e:
+            # Les films restent à écrire à la prochaine sauvegarde
+            for film_id, entree in modifies.items():
+                _films_modifies.setdefault(film_id, entree)
+            logger.warning(f"⚠️  Erreur lors de la sauvegarde du cache: {e}")
+
+
+def _memoriser(film_id: int, entree: Tuple[Dict, float]) -> None:
+    """Garde l'entrée en mémoire (la plus récente du LRU) et évince les plus anciennes."""
+    _enrichment_cache[film_id] = entree
+    _enrichment_cache.move_to_end(film_id)
+    while len(_enrichment_cache) > CACHE_TAILLE_MEMOIRE:
+        _enrichment_cache.popitem(last=False)
+        _compteurs["evictions"] += 1
+
+
+def _lire_entrees(films_ids: List[int]) -> Dict[int, Tuple[Dict, float]]:
+    """Entrées (film, date d'écriture) des films, depuis la mémoire ou la base."""
+    trouvees: Dict[int, Tuple[Dict, float]] = {}
+    with _verrou:
+        manquants = []
+        for film_id in dict.fromkeys(films_ids):
+            entree = _enrichment_cache.get(film_id) or _films_modifies.get(film_id)
+            if entree is not None:
+                _memoriser(film_id, entree)
+                trouvees[film_id] = entree
+            else:
+                manquants.append(film_id)
+        if manquants:
+            base = _base()
+            for debut in range(0, len(manquants), TAILLE_LOT_SQL):
+                lot = manquants[debut:debut + TAILLE_LOT_SQL]
+                lignes = base.execute(
+                    f"SELECT id, donnees, maj_le FROM films WHERE id IN ({','.join('?' * len(lot))})", lot
+                ).fetchall()
+                for film_id, donnees, maj_le in lignes:
+                    trouvees[film_id] = (json.loads(donnees), maj_le)
+                    _memoriser(film_id, trouvees[film_id])
+    return trouvees
+
+
+def duree_validite(film: Dict) -> float:
+    """Durée de validité (s) d'un film en cache : celle du champ enrichi qui expire le plus tôt."""
+    heures = [ttl for champ, ttl in TTL_CHAMPS_HEURES.items() if film.get(champ)]
+    return min(heures, default=TTL_DEFAUT_HEURES) * 3600
+
+
+def _consulter(films_ids: List[int]) -> Dict[int, Dict]:
+    """Films utilisables en cache (frais ou périmés) ; demande le rafraîchissement des périmés."""
     try:
-        _cache_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(_cache_file, 'w', encoding='utf-8') as f:
-            json.dump(_enrichment_cache, f, ensure_ascii=False, indent=2)
-        logger.debug(f"💾 Cache sauvegardé: {len(_enrichment_cache)} films")
+        entrees = _lire_entrees(films_ids)
     except Exception as e:
-        logger.warning(f"⚠️  Erreur lors de la sauvegarde du cache: {e}")
+        logger.warning(f"⚠️  Erreur de lecture du cache: {e}")
+        entrees = {}
+
+    maintenant = time.time()
+    films: Dict[int, Dict] = {}
+    perimes: List[Dict] = []
+    with _verrou:
+        for film_id in dict.fromkeys(films_ids):
+            entree = entrees.get(film_id)
+            if entree is None or not entree[0]:
+                _compteurs["misses"] += 1
+                continue
+            film, maj_le = entree
+            age = maintenant - maj_le
+            if age > CACHE_AGE_MAX_HEURES * 3600:
+                _compteurs["expirations"] += 1
+                _compteurs["misses"] += 1
+                continue
+            if age > duree_validite(film):
+                _compteurs["hits_perimes"] += 1
+                if maintenant - _echecs_enrichissement.get(film_id, 0.0) > CACHE_DELAI_NOUVEL_ESSAI_SECONDES:
+                    perimes.append(film)
+            else:
+                _compteurs["hits"] += 1
+            films[film_id] = film
+
+    if perimes and _rafraichissement is not None:
+        try:
+            _rafraichissement(perimes)
+        except Exception as e:
+            logger.warning(f"⚠️  Erreur lors du rafraîchissement des films périmés: {e}")
+    return films
 
 
 def get_cached_film(film_id: int) -> Optional[Dict]:
-    """Récupère un film depuis le cache."""
-    film_data = _enrichment_cache.get(str(film_id))
+    """Récupère un film depuis le cache (un film périmé est servi et rafraîchi en arrière-plan)."""
+    film_data = _consulter([int(film_id)]).get(int(film_id))
     if film_data:
         return film_data
     return None
 
 
-def cache_film(film: Dict) -> None:
-    """Met en cache un film enrichi."""
+def cache_film(film: Dict, conserver_date: bool = False) -> None:
+    """Met en cache un film enrichi (écrit dans la base au prochain save_cache).
+
+    Avec `conserver_date`, le film garde la date d'enrichissement de l'entrée déjà en
+    cache (mise à jour qui ne vient pas de TMDB, par exemple une traduction) : il
+    reste périmé s'il l'était.
+    """
     film_id = film.get("id")
     if film_id:
-        _enrichment_cache[str(film_id)] = film
+        film = _sans_valeurs_d_affichage(film)
+        with _verrou:
+            maj_le = time.time()
+            if conserver_date:
+                try:
+                    ancienne = _lire_entrees([int(film_id)]).get(int(film_id))
+                except Exception as e:
+                    logger.warning(f"⚠️  Erreur de lecture du cache: {e}")
+                    ancienne = None
+                if ancienne is not None:
+                    maj_le = ancienne[1]
+            entree = (film, maj_le)
+            _memoriser(int(film_id), entree)
+            _films_modifies[int(film_id)] = entree
+
+
+def _sans_valeurs_d_affichage(film: Dict) -> Dict:
+    """Copie du film sans les valeurs de repli d'affichage : images par défaut, résumé anglais tenant lieu de résumé FR.
+
+    En cache, elles masqueraient les vrais champs du catalogue (fusion `{**film, **cached}`).
+    """
+    film = dict(film)
+    for champ in ("poster_url", "backdrop_url"):
+        if isinstance(film.get(champ), str) and film[champ].startswith(IMAGE_PAR_DEFAUT):
+            del film[champ]
+    if film.get("overview_fr") and film.get("overview_fr") == film.get("overview"):
+        del film["overview_fr"]
+    return film
 
 
 def cache_films(films: List[Dict]) -> None:
@@ -63,29 +327,205 @@ def cache_films(films: List[Dict]) -> None:
 def get_cached_films(films: List[Dict]) -> tuple[List[Dict], List[Dict]]:
     """
     Sépare les films en deux listes : ceux qui sont en cache et ceux qui doivent être enrichis.
-    
+
     Returns:
         (films_cached, films_to_enrich)
     """
     films_cached = []
     films_to_enrich = []
-    
+
+    en_cache = _consulter([int(film["id"]) for film in films if film.get("id")])
+
     for film in films:
         film_id = film.get("id")
-        if film_id:
-            cached = get_cached_film(film_id)
-            if cached:
-                # Fusionner les données du cache avec les données du film
-                film_enriched = {**film, **cached}
-                films_cached.append(film_enriched)
-            else:
-                films_to_enrich.append(film)
+        cached = en_cache.get(int(film_id)) if film_id else None
+        if cached:
+            # Fusionner les données du cache avec les données du film
+            film_enriched = {**film, **cached}
+            films_cached.append(film_enriched)
         else:
             films_to_enrich.append(film)
-    
+
     return films_cached, films_to_enrich
 
 
-# Charger le cache au démarrage
-load_cache()
+def _est_frais(entree: Optional[Tuple[Dict, float]]) -> bool:
+    return bool(entree and entree[0]) and time.time() - entree[1] <= duree_validite(entree[0])
+
+
+def _lire_dans_la_base(film_id: int) -> Optional[Tuple[Dict, float]]:
+    """Entrée d'un film lue dans la base (écrite éventuellement par un autre processus), gardée en mémoire."""
+    with _verrou:
+        ligne = _base().execute("SELECT donnees, maj_le FROM films WHERE id = ?", (film_id,)).fetchone()
+        if ligne is None:
+            return None
+        entree = (json.loads(ligne[0]), ligne[1])
+        _memoriser(film_id, entree)
+        return entree
+
+
+def _proprietaire() -> str:
+    return f"{os.getpid()}:{threading.get_ident()}"
+
+
+def prendre_bail(film_id: int, duree: float = CACHE_BAIL_SECONDES) -> bool:
+    """Réserve l'enrichissement d'un film pour ce thread (tous processus confondus) ; False s'il est déjà pris."""
+    maintenant = time.time()
+    with _verrou:
+        with _base() as base:
+            curseur = base.execute(
+                "INSERT INTO baux (id, proprietaire, expire_le) VALUES (?, ?, ?)"
+                " ON CONFLICT (id) DO UPDATE SET proprietaire = excluded.proprietaire, expire_le = excluded.expire_le"
+                " WHERE baux.expire_le < ?",
+                (film_id, _proprietaire(), maintenant + duree, maintenant),
+            )
+        return curseur.rowcount == 1
+
+
+def liberer_bail(film_id: int) -> None:
+    """Libère le bail d'un film pris par ce thread."""
+    with _verrou:
+        with _base() as base:
+            base.execute("DELETE FROM baux WHERE id = ? AND proprietaire = ?", (film_id, _proprietaire()))
+
+
+def enrichir_coordonne(film: Dict, enrichir: Callable[[Dict], Dict]) -> Dict:
+    """
+    Enrichit `film` avec `enrichir` une seule fois pour tous les processus partageant la base.
+
+    Si un autre processus a déjà écrit une version fraîche du film, elle est reprise
+    telle quelle. Sinon, le processus qui obtient le bail appelle `enrichir` et écrit
+    le résultat dans la base ; les autres attendent ce résultat (au plus
+    CACHE_BAIL_SECONDES, après quoi ils enrichissent eux-mêmes).
+
+    `enrichir` doit lever une exception quand l'enrichissement échoue : rien n'est
+    alors écrit, l'entrée déjà en cache garde sa date (et reste périmée), et son
+    rafraîchissement n'est pas redemandé avant CACHE_DELAI_NOUVEL_ESSAI_SECONDES.
+    """
+    film_id = int(film["id"])
+    limite = time.monotonic() + CACHE_BAIL_SECONDES
+    bail = False
+    while True:
+        entree = _lire_dans_la_base(film_id)
+        if _est_frais(entree):
+            with _verrou:
+                _compteurs["enrichissements_partages"] += 1
+            return {**film, **entree[0]}
+        bail = prendre_bail(film_id)
+        if bail or time.monotonic() >= limite:
+            break
+        time.sleep(CACHE_ATTENTE_SECONDES)
+
+    try:
+        try:
+            film_enrichi = enrichir(film)
+        except Exception:
+            with _verrou:
+                _echecs_enrichissement[film_id] = time.time()
+                _compteurs["echecs_enrichissement"] += 1
+            raise
+        cache_film(film_enrichi)
+        save_cache()
+        with _verrou:
+            _echecs_enrichissement.pop(film_id, None)
+            _compteurs["enrichissements"] += 1
+        return film_enrichi
+    finally:
+        if bail:
+            liberer_bail(film_id)
+
 
+def annoncer_enrichissements(films_ids: List[int], duree: float = CACHE_ATTENTE_MAX_SECONDES) -> None:
+    """Signale à tous les processus que l'enrichissement en arrière-plan de ces films est lancé."""
+    expire_le = time.time() + duree
+    try:
+        with _verrou:
+            with _base() as base:
+                base.executemany(
+                    "INSERT OR REPLACE INTO attentes (id, expire_le) VALUES (?, ?)",
+                    [(int(film_id), expire_le) for film_id in films_ids],
+                )
+    except sqlite3.Error as e:
+        logger.warning(f"⚠️  Erreur d'écriture des enrichissements en cours: {e}")
+
+
+def terminer_enrichissement(film_id: int) -> None:
+    """Retire un film des enrichissements en cours (à appeler une fois le film écrit dans la base)."""
+    try:
+        with _verrou:
+            with _base() as base:
+                base.execute("DELETE FROM attentes WHERE id = ?", (int(film_id),))
+    except sqlite3.Error as e:
+        logger.warning(f"⚠️  Erreur d'écriture des enrichissements en cours: {e}")
+
+
+def enrichissements_annonces(films_ids: List[int]) -> Set[int]:
+    """Films dont l'enrichissement en arrière-plan est en cours, dans ce processus ou dans un autre."""
+    films_ids = [int(film_id) for film_id in dict.fromkeys(films_ids)]
+    annonces: Set[int] = set()
+    try:
+        with _verrou:
+            base = _base()
+            for debut in range(0, len(films_ids), TAILLE_LOT_SQL):
+                lot = films_ids[debut:debut + TAILLE_LOT_SQL]
+                lignes = base.execute(
+                    f"SELECT id FROM attentes WHERE expire_le >= ? AND id IN ({','.join('?' * len(lot))})",
+                    (time.time(), *lot),
+                ).fetchall()
+                annonces.update(film_id for (film_id,) in lignes)
+    except sqlite3.Error as e:
+        logger.warning(f"⚠️  Erreur de lecture des enrichissements en cours: {e}")
+    return annonces
+
+
+def definir_rafraichissement(fonction: Optional[Callable[[List[Dict]], None]]) -> None:
+    """Enregistre la fonction qui relance l'enrichissement des films périmés servis par le cache."""
+    global _rafraichissement
+    _rafraichissement = fonction
+
+
+def statistiques_cache() -> Dict[str, int]:
+    """Compteurs du cache (hits, hits périmés, misses, expirations, évictions mémoire, élagages) et tailles."""
+    with _verrou:
+        return {**_compteurs, "films_en_memoire": len(_enrichment_cache), "films_a_sauvegarder": len(_films_modifies)}
+
+
+def elaguer_cache() -> int:
+    """Supprime de la base les films trop anciens, puis les plus anciens au-delà de CACHE_NB_FILMS_MAX."""
+    save_cache()
+    with _verrou:
+        with _base() as base:
+            supprimes = base.execute(
+                "DELETE FROM films WHERE maj_le < ?", (time.time() - CACHE_AGE_MAX_HEURES * 3600,)
+            ).rowcount
+            supprimes += base.execute(
+                "DELETE FROM films WHERE id IN (SELECT id FROM films ORDER BY maj_le DESC LIMIT -1 OFFSET ?)",
+                (CACHE_NB_FILMS_MAX,),
+            ).rowcount
+            # Baux abandonnés (processus arrêté pendant un enrichissement)
+            base.execute("DELETE FROM baux WHERE expire_le < ?", (time.time(),))
+        _compteurs["elagages"] += supprimes
+    if supprimes:
+        logger.info(f"🧹 Cache élagué: {supprimes} films supprimés")
+    return supprimes
+
+
+def compacter_cache() -> None:
+    """Élague puis compacte la base (journal WAL vidé, VACUUM)."""
+    elaguer_cache()
+    with _verrou:
+        base = _base()
+        base.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        base.execute("VACUUM")
+    logger.info("🧹 Cache compacté")
+
+
+def fermer_cache() -> None:
+    """Sauvegarde les films en attente et ferme la base ; elle sera rouverte à la demande."""
+    global _connexion, _pid_connexion
+    save_cache()
+    with _verrou:
+        if _connexion is not None and _pid_connexion == os.getpid():
+            _connexion.close()
+        _connexion = _pid_connexion = None
+        _enrichment_cache.clear()
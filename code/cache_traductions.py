@@ -0,0 +1,159 @@
+"""Cache persistant des traductions : LRU en mémoire devant une table SQLite sur disque."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FICHIER_TRADUCTIONS = Path(__file__).resolve().parent.parent / "data" / "traductions.sqlite3"
+# Nombre de traductions gardées en mémoire (les plus récemment utilisées)
+TAILLE_LRU_TRADUCTIONS = 20000
+# Nombre maximal de clés par requête SQL "IN (...)"
+TAILLE_LOT_SQL = 500
+
+Cle = Tuple[str, str, str]
+
+
+def cle_traduction(texte: str, source: str, cible: str) -> Cle:
+    """Clé d'une traduction : (empreinte SHA-256 du texte, langue source, langue cible)."""
+    return hashlib.sha256(texte.encode("utf-8")).hexdigest(), source, cible
+
+
+class CacheTraductions:
+    """
+    Traductions déjà obtenues, indexées par (empreinte du texte, source, cible).
+
+    Les lectures passent d'abord par un LRU en mémoire, puis par la table SQLite
+    (ouverte à la première utilisation) ; les écritures vont aux deux. Utilisable
+    depuis plusieurs threads.
+    """
+
+    def __init__(self, chemin: Path = FICHIER_TRADUCTIONS, taille_lru: int = TAILLE_LRU_TRADUCTIONS):
+        self.chemin = Path(chemin)
+        self.taille_lru = taille_lru
+        self._lru: "OrderedDict[Cle, str]" = OrderedDict()
+        self._connexion: Optional[sqlite3.Connection] = None
+        self._verrou = threading.Lock()
+
+    def _base(self) -> Optional[sqlite3.Connection]:
+        """Connexion SQLite (créée au premier appel, sous verrou) ; None si le disque est indisponible."""
+        if self._connexion is None:
+            try:
+                self.chemin.parent.mkdir(parents=True, exist_ok=True)
+                connexion = sqlite3.connect(str(self.chemin), check_same_thread=False)
+                connexion.execute("PRAGMA journal_mode=WAL")
+                connexion.execute(
+                    "CREATE TABLE IF NOT EXISTS traductions ("
+                    " empreinte TEXT NOT NULL, source TEXT NOT NULL, cible TEXT NOT NULL,"
+                    " traduction TEXT NOT NULL, cree_le REAL NOT NULL,"
+                    " PRIMARY KEY (empreinte, source, cible))"
+                )
+                connexion.commit()
+                self._connexion = connexion
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️  Cache des traductions sur disque indisponible ({self.chemin}): {e}")
+                return None
+        return self._connexion
+
+    def _memoriser(self, cle: Cle, traduction: str) -> None:
+        self._lru[cle] = traduction
+        self._lru.move_to_end(cle)
+        while len(self._lru) > self.taille_lru:
+            self._lru.popitem(last=False)
+
+    def get(self, texte: str, source: str, cible: str) -> Optional[str]:
+        """Traduction en cache de `texte`, ou None."""
+        return self.get_many([texte], source, cible).get(texte)
+
+    def get_many(self, textes: Iterable[str], source: str, cible: str) -> Dict[str, str]:
+        """Traductions en cache des textes (texte -> traduction), en une requête SQL par lot."""
+        cles = {texte: cle_traduction(texte, source, cible) for texte in textes}
+        trouvees: Dict[str, str] = {}
+        with self._verrou:
+            manquants = []
+            for texte, cle in cles.items():
+                traduction = self._lru.get(cle)
+                if traduction is not None:
+                    self._lru.move_to_end(cle)
+                    trouvees[texte] = traduction
+                else:
+                    manquants.append(texte)
+
+            base = self._base() if manquants else None
+            if base is None:
+                return trouvees
+            par_empreinte = {cles[texte][0]: texte for texte in manquants}
+            empreintes = list(par_empreinte)
+            try:
+                for debut in range(0, len(empreintes), TAILLE_LOT_SQL):
+                    lot = empreintes[debut:debut + TAILLE_LOT_SQL]
+                    lignes = base.execute(
+                        f"SELECT empreinte, traduction FROM traductions"
+                        f" WHERE source = ? AND cible = ? AND empreinte IN ({','.join('?' * len(lot))})",
+                        (source, cible, *lot),
+                    ).fetchall()
+                    for empreinte, traduction in lignes:
+                        texte = par_empreinte[empreinte]
+                        trouvees[texte] = traduction
+                        self._memoriser(cles[texte], traduction)
+            except sqlite3.Error as e:
+                # Base verrouillée ou corrompue : on rend ce qui a été trouvé (LRU, lots déjà lus)
+                logger.warning(f"⚠️  Erreur de lecture du cache des traductions: {e}")
+        return trouvees
+
+    def set(self, texte: str, source: str, cible: str, traduction: str) -> None:
+        """Enregistre une traduction."""
+        self.set_many({texte: traduction}, source, cible)
+
+    def set_many(self, traductions: Dict[str, str], source: str, cible: str) -> None:
+        """Enregistre plusieurs traductions (une seule transaction)."""
+        if not traductions:
+            return
+        maintenant = time.time()
+        lignes = []
+        with self._verrou:
+            for texte, traduction in traductions.items():
+                cle = cle_traduction(texte, source, cible)
+                self._memoriser(cle, traduction)
+                lignes.append((*cle, traduction, maintenant))
+            base = self._base()
+            if base is None:
+                return
+            try:
+                with base:
+                    base.executemany(
+                        "INSERT OR REPLACE INTO traductions (empreinte, source, cible, traduction, cree_le)"
+                        " VALUES (?, ?, ?, ?, ?)",
+                        lignes,
+                    )
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️  Erreur d'écriture du cache des traductions: {e}")
+
+    def __len__(self) -> int:
+        with self._verrou:
+            base = self._base()
+            if base is None:
+                return len(self._lru)
+            try:
+                return base.execute("SELECT COUNT(*) FROM traductions").fetchone()[0]
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️  Erreur de lecture du cache des traductions: {e}")
+                return len(self._lru)
+
+    def fermer(self) -> None:
+        with self._verrou:
+            if self._connexion is not None:
+                self._connexion.close()
+                self._connexion = None
+
+
+# Cache partagé par le processus
+cache_traductions = CacheTraductions()
@@ -0,0 +1,217 @@
+"""Catalogue de films stocké par colonnes (NumPy) plutôt qu'en liste de dictionnaires."""
+
+from __future__ import annotations
+
+import math
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+Film = Dict
+
+# Colonnes numériques stockées dans des tableaux NumPy (NaN / -1 = valeur absente)
+COLONNES_NUMERIQUES = {
+    "vote_average": np.float64,
+    "popularity": np.float64,
+    "sentiment_score": np.float64,
+    "release_year": np.float64,
+}
+
+# Marqueur des champs absents d'un film dans les colonnes "objet"
+_ABSENT = object()
+# Longueur maximale des chaînes internées (valeurs courtes et répétées : genres, labels...)
+LONGUEUR_MAX_INTERNEE = 32
+
+
+def _en_float(valeur) -> float:
+    """Convertit une valeur en float, NaN si absente ou invalide."""
+    try:
+        return float(valeur)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _en_id(valeur) -> int:
+    """Convertit un identifiant de film en int, -1 si absent ou invalide."""
+    try:
+        return int(valeur)
+    except (TypeError, ValueError):
+        return -1
+
+
+def _interner(valeur):
+    """Interne les chaînes courtes (une seule copie en mémoire pour les valeurs répétées)."""
+    if isinstance(valeur, str) and len(valeur) <= LONGUEUR_MAX_INTERNEE:
+        return sys.intern(valeur)
+    return valeur
+
+
+class Catalogue:
+    """
+    Catalogue de films en colonnes :
+    - `ids` et les colonnes de COLONNES_NUMERIQUES en tableaux NumPy ;
+    - les genres en matrice de bits (une ligne par film, un bit par genre de `genres`),
+      plus le tuple ordonné des genres de chaque film (tuples partagés entre films) ;
+    - les autres champs en colonnes Python aux chaînes internées.
+
+    Les dictionnaires "film" ne sont matérialisés qu'à la demande (`film`, `films`),
+    typiquement pour les quelques résultats envoyés aux templates : chaque appel
+    retourne un nouveau dictionnaire, modifiable sans altérer le catalogue.
+    """
+
+    def __init__(
+        self,
+        ids: np.ndarray,
+        numeriques: Dict[str, np.ndarray],
+        genres: List[str],
+        genres_films: List[tuple],
+        objets: Dict[str, list],
+        matrice_genres: Optional[np.ndarray] = None,
+        lignes_par_id: Optional[np.ndarray] = None,
+    ):
+        self.ids = ids
+        self.numeriques = numeriques
+        self.genres = genres
+        self.genres_films = genres_films
+        self.objets = objets
+
+        self.position_genre = {genre: i for i, genre in enumerate(genres)}
+        # Structures dérivées : reprises telles quelles si fournies (snapshot), sinon calculées
+        self.matrice_genres = matrice_genres if matrice_genres is not None else self._construire_matrice_genres()
+        # Recherche d'une ligne par id : dichotomie dans les ids triés (pas de dict par film)
+        self._lignes_par_id = lignes_par_id if lignes_par_id is not None else np.argsort(ids, kind="stable")
+        self._ids_tries = ids[self._lignes_par_id]
+
+    @classmethod
+    def depuis_films(cls, films: Iterable[Film]) -> "Catalogue":
+        """Construit le catalogue à partir d'une liste de dictionnaires film."""
+        films = list(films)
+        nb = len(films)
+
+        ids = np.fromiter((_en_id(f.get("id")) for f in films), dtype=np.int64, count=nb)
+        numeriques = {
+            nom: np.fromiter((_en_float(f.get(nom)) for f in films), dtype=dtype, count=nb)
+            for nom, dtype in COLONNES_NUMERIQUES.items()
+        }
+
+        tuples_genres: Dict[tuple, tuple] = {}
+        genres_films = []
+        for film in films:
+            genres_film = tuple(_interner(g) for g in (film.get("genres") or []) if isinstance(g, str))
+            genres_films.append(tuples_genres.setdefault(genres_film, genres_film))
+        genres = sorted({g for genres_film in tuples_genres for g in genres_film})
+
+        cles = {"id", "genres", *COLONNES_NUMERIQUES}
+        noms_objets = []
+        for film in films:
+            for nom in film:
+                if nom not in cles:
+                    cles.add(nom)
+                    noms_objets.append(nom)
+        objets = {
+            nom: [_interner(f.get(nom, _ABSENT)) for f in films]
+            for nom in noms_objets
+        }
+
+        return cls(ids, numeriques, genres, genres_films, objets)
+
+    def _construire_matrice_genres(self) -> np.ndarray:
+        """Matrice de bits (nb_films x ceil(nb_genres / 8)) des genres de chaque film."""
+        booleens = np.zeros((len(self.ids), max(len(self.genres), 1)), dtype=bool)
+        for ligne, genres_film in enumerate(self.genres_films):
+            for genre in genres_film:
+                booleens[ligne, self.position_genre[genre]] = True
+        return np.packbits(booleens, axis=1)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator[Film]:
+        return (self.film(ligne) for ligne in range(len(self)))
+
+    def __getitem__(self, ligne: int) -> Film:
+        return self.film(ligne)
+
+    def masque_genres(self, genres: Iterable[str]) -> np.ndarray:
+        """Masque de bits (une ligne) correspondant à la liste de genres."""
+        booleens = np.zeros(self.matrice_genres.shape[1] * 8, dtype=bool)
+        for genre in genres:
+            if genre in self.position_genre:
+                booleens[self.position_genre[genre]] = True
+        return np.packbits(booleens)
+
+    def lignes_avec_genres(self, genres: Iterable[str]) -> np.ndarray:
+        """Tableau booléen : True pour les films ayant au moins un des genres."""
+        return (self.matrice_genres & self.masque_genres(genres)).any(axis=1)
+
+    def nb_genres_communs(self, genres: Iterable[str]) -> np.ndarray:
+        """Nombre de genres de la liste partagés par chaque film."""
+        communs = self.matrice_genres & self.masque_genres(genres)
+        return np.unpackbits(communs, axis=1).sum(axis=1)
+
+    def ligne(self, film_id) -> Optional[int]:
+        """Retourne la ligne du film d'identifiant `film_id`, ou None."""
+        film_id = _en_id(film_id)
+        if film_id < 0:
+            return None
+        position = int(np.searchsorted(self._ids_tries, film_id))
+        if position < len(self._ids_tries) and self._ids_tries[position] == film_id:
+            return int(self._lignes_par_id[position])
+        return None
+
+    def lignes(self, film_ids) -> np.ndarray:
+        """Version vectorisée de `ligne` : lignes des identifiants donnés (-1 si absents)."""
+        film_ids = np.asarray(film_ids, dtype=np.int64)
+        if len(self._ids_tries) == 0:
+            return np.full(film_ids.shape, -1, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(self._ids_tries, film_ids), len(self._ids_tries) - 1)
+        trouves = (self._ids_tries[positions] == film_ids) & (film_ids >= 0)
+        return np.where(trouves, self._lignes_par_id[positions], -1)
+
+    def colonne(self, nom: str) -> Union[np.ndarray, list]:
+        """Retourne une colonne (tableau NumPy ou liste) sans matérialiser les films."""
+        if nom == "id":
+            return self.ids
+        if nom in self.numeriques:
+            return self.numeriques[nom]
+        if nom == "genres":
+            return self.genres_films
+        return self.objets.get(nom, [_ABSENT] * len(self))
+
+    def valeur(self, ligne: int, nom: str, defaut=None):
+        """Retourne un champ d'un film sans matérialiser le dictionnaire."""
+        valeur = self.colonne(nom)[ligne]
+        if valeur is _ABSENT:
+            return defaut
+        if isinstance(valeur, np.floating) and math.isnan(valeur):
+            return defaut
+        return valeur
+
+    def film(self, ligne: int) -> Film:
+        """Matérialise le dictionnaire du film de la ligne `ligne`."""
+        film: Film = {}
+        film_id = int(self.ids[ligne])
+        if film_id >= 0:
+            film["id"] = film_id
+        film["genres"] = list(self.genres_films[ligne])
+        for nom, colonne in self.numeriques.items():
+            valeur = float(colonne[ligne])
+            if not math.isnan(valeur):
+                film[nom] = int(valeur) if nom == "release_year" else valeur
+        for nom, colonne in self.objets.items():
+            valeur = colonne[ligne]
+            if valeur is not _ABSENT:
+                film[nom] = valeur
+        return film
+
+    def films(self, lignes: Sequence[int]) -> List[Film]:
+        """Matérialise les films des lignes données (dans cet ordre)."""
+        return [self.film(int(ligne)) for ligne in lignes]
+
+
+def en_catalogue(films: Union[Catalogue, Iterable[Film]]) -> Catalogue:
+    """Retourne `films` tel quel si c'est déjà un Catalogue, sinon le convertit."""
+    if isinstance(films, Catalogue):
+        return films
+    return Catalogue.depuis_films(films)
@@ -3,6 +3,8 @@
 # Module de Gémima : chargement et préparation des données films
 # Utilise la librairie du projet (lib_projet)
 
+import ast
+
 import pandas as pd
 from lib_projet import parser_genres, get_main_genre, extraire_annee
 
@@ -71,3 +73,26 @@ def charger_films_prepares(path_csv: str):
     df = charger_dataframe(path_csv)
     films = construire_liste_films(df)
     return films
+
+
+def charger_films_enrichis(path_csv: str):
+    """
+    Charge un CSV de films déjà préparés / enrichis (ex: films_enriched_complete.csv)
+    et reconvertit la colonne "genres" (sauvegardée en chaîne) en liste.
+    """
+    return films_enrichis_depuis_dataframe(pd.read_csv(path_csv))
+
+
+def films_enrichis_depuis_dataframe(df: pd.DataFrame):
+    """
+    Convertit un DataFrame de films enrichis (CSV, dataset Hugging Face) en liste
+    de dictionnaires, avec la colonne "genres" reconvertie en liste.
+    """
+    films = df.to_dict(orient="records")
+    for film in films:
+        if isinstance(film.get("genres"), str):
+            try:
+                film["genres"] = ast.literal_eval(film["genres"])
+            except Exception:
+                film["genres"] = []
+    return films
@@ -0,0 +1,195 @@
+"""Détecteurs de visages (Haar ou réseau DNN d'OpenCV sur CPU), chargés une fois et réutilisés.
+
+Les détecteurs OpenCV ne sont pas garantis thread-safe : chaque instance n'est
+utilisée que par un thread à la fois. Les instances sont gardées dans un pool et
+réutilisées d'une requête à l'autre ; une nouvelle instance n'est chargée que si
+toutes les autres sont occupées (au plus une par requête simultanée).
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Set, Tuple, Type
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Détecteur utilisé : "haar" (par défaut) ou "dnn" (SSD ResNet-10 d'OpenCV, plus robuste, sur CPU)
+DETECTEUR_VISAGE = os.getenv("DETECTEUR_VISAGE", "haar").lower()
+# Fichiers du détecteur DNN (deploy.prototxt et res10_300x300_ssd_iter_140000.caffemodel)
+DETECTEUR_DNN_PROTOTXT = os.getenv("DETECTEUR_DNN_PROTOTXT", "")
+DETECTEUR_DNN_MODELE = os.getenv("DETECTEUR_DNN_MODELE", "")
+# Confiance minimale d'une détection DNN
+DETECTEUR_DNN_CONFIANCE_MIN = float(os.getenv("DETECTEUR_DNN_CONFIANCE_MIN", "0.5"))
+# Taille minimale (px) d'un visage
+TAILLE_VISAGE_MIN = 50
+
+Boite = Tuple[int, int, int, int]
+
+
+class DetecteurHaar:
+    """Cascade de Haar frontale d'OpenCV (rapide, sensible à l'orientation et à l'éclairage)."""
+
+    nom = "haar"
+
+    def __init__(self):
+        chemin = cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+        self._cascade = cv2.CascadeClassifier(chemin)
+        if self._cascade.empty():
+            raise RuntimeError(f"Cascade de Haar introuvable ou illisible: {chemin}")
+
+    def detecter(self, img: np.ndarray) -> List[Boite]:
+        """Visages (x, y, w, h) d'une image BGR ou en niveaux de gris."""
+        gris = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+        visages = self._cascade.detectMultiScale(gris, 1.1, 4, minSize=(TAILLE_VISAGE_MIN, TAILLE_VISAGE_MIN))
+        return [tuple(int(v) for v in visage) for visage in visages]
+
+
+class DetecteurDNN:
+    """Détecteur SSD ResNet-10 (Caffe) exécuté par le module dnn d'OpenCV sur CPU."""
+
+    nom = "dnn"
+    # Taille d'entrée du réseau et moyennes BGR soustraites
+    TAILLE_ENTREE = (300, 300)
+    MOYENNES = (104.0, 177.0, 123.0)
+
+    def __init__(self):
+        if not (os.path.isfile(DETECTEUR_DNN_PROTOTXT) and os.path.isfile(DETECTEUR_DNN_MODELE)):
+            raise RuntimeError(
+                "Modèle DNN introuvable : définissez DETECTEUR_DNN_PROTOTXT et DETECTEUR_DNN_MODELE"
+            )
+        self._reseau = cv2.dnn.readNetFromCaffe(DETECTEUR_DNN_PROTOTXT, DETECTEUR_DNN_MODELE)
+        self._reseau.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self._reseau.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+
+    def detecter(self, img: np.ndarray) -> List[Boite]:
+        """Visages (x, y, w, h) d'une image BGR ou en niveaux de gris."""
+        bgr = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR) if img.ndim == 2 else img
+        hauteur, largeur = bgr.shape[:2]
+        blob = cv2.dnn.blobFromImage(cv2.resize(bgr, self.TAILLE_ENTREE), 1.0, self.TAILLE_ENTREE, self.MOYENNES)
+        self._reseau.setInput(blob)
+        detections = self._reseau.forward()[0, 0]
+        visages = []
+        for _, _, confiance, x1, y1, x2, y2 in detections:
+            if confiance < DETECTEUR_DNN_CONFIANCE_MIN:
+                continue
+            x1, x2 = int(max(x1, 0.0) * largeur), int(min(x2, 1.0) * largeur)
+            y1, y2 = int(max(y1, 0.0) * hauteur), int(min(y2, 1.0) * hauteur)
+            if x2 - x1 >= TAILLE_VISAGE_MIN and y2 - y1 >= TAILLE_VISAGE_MIN:
+                visages.append((x1, y1, x2 - x1, y2 - y1))
+        return visages
+
+
+# Types de détecteurs disponibles (nom -> classe) ; enregistrer_detecteur en ajoute
+DETECTEURS: Dict[str, Type] = {DetecteurHaar.nom: DetecteurHaar, DetecteurDNN.nom: DetecteurDNN}
+
+# Instances libres, par type de détecteur
+_pools: Dict[str, "queue.SimpleQueue"] = {}
+# Types qui n'ont pas pu être chargés (remplacés par Haar)
+_indisponibles: Set[str] = set()
+_metriques: Dict[str, Dict[str, float]] = {}
+_verrou = threading.Lock()
+
+
+def enregistrer_detecteur(nom: str, classe: Type) -> None:
+    """Ajoute (ou remplace) un type de détecteur ; `classe()` charge le modèle, `.detecter(img)` rend les boîtes."""
+    with _verrou:
+        DETECTEURS[nom] = classe
+        _pools.pop(nom, None)
+        _indisponibles.discard(nom)
+
+
+def nom_detecteur() -> str:
+    """Type de détecteur configuré ; Haar si le type demandé est inconnu ou n'a pas pu être chargé."""
+    if DETECTEUR_VISAGE in DETECTEURS and DETECTEUR_VISAGE not in _indisponibles:
+        return DETECTEUR_VISAGE
+    return DetecteurHaar.nom
+
+
+def _charger(nom: str):
+    """Charge une instance du détecteur `nom` et met à jour ses métriques de chargement."""
+    debut = time.perf_counter()
+    detecteur = DETECTEURS[nom]()
+    duree_ms = (time.perf_counter() - debut) * 1000
+    with _verrou:
+        metriques = _metriques.setdefault(
+            nom, {"instances": 0, "duree_chargement_ms": 0.0, "duree_prechauffage_ms": 0.0}
+        )
+        metriques["instances"] += 1
+        metriques["duree_chargement_ms"] = round(duree_ms, 2)
+    logger.info(f"🙂 Détecteur de visages '{nom}' chargé en {duree_ms:.1f} ms")
+    return detecteur
+
+
+def _emprunter(nom: str) -> Tuple[str, object]:
+    """Instance libre du détecteur `nom` (chargée si aucune n'est libre) ; repli sur Haar en cas d'échec."""
+    with _verrou:
+        pool = _pools.setdefault(nom, queue.SimpleQueue())
+    try:
+        return nom, pool.get_nowait()
+    except queue.Empty:
+        pass
+    try:
+        return nom, _charger(nom)
+    except Exception as e:
+        if nom == DetecteurHaar.nom:
+            raise
+        logger.warning(f"⚠️  Détecteur de visages '{nom}' indisponible ({e}) : repli sur Haar")
+        _indisponibles.add(nom)
+        return _emprunter(DetecteurHaar.nom)
+
+
+def _rendre(nom: str, detecteur) -> None:
+    with _verrou:
+        pool = _pools.get(nom)
+    if pool is not None:
+        pool.put(detecteur)
+
+
+@contextmanager
+def detecteur_visage() -> Iterator:
+    """Prête le détecteur configuré, réservé au thread appelant jusqu'à la fin du bloc `with`."""
+    nom, detecteur = _emprunter(nom_detecteur())
+    try:
+        yield detecteur
+    finally:
+        _rendre(nom, detecteur)
+
+
+def detecter_visages(img: np.ndarray) -> List[Boite]:
+    """Visages (x, y, w, h) de l'image avec le détecteur configuré."""
+    with detecteur_visage() as detecteur:
+        return detecteur.detecter(img)
+
+
+def prechauffer_detecteurs(nb_instances: int = 1) -> None:
+    """Charge `nb_instances` détecteurs et leur fait traiter une image vide (allocations faites d'avance)."""
+    image = np.zeros((240, 320, 3), dtype=np.uint8)
+    empruntes = []
+    debut = time.perf_counter()
+    try:
+        for _ in range(max(nb_instances, 1)):
+            empruntes.append(_emprunter(nom_detecteur()))
+            empruntes[-1][1].detecter(image)
+    except Exception as e:
+        logger.warning(f"⚠️  Préchauffage du détecteur de visages impossible: {e}")
+    finally:
+        for nom, detecteur in empruntes:
+            _rendre(nom, detecteur)
+    duree_ms = (time.perf_counter() - debut) * 1000
+    with _verrou:
+        for nom in {nom for nom, _ in empruntes}:
+            _metriques[nom]["duree_prechauffage_ms"] = round(duree_ms, 2)
+
+
+def metriques_detecteurs() -> Dict[str, object]:
+    """Détecteur utilisé et, par type chargé : nombre d'instances, durées de chargement et de préchauffage (ms)."""
+    with _verrou:
+        return {"detecteur": nom_detecteur(), "chargements": {nom: dict(m) for nom, m in _metriques.items()}}
@@ -4,14 +4,15 @@ from __future__ import annotations
 
 import base64
 import io
-import tempfile
-from pathlib import Path
-from typing import Dict, Optional, Tuple
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
 
 import cv2
 import numpy as np
 from PIL import Image
 
+from detection_visage import detecter_visages
+
 # Essayer d'importer deepface pour la détection d'émotion par deep learning
 try:
     from deepface import DeepFace
@@ -38,6 +39,103 @@ EMOTION_FALLBACK = {
     "nostalgique": "sad",  # Tristesse peut être nostalgique
 }
 
+# Sorties du modèle d'émotions de DeepFace (dans l'ordre) et taille de son entrée (visage gris carré)
+ETIQUETTES_EMOTIONS = ("angry", "disgust", "fear", "happy", "sad", "surprise", "neutral")
+TAILLE_ENTREE_EMOTION = 48
+# Largeur (px) à laquelle les images du suivi temps réel sont réduites avant détection
+LARGEUR_ANALYSE_QUALITE = 320
+# Suivi d'un flux webcam : taille des vignettes comparées d'une image à l'autre, écart moyen
+# (niveaux de gris 0-255) en dessous duquel une image est considérée inchangée, détection sur
+# toute l'image forcée toutes les N images, marge (en fraction de la boîte) de la zone de recherche
+TAILLE_VIGNETTE_SUIVI = (64, 48)
+SEUIL_CHANGEMENT_IMAGE = 3.0
+INTERVALLE_DETECTION_COMPLETE = 10
+MARGE_ZONE_SUIVI = 0.5
+
+
+def _construire_modele_emotion():
+    """Construit le modèle Keras d'émotions de DeepFace (l'API a changé selon les versions)."""
+    try:
+        client = DeepFace.build_model(task="facial_attribute", model_name="Emotion")
+    except TypeError:
+        client = DeepFace.build_model("Emotion")
+    # Versions récentes : client qui encapsule le modèle Keras ; anciennes : le modèle lui-même
+    return getattr(client, "model", client)
+
+
+def pretraiter_visage(visage_bgr: np.ndarray) -> np.ndarray:
+    """Recadrage BGR (ou gris) du visage -> entrée du modèle (48, 48, 1), valeurs dans [0, 1]."""
+    gris = cv2.cvtColor(visage_bgr, cv2.COLOR_BGR2GRAY) if visage_bgr.ndim == 3 else visage_bgr
+    gris = cv2.resize(gris, (TAILLE_ENTREE_EMOTION, TAILLE_ENTREE_EMOTION), interpolation=cv2.INTER_AREA)
+    return (gris.astype(np.float32) / 255.0)[:, :, np.newaxis]
+
+
+class ClassificationIndisponible(RuntimeError):
+    """Classification refusée (service d'inférence saturé ou arrêté) : remontée telle quelle à l'appelant."""
+
+
+class ClassifieurEmotions:
+    """
+    Modèle d'émotions construit une fois et gardé en mémoire.
+
+    Prend directement les recadrages NumPy des visages (aucun fichier temporaire,
+    aucun encodage JPEG) et peut en classer plusieurs en une seule passe.
+    """
+
+    def __init__(self, modele=None):
+        self._modele = modele if modele is not None else _construire_modele_emotion()
+        # Un seul appel au modèle à la fois par instance
+        self._verrou = threading.Lock()
+
+    def predire_lot(self, visages: List[np.ndarray]) -> List[Dict[str, float]]:
+        """Scores (en %) de chaque émotion pour chaque visage, en une passe du modèle."""
+        if not visages:
+            return []
+        return self.predire_entrees(np.stack([pretraiter_visage(visage) for visage in visages]))
+
+    def predire_entrees(self, entree: np.ndarray) -> List[Dict[str, float]]:
+        """Scores (en %) pour un lot de visages déjà prétraités, de forme (n, 48, 48, 1)."""
+        with self._verrou:
+            probabilites = np.asarray(self._modele.predict(entree, verbose=0))
+        return [
+            {etiquette: float(p) * 100.0 for etiquette, p in zip(ETIQUETTES_EMOTIONS, ligne)}
+            for ligne in probabilites
+        ]
+
+    def predire(self, visage: np.ndarray) -> Dict[str, float]:
+        return self.predire_lot([visage])[0]
+
+
+_classifieur: Optional[ClassifieurEmotions] = None
+_verrou_classifieur = threading.Lock()
+
+
+def classifieur_emotions() -> ClassifieurEmotions:
+    """Classifieur partagé du processus, construit au premier appel."""
+    global _classifieur
+    with _verrou_classifieur:
+        if _classifieur is None:
+            _classifieur = ClassifieurEmotions()
+        return _classifieur
+
+
+def prechauffer_classifieur_emotions() -> None:
+    """Construit le classifieur et lui fait traiter un visage vide (à lancer au démarrage, en arrière-plan)."""
+    if not DEEPFACE_AVAILABLE:
+        return
+    try:
+        classifieur_emotions().predire(np.zeros((TAILLE_ENTREE_EMOTION, TAILLE_ENTREE_EMOTION, 3), dtype=np.uint8))
+    except Exception as e:
+        print(f"⚠️  Préchauffage du modèle d'émotions impossible: {e}")
+
+
+def emotion_dominante(scores: Dict[str, float]) -> Tuple[Optional[str], float]:
+    """(émotion de l'app, confiance 0-1) à partir des scores en % du modèle."""
+    if not scores:
+        return None, 0.0
+    emotion_key, score = max(scores.items(), key=lambda x: x[1])
+    return EMOTION_MAPPING.get(str(emotion_key).lower(), "neutre"), float(score) / 100.0
+
 
 def _analyser_qualite_image(img: np.ndarray, face_bbox: Optional[Tuple[int, int, int, int]] = None) -> Dict[str, any]:
     """
@@ -50,7 +148,7 @@ def _analyser_qualite_image(img: np.ndarray, face_bbox: Optional[Tuple[int, int,
     - face_size_ratio: ratio de la taille du visage par rapport à l'image
     - messages: liste de messages d'aide
     """
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
     messages = []
     
     # Calculer la luminosité (convertie en float Python pour compat JSON)
@@ -110,9 +208,124 @@ def _analyser_qualite_image(img: np.ndarray, face_bbox: Optional[Tuple[int, int,
     }
 
 
-def detecter_emotion_image(image_data: bytes) -> Dict[str, any]:
+def _qualite_image_illisible() -> Dict[str, any]:
+    return {
+        "brightness": 0,
+        "brightness_status": "erreur",
+        "face_detected": False,
+        "face_size_ratio": 0,
+        "messages": ["❌ Impossible de décoder l'image. Vérifiez le format."]
+    }
+
+
+def _decoder_image_suivi(image_data: bytes) -> Tuple[Optional[np.ndarray], float]:
+    """Image décodée en niveaux de gris et réduite à LARGEUR_ANALYSE_QUALITE de large, et son facteur de réduction."""
+    nparr = np.frombuffer(image_data, np.uint8)
+    gray = cv2.imdecode(nparr, cv2.IMREAD_GRAYSCALE)
+    if gray is None:
+        return None, 1.0
+    echelle = min(1.0, LARGEUR_ANALYSE_QUALITE / gray.shape[1])
+    if echelle < 1.0:
+        gray = cv2.resize(gray, None, fx=echelle, fy=echelle, interpolation=cv2.INTER_AREA)
+    return gray, echelle
+
+
+def _plus_grand_visage(faces: List[Tuple[int, int, int, int]]) -> Optional[Tuple[int, int, int, int]]:
+    return max(faces, key=lambda f: f[2] * f[3]) if len(faces) > 0 else None
+
+
+def _agrandir_bbox(face_bbox: Optional[Tuple[int, int, int, int]], echelle: float) -> Optional[Tuple[int, int, int, int]]:
+    """Ramène une boîte de l'image réduite aux coordonnées de l'image reçue."""
+    return tuple(int(round(v / echelle)) for v in face_bbox) if face_bbox is not None else None
+
+
+def analyser_qualite_visage(image_data: bytes) -> Dict[str, any]:
+    """
+    Encadrement du visage et qualité de l'image seulement, sans classification d'émotion.
+
+    Utilisé par le suivi en temps réel de la webcam : l'image est décodée en niveaux
+    de gris et réduite à LARGEUR_ANALYSE_QUALITE pixels de large avant la détection.
+    Retourne face_bbox (coordonnées de l'image reçue) et quality.
+    """
+    gray, echelle = _decoder_image_suivi(image_data)
+    if gray is None:
+        return {"face_bbox": None, "quality": _qualite_image_illisible()}
+
+    face_bbox = _plus_grand_visage(detecter_visages(gray))
+    quality = _analyser_qualite_image(gray, face_bbox)
+    return {"face_bbox": _agrandir_bbox(face_bbox, echelle), "quality": quality}
+
+
+class SuiviVisage:
+    """
+    Suivi du visage sur un flux d'images webcam (une instance par connexion).
+
+    Garde la dernière image analysée, la dernière boîte et le dernier résultat :
+    - image presque identique à la dernière analysée : le résultat est réutilisé ;
+    - sinon, le visage est d'abord cherché autour de sa dernière position, et
+      sur toute l'image s'il n'y est plus (ou toutes les INTERVALLE_DETECTION_COMPLETE
+      images).
+    Le champ "detection" du résultat vaut "reutilisee", "zone" ou "complete".
+    """
+
+    def __init__(self):
+        self._vignette: Optional[np.ndarray] = None
+        self._face_bbox: Optional[Tuple[int, int, int, int]] = None
+        self._resultat: Optional[Dict[str, any]] = None
+        self._depuis_detection_complete = 0
+
+    def _detecter_dans_zone(self, gray: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
+        """Visage cherché dans la zone de la dernière boîte, agrandie de MARGE_ZONE_SUIVI de chaque côté."""
+        x, y, w, h = self._face_bbox
+        marge = int(max(w, h) * MARGE_ZONE_SUIVI)
+        x0, y0 = max(x - marge, 0), max(y - marge, 0)
+        x1, y1 = min(x + w + marge, gray.shape[1]), min(y + h + marge, gray.shape[0])
+        face_bbox = _plus_grand_visage(detecter_visages(gray[y0:y1, x0:x1]))
+        if face_bbox is None:
+            return None
+        fx, fy, fw, fh = face_bbox
+        return fx + x0, fy + y0, fw, fh
+
+    def analyser(self, image_data: bytes) -> Dict[str, any]:
+        """face_bbox (coordonnées de l'image reçue), quality et type de détection pour une image du flux."""
+        gray, echelle = _decoder_image_suivi(image_data)
+        if gray is None:
+            return {"face_bbox": None, "quality": _qualite_image_illisible(), "detection": "erreur"}
+
+        vignette = cv2.resize(gray, TAILLE_VIGNETTE_SUIVI, interpolation=cv2.INTER_AREA)
+        if self._resultat is not None and float(np.mean(cv2.absdiff(vignette, self._vignette))) < SEUIL_CHANGEMENT_IMAGE:
+            return {**self._resultat, "detection": "reutilisee"}
+
+        face_bbox = None
+        detection = "complete"
+        if self._face_bbox is not None and self._depuis_detection_complete < INTERVALLE_DETECTION_COMPLETE:
+            face_bbox = self._detecter_dans_zone(gray)
+            detection = "zone"
+        if face_bbox is None:
+            face_bbox = _plus_grand_visage(detecter_visages(gray))
+            detection = "complete"
+            self._depuis_detection_complete = 0
+        else:
+            self._depuis_detection_complete += 1
+
+        self._vignette = vignette
+        self._face_bbox = face_bbox
+        self._resultat = {
+            "face_bbox": _agrandir_bbox(face_bbox, echelle),
+            "quality": _analyser_qualite_image(gray, face_bbox),
+        }
+        return {**self._resultat, "detection": detection}
+
+
+def detecter_emotion_image(
+    image_data: bytes,
+    predire: Optional[Callable[[np.ndarray], Dict[str, float]]] = None,
+) -> Dict[str, any]:
     """
     Détecte l'émotion à partir d'une image (webcam ou upload) avec deep learning.
+
+    `predire` classe le recadrage du visage (scores en %) ; par défaut, le
+    classifieur du processus. Une ClassificationIndisponible est propagée.
     
     Retourne un dictionnaire avec:
     - emotion: émotion détectée (str) ou None
@@ -139,10 +352,9 @@ def detecter_emotion_image(image_data: bytes) -> Dict[str, any]:
                 "confidence": 0.0
             }
         
-        # Détecter le visage avec OpenCV
-        face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+        # Détecter le visage avec OpenCV (détecteur chargé une fois et réutilisé)
         gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        faces = face_cascade.detectMultiScale(gray, 1.1, 4, minSize=(50, 50))
+        faces = detecter_visages(gray)
         
         face_bbox = None
         if len(faces) > 0:
@@ -168,41 +380,13 @@ def detecter_emotion_image(image_data: bytes) -> Dict[str, any]:
         
         if DEEPFACE_AVAILABLE:
             try:
-                # Extraire la région du visage
+                # Extraire la région du visage et la classer directement (en mémoire)
                 x, y, w, h = face_bbox
                 face_roi = img[y:y+h, x:x+w]
-                
-                # Sauvegarder temporairement pour DeepFace
-                with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as tmp_file:
-                    tmp_path = tmp_file.name
-                    cv2.imwrite(tmp_path, face_roi)
-                
-                try:
-                    # Analyser avec DeepFace
-                    result = DeepFace.analyze(
-                        img_path=tmp_path,
-                        actions=['emotion'],
-                        enforce_detection=False,
-                        silent=True
-                    )
-                    
-                    # Extraire l'émotion dominante
-                    if isinstance(result, list):
-                        result = result[0]
-                    
-                        emotions = result.get('emotion', {})
-                        if emotions:
-                            # Trouver l'émotion avec la plus haute confiance
-                            emotion_key, score = max(emotions.items(), key=lambda x: x[1])
-                            confidence = float(score) / 100.0  # np.float32 -> float
-                            
-                            # Mapper vers nos émotions
-                            emotion_detected = EMOTION_MAPPING.get(str(emotion_key).lower(), "neutre")
-                        
-                finally:
-                    # Nettoyer le fichier temporaire
-                    Path(tmp_path).unlink(missing_ok=True)
-                    
+                predire = predire or classifieur_emotions().predire
+                emotion_detected, confidence = emotion_dominante(predire(face_roi))
+            except ClassificationIndisponible:
+                raise
             except Exception as e:
                 print(f"⚠️  Erreur DeepFace: {e}")
                 # Fallback vers méthode simple si DeepFace échoue
@@ -220,6 +404,8 @@ def detecter_emotion_image(image_data: bytes) -> Dict[str, any]:
             "confidence": float(confidence)
         }
         
+    except ClassificationIndisponible:
+        raise
     except Exception as e:
         print(f"❌ Erreur détection émotion: {e}")
         import traceback
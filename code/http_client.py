@@ -0,0 +1,125 @@
+"""Client HTTP partagé : une session par hôte (pool de connexions keep-alive) avec reprises automatiques.
+
+Les échecs de connexion sont repris par l'adaptateur (la requête n'a pas atteint le
+serveur). Les statuts 429 / 5xx sont repris par `get`, qui appelle `acquerir` (le
+limiteur de débit de l'appelant) avant chaque essai : une reprise consomme un jeton
+du quota comme une requête normale.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# Nombre maximal de connexions gardées ouvertes par hôte (à aligner sur la concurrence des appels)
+HTTP_CONNEXIONS_PAR_HOTE = int(os.getenv("HTTP_CONNEXIONS_PAR_HOTE", "16"))
+# Nombre de reprises sur erreur réseau ou statut 429 / 5xx, et facteur d'attente exponentielle (s)
+HTTP_NB_REPRISES = int(os.getenv("HTTP_NB_REPRISES", "3"))
+HTTP_FACTEUR_ATTENTE = float(os.getenv("HTTP_FACTEUR_ATTENTE", "0.5"))
+# Attente maximale (s) avant une reprise, même si l'en-tête Retry-After demande plus
+HTTP_ATTENTE_MAX = float(os.getenv("HTTP_ATTENTE_MAX", "30"))
+# Délai par défaut (s) si l'appelant n'en précise pas
+HTTP_DELAI_DEFAUT = float(os.getenv("HTTP_DELAI_DEFAUT", "5"))
+
+STATUTS_A_REPRENDRE = (429, 500, 502, 503, 504)
+
+_sessions: Dict[str, requests.Session] = {}
+_verrou_sessions = threading.Lock()
+
+
+def _politique_reprise() -> Retry:
+    """Reprises des seuls échecs de connexion ; les statuts 429 / 5xx sont repris par `get`, via le limiteur."""
+    return Retry(
+        total=HTTP_NB_REPRISES,
+        connect=HTTP_NB_REPRISES,
+        # Une erreur de lecture ou un statut signifie que la requête a atteint le serveur (et compté dans son quota)
+        read=0,
+        status=0,
+        backoff_factor=HTTP_FACTEUR_ATTENTE,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        raise_on_status=False,
+    )
+
+
+def _attente_avant_reprise(response: requests.Response, essai: int) -> float:
+    """Attente (s) demandée par l'en-tête Retry-After (secondes ou date HTTP), sinon exponentielle."""
+    retry_after = response.headers.get("Retry-After")
+    attente = None
+    if retry_after:
+        try:
+            attente = float(retry_after)
+        except ValueError:
+            try:
+                attente = parsedate_to_datetime(retry_after).timestamp() - time.time()
+            except (TypeError, ValueError):
+                attente = None
+    if attente is None:
+        attente = HTTP_FACTEUR_ATTENTE * (2 ** essai)
+    return min(max(attente, 0.0), HTTP_ATTENTE_MAX)
+
+
+def _nouvelle_session() -> requests.Session:
+    session = requests.Session()
+    adaptateur = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=HTTP_CONNEXIONS_PAR_HOTE,
+        max_retries=_politique_reprise(),
+    )
+    session.mount("https://", adaptateur)
+    session.mount("http://", adaptateur)
+    return session
+
+
+def session_pour(url: str) -> requests.Session:
+    """Session partagée (thread-safe) de l'hôte de `url`, créée au premier appel."""
+    hote = urlsplit(url).netloc.lower()
+    session = _sessions.get(hote)
+    if session is None:
+        with _verrou_sessions:
+            session = _sessions.get(hote)
+            if session is None:
+                session = _sessions[hote] = _nouvelle_session()
+                logger.debug(f"🔌 Nouveau pool de connexions HTTP pour {hote}")
+    return session
+
+
+def get(url: str, acquerir: Optional[Callable[[], None]] = None, **kwargs) -> requests.Response:
+    """
+    GET via la session de l'hôte : connexions réutilisées, reprises sur 429 / 5xx.
+
+    `acquerir` (ex. `limiteur_tmdb.acquerir`) est appelé avant chaque essai, reprises
+    comprises. Après la dernière reprise, la réponse (429, 503...) est rendue à l'appelant.
+    """
+    kwargs.setdefault("timeout", HTTP_DELAI_DEFAUT)
+    session = session_pour(url)
+    for essai in range(HTTP_NB_REPRISES + 1):
+        if acquerir is not None:
+            acquerir()
+        response = session.get(url, **kwargs)
+        if response.status_code not in STATUTS_A_REPRENDRE or essai == HTTP_NB_REPRISES:
+            return response
+        attente = _attente_avant_reprise(response, essai)
+        logger.debug(f"🔁 {response.status_code} sur {urlsplit(url).netloc} : reprise dans {attente:.1f} s")
+        response.close()
+        time.sleep(attente)
+    return response
+
+
+def fermer_sessions() -> None:
+    """Ferme toutes les sessions (et leurs connexions) ; elles seront recréées à la demande."""
+    with _verrou_sessions:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
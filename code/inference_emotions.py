@@ -0,0 +1,276 @@
+"""Service d'inférence des émotions : pool de processus, un modèle résident par worker, visages classés par lots.
+
+Les requêtes déposent le recadrage de leur visage dans une file bornée. Un thread
+de regroupement forme des lots (jusqu'à INFERENCE_TAILLE_LOT_MAX visages, en
+attendant au plus INFERENCE_ATTENTE_LOT_MS après le premier) et confie chaque lot
+à un worker, qui le classe en une seule passe du modèle. Au plus un lot par worker
+est en cours : le reste attend dans la file, qui refuse les nouvelles requêtes
+quand elle est pleine (FileInferencePleine, HTTP 429). Une requête qui attend plus
+de INFERENCE_DELAI_MAX_S est abandonnée (ServiceInferenceIndisponible, HTTP 503).
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as DelaiDepasse
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from emotion_detection import (
+    TAILLE_ENTREE_EMOTION,
+    ClassificationIndisponible,
+    classifieur_emotions,
+    pretraiter_visage,
+)
+
+logger = logging.getLogger(__name__)
+
+# Nombre de processus workers (0 : classification dans le thread de la requête, sans service).
+# Par processus web : chaque worker Gunicorn démarre son propre pool, soit workers Gunicorn x
+# INFERENCE_EMOTIONS_WORKERS modèles en mémoire ; à augmenter seulement avec un seul worker web
+INFERENCE_EMOTIONS_WORKERS = int(os.getenv("INFERENCE_EMOTIONS_WORKERS", "1"))
+# Nombre maximal de visages classés en une passe
+INFERENCE_TAILLE_LOT_MAX = int(os.getenv("INFERENCE_TAILLE_LOT_MAX", "16"))
+# Attente maximale (ms) pour compléter un lot après son premier visage
+INFERENCE_ATTENTE_LOT_MS = float(os.getenv("INFERENCE_ATTENTE_LOT_MS", "10"))
+# Nombre maximal de visages en attente ; au-delà, les requêtes sont refusées
+INFERENCE_TAILLE_FILE_MAX = int(os.getenv("INFERENCE_TAILLE_FILE_MAX", "64"))
+# Délai maximal (s) entre le dépôt d'un visage et son résultat
+INFERENCE_DELAI_MAX_S = float(os.getenv("INFERENCE_DELAI_MAX_S", "10"))
+# Méthode de démarrage des workers : "spawn" (processus neuf, modèle chargé par l'initialiseur).
+# Pas de "fork" : le processus de l'app a déjà importé TensorFlow et OpenCV et lancé leurs threads,
+# un fork peut bloquer les workers (et n'est pas disponible sous Windows, déconseillé sous macOS)
+INFERENCE_CONTEXTE = os.getenv("INFERENCE_EMOTIONS_CONTEXTE", "spawn")
+
+
+class FileInferencePleine(ClassificationIndisponible):
+    """Trop de visages en attente : la requête doit être retentée plus tard (HTTP 429)."""
+
+
+class ServiceInferenceIndisponible(ClassificationIndisponible):
+    """Service arrêté, workers en échec ou délai dépassé (HTTP 503)."""
+
+
+def _initialiser_worker() -> None:
+    """Construit le modèle du worker une fois pour toutes, au démarrage du processus."""
+    classifieur_emotions()
+
+
+def _predire_lot_worker(entree: np.ndarray) -> List[Dict[str, float]]:
+    """Classe un lot de visages prétraités avec le modèle résident du worker."""
+    return classifieur_emotions().predire_entrees(entree)
+
+
+class ServiceInferenceEmotions:
+    """
+    Pool de workers d'inférence alimenté par une file bornée de visages.
+
+    `predire(visage)` bloque le thread de la requête jusqu'au résultat ; les
+    visages de requêtes simultanées sont regroupés dans la même passe du modèle.
+    Les workers sont démarrés à la première utilisation (ou par `demarrer`).
+    """
+
+    def __init__(
+        self,
+        nb_workers: int = INFERENCE_EMOTIONS_WORKERS,
+        taille_lot_max: int = INFERENCE_TAILLE_LOT_MAX,
+        attente_lot_ms: float = INFERENCE_ATTENTE_LOT_MS,
+        taille_file_max: int = INFERENCE_TAILLE_FILE_MAX,
+        delai_max_s: float = INFERENCE_DELAI_MAX_S,
+        predire_lot: Callable[[np.ndarray], List[Dict[str, float]]] = _predire_lot_worker,
+        initialiseur: Optional[Callable[[], None]] = _initialiser_worker,
+        contexte: str = INFERENCE_CONTEXTE,
+    ):
+        self.nb_workers = max(nb_workers, 1)
+        self.taille_lot_max = max(taille_lot_max, 1)
+        self.attente_lot_s = attente_lot_ms / 1000.0
+        self.delai_max_s = delai_max_s
+        self._predire_lot = predire_lot
+        self._initialiseur = initialiseur
+        self._contexte = contexte
+        self._file: "queue.Queue" = queue.Queue(maxsize=max(taille_file_max, 1))
+        # Une place par worker : au plus un lot en cours par worker
+        self._places = threading.Semaphore(self.nb_workers)
+        self._executeur: Optional[ProcessPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._arrete = False
+        self._verrou = threading.Lock()
+        self._metriques = {
+            "requetes": 0, "lots": 0, "visages_classes": 0, "refus_file_pleine": 0, "delais_depasses": 0, "echecs": 0,
+        }
+
+    def demarrer(self) -> None:
+        """Démarre les workers (qui construisent leur modèle) et le thread de regroupement, s'ils ne tournent pas."""
+        with self._verrou:
+            if self._arrete:
+                raise ServiceInferenceIndisponible("Service d'inférence des émotions arrêté")
+            if self._thread is not None:
+                return
+            self._executeur = self._nouvel_executeur()
+            self._thread = threading.Thread(target=self._boucle, name="inference-emotions", daemon=True)
+            self._thread.start()
+        logger.info(f"🧠 Service d'inférence des émotions: {self.nb_workers} workers, lots de {self.taille_lot_max} visages max")
+
+    def _nouvel_executeur(self) -> ProcessPoolExecutor:
+        executeur = ProcessPoolExecutor(
+            max_workers=self.nb_workers,
+            mp_context=multiprocessing.get_context(self._contexte),
+            initializer=self._initialiseur,
+        )
+        # Lance les workers tout de suite (chargement des modèles) avec un visage vide par worker
+        vide = np.zeros((1, TAILLE_ENTREE_EMOTION, TAILLE_ENTREE_EMOTION, 1), dtype=np.float32)
+        for _ in range(self.nb_workers):
+            executeur.submit(self._predire_lot, vide)
+        return executeur
+
+    def prechauffer(self) -> None:
+        """Démarre le service et attend qu'il ait classé un visage vide (à lancer au démarrage, en arrière-plan)."""
+        try:
+            debut = time.perf_counter()
+            # Sans délai maximal : la construction des modèles peut prendre plusieurs secondes
+            self.soumettre(np.zeros((TAILLE_ENTREE_EMOTION, TAILLE_ENTREE_EMOTION, 3), dtype=np.uint8)).result()
+            logger.info(f"🧠 Workers d'inférence prêts en {time.perf_counter() - debut:.1f} s")
+        except Exception as e:
+            logger.warning(f"⚠️  Préchauffage du service d'inférence des émotions impossible: {e}")
+
+    def soumettre(self, visage: np.ndarray) -> Future:
+        """Dépose le recadrage d'un visage dans la file ; le Future reçoit ses scores (en %)."""
+        self.demarrer()
+        future: Future = Future()
+        try:
+            self._file.put_nowait((pretraiter_visage(visage), future))
+        except queue.Full:
+            with self._verrou:
+                self._metriques["refus_file_pleine"] += 1
+            raise FileInferencePleine("Trop de demandes d'analyse en cours, réessayez dans un instant.")
+        with self._verrou:
+            self._metriques["requetes"] += 1
+        return future
+
+    def predire(self, visage: np.ndarray) -> Dict[str, float]:
+        """Scores (en %) de chaque émotion pour le visage, classé avec ceux des autres requêtes en attente."""
+        future = self.soumettre(visage)
+        try:
+            return future.result(timeout=self.delai_max_s)
+        except DelaiDepasse:
+            # Un visage pas encore confié à un worker ne sera pas classé
+            future.cancel()
+            with self._verrou:
+                self._metriques["delais_depasses"] += 1
+            raise ServiceInferenceIndisponible("Analyse trop longue, le service est surchargé.")
+
+    def _prochain_lot(self) -> Optional[List[tuple]]:
+        """Attend un visage puis complète le lot pendant au plus attente_lot_s ; None à l'arrêt."""
+        premier = self._file.get()
+        if premier is None:
+            return None
+        lot = [premier]
+        echeance = time.monotonic() + self.attente_lot_s
+        while len(lot) < self.taille_lot_max:
+            reste = echeance - time.monotonic()
+            try:
+                element = self._file.get(timeout=reste) if reste > 0 else self._file.get_nowait()
+            except queue.Empty:
+                break
+            if element is None:
+                # Arrêt demandé : le lot en cours est traité, la boucle s'arrêtera ensuite
+                self._file.put(None)
+                break
+            lot.append(element)
+        # Les requêtes abandonnées (délai dépassé) sont écartées
+        return [(entree, future) for entree, future in lot if future.set_running_or_notify_cancel()]
+
+    def _boucle(self) -> None:
+        while True:
+            self._places.acquire()
+            lot = self._prochain_lot()
+            if lot is None:
+                self._places.release()
+                return
+            if not lot:
+                self._places.release()
+                continue
+            futures = [future for _, future in lot]
+            try:
+                tache = self._soumettre_lot(np.stack([entree for entree, _ in lot]))
+            except Exception as e:
+                self._places.release()
+                self._echec(futures, e)
+                continue
+            tache.add_done_callback(partial(self._distribuer, futures))
+
+    def _soumettre_lot(self, entree: np.ndarray) -> Future:
+        """Confie un lot aux workers ; un pool cassé (worker mort) est remplacé une fois."""
+        try:
+            return self._executeur.submit(self._predire_lot, entree)
+        except BrokenProcessPool:
+            logger.warning("⚠️  Workers d'inférence des émotions en échec : redémarrage du pool")
+            self._executeur.shutdown(wait=False, cancel_futures=True)
+            self._executeur = self._nouvel_executeur()
+            return self._executeur.submit(self._predire_lot, entree)
+
+    def _distribuer(self, futures: List[Future], tache: Future) -> None:
+        self._places.release()
+        try:
+            resultats = tache.result()
+        except Exception as e:
+            self._echec(futures, e)
+            return
+        with self._verrou:
+            self._metriques["lots"] += 1
+            self._metriques["visages_classes"] += len(futures)
+        for future, scores in zip(futures, resultats):
+            future.set_result(scores)
+
+    def _echec(self, futures: List[Future], erreur: Exception) -> None:
+        with self._verrou:
+            self._metriques["echecs"] += 1
+        if isinstance(erreur, BrokenProcessPool):
+            erreur = ServiceInferenceIndisponible(f"Workers d'inférence indisponibles: {erreur}")
+        for future in futures:
+            future.set_exception(erreur)
+
+    def statistiques(self) -> Dict[str, object]:
+        """Configuration, file d'attente et compteurs (requêtes, lots, taille moyenne des lots, refus)."""
+        with self._verrou:
+            metriques = dict(self._metriques)
+            actif = self._thread is not None and not self._arrete
+        metriques["taille_moyenne_lot"] = round(metriques["visages_classes"] / metriques["lots"], 2) if metriques["lots"] else 0.0
+        return {
+            "actif": actif,
+            "workers": self.nb_workers,
+            "taille_lot_max": self.taille_lot_max,
+            "en_attente": self._file.qsize(),
+            "taille_file_max": self._file.maxsize,
+            **metriques,
+        }
+
+    def arreter(self) -> None:
+        """Refuse les nouvelles requêtes, laisse finir les lots en cours et arrête les workers."""
+        with self._verrou:
+            if self._arrete:
+                return
+            self._arrete = True
+            thread = self._thread
+        # Les visages encore en file sont refusés
+        while True:
+            try:
+                element = self._file.get_nowait()
+            except queue.Empty:
+                break
+            if element is not None and element[1].set_running_or_notify_cancel():
+                element[1].set_exception(ServiceInferenceIndisponible("Service d'inférence des émotions arrêté"))
+        if thread is not None:
+            self._file.put(None)
+            thread.join()
+        if self._executeur is not None:
+            self._executeur.shutdown(wait=True)
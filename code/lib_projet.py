@@ -12,6 +12,8 @@
 
 import json
 from datetime import datetime
+
+import numpy as np
 from textblob import TextBlob
 
 
@@ -101,6 +103,15 @@ def normaliser_sentiment(score: float) -> float:
     return (score + 1.0) / 2.0
 
 
+def normaliser_sentiments(scores) -> np.ndarray:
+    """
+    Version vectorisée de normaliser_sentiment : tableau de scores [-1, 1] -> [0, 1].
+    Les valeurs absentes (NaN) sont traitées comme un sentiment neutre (0).
+    """
+    scores = np.nan_to_num(np.asarray(scores, dtype=np.float64), nan=0.0)
+    return (np.clip(scores, -1.0, 1.0) + 1.0) / 2.0
+
+
 # ---------- PARTIE "EMOTIONS & GENRES" ----------
 
 # Mapping émotion -> genres (enrichi pour avoir plus de recommandations)
@@ -118,6 +129,23 @@ emotion_to_genres = {
 
 # ---------- PARTIE "SCORING DE BASE" ----------
 
+# Poids du score global par défaut : sentiment du résumé et note du film
+POIDS_SCORE_DEFAUT = {"sentiment": 0.6, "note": 0.4}
+
+# Poids spécifiques à certaines émotions (les émotions absentes utilisent POIDS_SCORE_DEFAUT)
+# Exemple : "triste": {"sentiment": 0.8, "note": 0.2}
+POIDS_SCORE_PAR_EMOTION = {}
+
+
+def poids_score(emotion_user: str = None) -> dict:
+    """
+    Retourne les poids {"sentiment": w, "note": w} à utiliser pour une émotion.
+    """
+    if emotion_user:
+        return POIDS_SCORE_PAR_EMOTION.get(emotion_user.lower(), POIDS_SCORE_DEFAUT)
+    return POIDS_SCORE_DEFAUT
+
+
 def normaliser_note(note: float) -> float:
     """
     Normalise une note de film [0, 10] en [0, 1].
@@ -129,16 +157,26 @@ def normaliser_note(note: float) -> float:
     return note / 10.0
 
 
+def normaliser_notes(notes) -> np.ndarray:
+    """
+    Version vectorisée de normaliser_note : tableau de notes [0, 10] -> [0, 1].
+    Les notes absentes (NaN) valent 0.
+    """
+    notes = np.nan_to_num(np.asarray(notes, dtype=np.float64), nan=0.0)
+    return np.clip(notes, 0.0, 10.0) / 10.0
+
+
 def calculer_score_film(film: dict, emotion_user: str) -> float:
     """
     Calcule un score global pour un film en fonction :
         - du sentiment du texte (overview)
         - de la note moyenne du film
 
-    Pour l'instant, la formule est simple :
+    Par défaut, la formule est simple :
         score = 0.6 * sentiment_norm + 0.4 * note_norm
 
-    On pourra l'améliorer plus tard en fonction de emotion_user.
+    Les poids peuvent être ajustés par émotion (POIDS_SCORE_PAR_EMOTION).
+    Pour scorer de nombreux films, utiliser calculer_scores_films.
     """
     sentiment_score = film.get("sentiment_score", 0.0)
     sentiment_norm = normaliser_sentiment(sentiment_score)
@@ -146,8 +184,26 @@ def calculer_score_film(film: dict, emotion_user: str) -> float:
     note = film.get("vote_average", 0.0)
     note_norm = normaliser_note(note)
 
-    w_sentiment = 0.6
-    w_note = 0.4
+    poids = poids_score(emotion_user)
 
-    score = w_sentiment * sentiment_norm + w_note * note_norm
+    score = poids["sentiment"] * sentiment_norm + poids["note"] * note_norm
     return float(score)
+
+
+def calculer_scores_films(sentiment_scores, notes, emotion_user: str = None, poids: dict = None) -> np.ndarray:
+    """
+    Version vectorisée de calculer_score_film : calcule en une seule expression
+    NumPy les scores d'un lot de films.
+
+    Paramètres :
+        - sentiment_scores : tableau des sentiment_score ([-1, 1])
+        - notes : tableau des vote_average ([0, 10])
+        - emotion_user : émotion utilisée pour choisir les poids
+        - poids : poids explicites {"sentiment": w, "note": w} (prioritaires)
+
+    Retourne un tableau de scores (float64) aligné sur les entrées.
+    """
+    if poids is None:
+        poids = poids_score(emotion_user)
+
+    return poids["sentiment"] * normaliser_sentiments(sentiment_scores) + poids["note"] * normaliser_notes(notes)
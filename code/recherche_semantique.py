@@ -0,0 +1,232 @@
+"""Recherche sémantique des films par résumé : plongements LSA + index ANN (IVF-PQ) mappé en mémoire."""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+from pathlib import Path
+from typing import Optional, Sequence, Tuple
+
+import joblib
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from catalogue import Catalogue
+from recommendation import selectionner_top_k
+
+logger = logging.getLogger(__name__)
+
+# Dossier de l'index construit hors ligne (scripts/utils/construire_index_semantique.py)
+DOSSIER_INDEX_SEMANTIQUE = Path(__file__).resolve().parent.parent / "data" / "index_semantique"
+VERSION_INDEX = 1
+
+# Dimension des plongements (composantes LSA)
+DIMENSION = 128
+# Taille maximale du vocabulaire TF-IDF
+NB_TERMES_MAX = 50000
+# Quantification produit : nombre de sous-espaces et de centroïdes par sous-espace (codes uint8)
+NB_SOUS_ESPACES = 16
+NB_CENTROIDES_PQ = 256
+# Nombre de listes inversées (IVF) sondées par requête
+NB_LISTES_SONDEES = 8
+# Nombre de candidats (scores approchés PQ) re-classés avec les vecteurs exacts
+NB_CANDIDATS_RERANG = 200
+# Nombre maximum de vecteurs utilisés pour l'apprentissage des k-moyennes
+NB_ECHANTILLON_APPRENTISSAGE = 50000
+
+
+def textes_films(catalogue: Catalogue) -> list[str]:
+    """Texte indexé de chaque film : résumé anglais suivi du résumé français s'il diffère."""
+    textes = []
+    for overview, overview_fr in zip(catalogue.colonne("overview"), catalogue.colonne("overview_fr")):
+        morceaux = [t for t in (overview, overview_fr) if isinstance(t, str) and t]
+        if len(morceaux) == 2 and morceaux[0] == morceaux[1]:
+            morceaux = morceaux[:1]
+        textes.append(" ".join(morceaux))
+    return textes
+
+
+def _normaliser_lignes(vecteurs: np.ndarray) -> np.ndarray:
+    """Normalise (L2) les lignes, en laissant les vecteurs nuls tels quels."""
+    normes = np.linalg.norm(vecteurs, axis=1, keepdims=True)
+    return (vecteurs / np.where(normes > 0, normes, 1.0)).astype(np.float32)
+
+
+def _kmeans(vecteurs: np.ndarray, k: int, graine: int = 0) -> np.ndarray:
+    """Centroïdes des k-moyennes (mini-lots) appris sur un échantillon des vecteurs."""
+    rng = np.random.default_rng(graine)
+    if len(vecteurs) > NB_ECHANTILLON_APPRENTISSAGE:
+        vecteurs = vecteurs[rng.choice(len(vecteurs), NB_ECHANTILLON_APPRENTISSAGE, replace=False)]
+    k = max(1, min(k, len(vecteurs)))
+    modele = MiniBatchKMeans(n_clusters=k, random_state=graine, n_init=3, batch_size=4096)
+    modele.fit(vecteurs)
+    return modele.cluster_centers_.astype(np.float32)
+
+
+def _plus_proches(vecteurs: np.ndarray, centroides: np.ndarray) -> np.ndarray:
+    """Indice du centroïde le plus proche (distance euclidienne) de chaque vecteur."""
+    distances = (centroides ** 2).sum(axis=1) - 2.0 * vecteurs @ centroides.T
+    return distances.argmin(axis=1)
+
+
+class EncodeurSemantique:
+    """Plongement d'un texte : TF-IDF puis réduction LSA (SVD tronquée), normalisé L2."""
+
+    def __init__(self, vectoriseur: TfidfVectorizer, projection: np.ndarray):
+        self.vectoriseur = vectoriseur
+        # Composantes de la SVD transposées (termes x dimension), contiguës : le produit
+        # creux x dense ne recopie pas la matrice à chaque requête
+        self.projection = np.ascontiguousarray(projection, dtype=np.float32)
+
+    @classmethod
+    def entrainer(cls, textes: Sequence[str], dimension: int = DIMENSION) -> "EncodeurSemantique":
+        """Apprend le vocabulaire et la projection sur les textes du catalogue."""
+        vectoriseur = TfidfVectorizer(
+            stop_words="english",
+            max_features=NB_TERMES_MAX,
+            sublinear_tf=True,
+            strip_accents="unicode",
+            dtype=np.float32,
+        )
+        tfidf = vectoriseur.fit_transform(textes)
+        dimension = max(1, min(dimension, tfidf.shape[1] - 1, tfidf.shape[0] - 1))
+        svd = TruncatedSVD(n_components=dimension, random_state=0)
+        svd.fit(tfidf)
+        return cls(vectoriseur, svd.components_.T)
+
+    @property
+    def dimension(self) -> int:
+        return self.projection.shape[1]
+
+    def encoder(self, textes: Sequence[str]) -> np.ndarray:
+        """Plongements (float32, normalisés) des textes."""
+        return _normaliser_lignes(self.vectoriseur.transform(textes) @ self.projection)
+
+
+def construire_index(catalogue: Catalogue, dossier: Path = DOSSIER_INDEX_SEMANTIQUE, dimension: int = DIMENSION) -> None:
+    """
+    Construit et enregistre l'index sémantique du catalogue :
+    - l'encodeur (TF-IDF + SVD) ;
+    - les centroïdes IVF et, pour chaque liste inversée, ses films contigus
+      (identifiants, codes PQ, vecteurs exacts pour le re-classement) ;
+    - les dictionnaires de la quantification produit.
+    Les tableaux sont enregistrés en .npy pour être mappés en mémoire au chargement.
+    """
+    textes = textes_films(catalogue)
+    encodeur = EncodeurSemantique.entrainer(textes, dimension)
+    vecteurs = encodeur.encoder(textes)
+    nb, dimension = vecteurs.shape
+
+    # Quantificateur grossier : ~sqrt(n) listes inversées
+    centroides = _normaliser_lignes(_kmeans(vecteurs, int(math.sqrt(nb))))
+    listes = (vecteurs @ centroides.T).argmax(axis=1)
+    ordre = np.argsort(listes, kind="stable")
+    debuts = np.searchsorted(listes[ordre], np.arange(len(centroides) + 1)).astype(np.int64)
+
+    # Quantification produit : un dictionnaire par sous-espace
+    nb_sous_espaces = min(NB_SOUS_ESPACES, dimension)
+    while dimension % nb_sous_espaces:
+        nb_sous_espaces -= 1
+    sous_vecteurs = vecteurs.reshape(nb, nb_sous_espaces, -1)
+    dictionnaires = [_kmeans(sous_vecteurs[:, m], NB_CENTROIDES_PQ, graine=m) for m in range(nb_sous_espaces)]
+    taille = max(len(d) for d in dictionnaires)
+    codebooks = np.zeros((nb_sous_espaces, taille, dimension // nb_sous_espaces), dtype=np.float32)
+    codes = np.empty((nb, nb_sous_espaces), dtype=np.uint8)
+    for m, dictionnaire in enumerate(dictionnaires):
+        codebooks[m, :len(dictionnaire)] = dictionnaire
+        codes[:, m] = _plus_proches(sous_vecteurs[:, m], dictionnaire)
+
+    dossier.mkdir(parents=True, exist_ok=True)
+    joblib.dump(encodeur, dossier / "encodeur.joblib")
+    np.save(dossier / "centroides.npy", centroides)
+    np.save(dossier / "debuts.npy", debuts)
+    np.save(dossier / "ids.npy", catalogue.ids[ordre])
+    np.save(dossier / "codes.npy", codes[ordre])
+    np.save(dossier / "vecteurs.npy", vecteurs[ordre])
+    np.save(dossier / "codebooks.npy", codebooks)
+    (dossier / "index.json").write_text(json.dumps({
+        "version": VERSION_INDEX,
+        "nb_films": nb,
+        "dimension": dimension,
+        "nb_listes": len(centroides),
+        "nb_sous_espaces": nb_sous_espaces,
+    }, indent=2), encoding="utf-8")
+
+
+class IndexSemantique:
+    """
+    Index ANN chargé depuis le disque.
+
+    Une requête est encodée, comparée aux centroïdes pour choisir les listes
+    inversées à sonder, puis les films de ces listes sont classés par produit
+    scalaire approché (tables de la quantification produit). Seuls les meilleurs
+    candidats sont re-classés avec leurs vecteurs exacts, lus dans le fichier
+    mappé en mémoire.
+    """
+
+    def __init__(self, encodeur: EncodeurSemantique, centroides: np.ndarray, debuts: np.ndarray,
+                 ids: np.ndarray, codes: np.ndarray, vecteurs: np.ndarray, codebooks: np.ndarray):
+        self.encodeur = encodeur
+        self.centroides = centroides
+        self.debuts = debuts
+        self.ids = ids
+        self.codes = codes
+        self.vecteurs = vecteurs
+        self.codebooks = codebooks
+
+    @classmethod
+    def charger(cls, dossier: Path = DOSSIER_INDEX_SEMANTIQUE) -> Optional["IndexSemantique"]:
+        """Charge l'index (tableaux mappés en mémoire), ou None s'il est absent ou incompatible."""
+        manifeste = dossier / "index.json"
+        if not manifeste.exists():
+            return None
+        try:
+            if json.loads(manifeste.read_text(encoding="utf-8")).get("version") != VERSION_INDEX:
+                logger.warning(f"⚠️  Index sémantique d'une autre version ({dossier}), à reconstruire")
+                return None
+
+            def tableau(nom: str) -> np.ndarray:
+                return np.load(dossier / f"{nom}.npy", mmap_mode="r")
+
+            return cls(
+                joblib.load(dossier / "encodeur.joblib"),
+                np.load(dossier / "centroides.npy"),
+                np.load(dossier / "debuts.npy"),
+                tableau("ids"),
+                tableau("codes"),
+                tableau("vecteurs"),
+                np.load(dossier / "codebooks.npy"),
+            )
+        except Exception as e:
+            logger.warning(f"⚠️  Index sémantique illisible ({dossier}): {e}")
+            return None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def rechercher(self, requete: str, n: int = 10, nb_listes: int = NB_LISTES_SONDEES) -> Tuple[np.ndarray, np.ndarray]:
+        """Identifiants et scores (similarité cosinus) des films les plus proches de la requête."""
+        vecteur = self.encodeur.encoder([requete])[0]
+        if n <= 0 or not vecteur.any():
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        # Listes inversées les plus proches de la requête
+        listes = selectionner_top_k(self.centroides @ vecteur, nb_listes)
+        positions = np.concatenate([np.arange(self.debuts[l], self.debuts[l + 1]) for l in listes])
+        if len(positions) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        # Scores approchés : somme des produits scalaires par sous-espace (tables précalculées)
+        nb_sous_espaces = self.codebooks.shape[0]
+        tables = np.einsum("mkd,md->mk", self.codebooks, vecteur.reshape(nb_sous_espaces, -1))
+        approches = tables[np.arange(nb_sous_espaces), self.codes[positions]].sum(axis=1)
+        candidats = positions[selectionner_top_k(approches, NB_CANDIDATS_RERANG)]
+
+        # Re-classement exact des meilleurs candidats
+        candidats.sort()
+        exacts = np.asarray(self.vecteurs[candidats]) @ vecteur
+        meilleurs = selectionner_top_k(exacts, n)
+        return np.asarray(self.ids[candidats[meilleurs]]), exacts[meilleurs]
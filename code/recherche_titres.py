@@ -0,0 +1,175 @@
+"""Moteur de recherche par titre : correspondance exacte normalisée et recherche floue par trigrammes."""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from bisect import bisect_left
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+from catalogue import Catalogue, en_catalogue
+
+Film = Dict
+
+# Seuil de similarité (ratio difflib) pour accepter une correspondance floue
+SEUIL_SIMILARITE = 0.55
+# Nombre maximum de candidats (ceux partageant le plus de trigrammes) vérifiés finement
+NB_CANDIDATS_MAX = 64
+# Un trigramme présent dans plus de cette fraction des titres est considéré comme fréquent
+FRACTION_TRIGRAMMES_FREQUENTS = 0.02
+# Nombre minimum de trigrammes rares pour se passer des trigrammes fréquents
+NB_TRIGRAMMES_RARES_MIN = 3
+# Nombre de suggestions retournées par défaut pour l'autocomplétion
+NB_SUGGESTIONS = 8
+
+_RE_SEPARATEURS = re.compile(r"[^\w]+")
+
+
+def normaliser_titre(titre: str) -> str:
+    """
+    Normalise un titre pour la comparaison :
+    minuscules, accents supprimés, ponctuation remplacée par des espaces.
+
+    Exemple : "Amélie  (Le Fabuleux Destin)" -> "amelie le fabuleux destin"
+    """
+    if not isinstance(titre, str):
+        return ""
+    decompose = unicodedata.normalize("NFKD", titre)
+    sans_accents = "".join(c for c in decompose if not unicodedata.combining(c))
+    return _RE_SEPARATEURS.sub(" ", sans_accents.casefold()).strip()
+
+
+def trigrammes(titre_normalise: str) -> set[str]:
+    """Retourne l'ensemble des trigrammes de caractères d'un titre normalisé (avec bordures)."""
+    if not titre_normalise:
+        return set()
+    texte = f"  {titre_normalise} "
+    return {texte[i:i + 3] for i in range(len(texte) - 2)}
+
+
+class IndexTitres:
+    """
+    Index des titres du catalogue, construit une fois au chargement :
+    - table de hachage titre normalisé -> ligne du catalogue pour les correspondances exactes ;
+    - index inversé trigramme -> titres pour la recherche floue ;
+    - tableau trié des titres (+ popularités alignées) pour l'autocomplétion par préfixe.
+
+    La recherche floue compte les trigrammes partagés avec chaque titre, ne garde
+    que les meilleurs candidats, puis les départage avec le ratio de difflib
+    (même critère que l'ancien `get_close_matches`).
+    """
+
+    def __init__(self, films: Union[Catalogue, List[Film]]):
+        self.catalogue = en_catalogue(films)
+        # Titre normalisé -> ligne du film dans le catalogue
+        self.lignes_par_titre: Dict[str, int] = {}
+        self.titres: List[str] = []
+
+        postings: Dict[str, List[int]] = {}
+        for ligne, titre_brut in enumerate(self.catalogue.colonne("title")):
+            titre = normaliser_titre(titre_brut)
+            if not titre or titre in self.lignes_par_titre:
+                # À titre identique, le premier film du catalogue l'emporte
+                continue
+            self.lignes_par_titre[titre] = ligne
+            position = len(self.titres)
+            self.titres.append(titre)
+            for trigramme in trigrammes(titre):
+                postings.setdefault(trigramme, []).append(position)
+
+        self.postings: Dict[str, np.ndarray] = {
+            trigramme: np.asarray(positions, dtype=np.int32)
+            for trigramme, positions in postings.items()
+        }
+        self.longueurs = np.fromiter((len(t) for t in self.titres), dtype=np.int32, count=len(self.titres))
+
+        self.titres_tries: List[str] = sorted(self.titres)
+        lignes_triees = [self.lignes_par_titre[t] for t in self.titres_tries]
+        popularites = np.nan_to_num(self.catalogue.colonne("popularity"), nan=0.0)
+        self.popularites_triees = popularites[lignes_triees] if lignes_triees else np.empty(0)
+
+    def __len__(self) -> int:
+        return len(self.titres)
+
+    def rechercher_exact(self, titre: str) -> Optional[Film]:
+        """Retourne le film dont le titre normalisé est identique, ou None."""
+        ligne = self.lignes_par_titre.get(normaliser_titre(titre))
+        return self.catalogue.film(ligne) if ligne is not None else None
+
+    def rechercher_flou(self, titre: str, seuil: float = SEUIL_SIMILARITE) -> Optional[Film]:
+        """Retourne le film au titre le plus proche (ratio >= seuil), ou None."""
+        requete = normaliser_titre(titre)
+        listes = [self.postings[t] for t in trigrammes(requete) if t in self.postings]
+        if not listes:
+            return None
+
+        # Les trigrammes très fréquents (" th", "the"...) discriminent peu et coûtent
+        # cher : on les ignore dès qu'il reste assez de trigrammes rares.
+        limite = max(NB_CANDIDATS_MAX, int(len(self.titres) * FRACTION_TRIGRAMMES_FREQUENTS))
+        rares = [positions for positions in listes if len(positions) <= limite]
+        if len(rares) >= NB_TRIGRAMMES_RARES_MIN:
+            listes = rares
+
+        toutes = np.concatenate(listes)
+        if len(toutes) > len(self.titres) // 8:
+            comptes = np.bincount(toutes, minlength=len(self.titres))
+            candidats = np.flatnonzero(comptes)
+            comptes = comptes[candidats]
+        else:
+            candidats, comptes = np.unique(toutes, return_counts=True)
+
+        # Élagage par longueur : ratio <= 2 * min(la, lb) / (la + lb)
+        longueurs = self.longueurs[candidats]
+        longueur = len(requete)
+        garder = 2.0 * np.minimum(longueurs, longueur) / (longueurs + longueur) >= seuil
+        candidats, comptes = candidats[garder], comptes[garder]
+
+        if len(candidats) > NB_CANDIDATS_MAX:
+            meilleurs = np.argpartition(comptes, -NB_CANDIDATS_MAX)[-NB_CANDIDATS_MAX:]
+            candidats = candidats[meilleurs]
+
+        matcher = SequenceMatcher()
+        matcher.set_seq2(requete)
+        meilleur_titre, meilleur_ratio = None, seuil
+        for position in sorted(candidats.tolist()):
+            candidat = self.titres[position]
+            matcher.set_seq1(candidat)
+            if matcher.real_quick_ratio() < meilleur_ratio or matcher.quick_ratio() < meilleur_ratio:
+                continue
+            ratio = matcher.ratio()
+            if ratio > meilleur_ratio or (ratio == meilleur_ratio and meilleur_titre is None):
+                meilleur_titre, meilleur_ratio = candidat, ratio
+
+        if meilleur_titre is None:
+            return None
+        return self.catalogue.film(self.lignes_par_titre[meilleur_titre])
+
+    def rechercher(self, titre: str) -> Optional[Film]:
+        """Correspondance exacte (normalisée) en priorité, puis recherche floue."""
+        return self.rechercher_exact(titre) or self.rechercher_flou(titre)
+
+    def suggerer(self, prefixe: str, n: int = NB_SUGGESTIONS) -> List[Film]:
+        """
+        Retourne les `n` films les plus populaires dont le titre normalisé commence
+        par `prefixe` (recherche dichotomique dans le tableau trié des titres).
+        """
+        prefixe = normaliser_titre(prefixe)
+        if not prefixe or n <= 0:
+            return []
+
+        debut = bisect_left(self.titres_tries, prefixe)
+        fin = bisect_left(self.titres_tries, prefixe + "\U0010ffff", lo=debut)
+        if debut == fin:
+            return []
+
+        popularites = self.popularites_triees[debut:fin]
+        if len(popularites) > n:
+            meilleurs = np.argpartition(popularites, -n)[-n:]
+        else:
+            meilleurs = np.arange(len(popularites))
+        # Popularité décroissante, puis ordre alphabétique à popularité égale
+        meilleurs = sorted(meilleurs.tolist(), key=lambda i: (-popularites[i], i))
+        return self.catalogue.films([self.lignes_par_titre[self.titres_tries[debut + i]] for i in meilleurs])
@@ -2,101 +2,324 @@
 
 from __future__ import annotations
 
-from difflib import get_close_matches
-from typing import Dict, List, Optional
+from dataclasses import dataclass, field
+from itertools import count
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
 
-from lib_projet import calculer_score_film, emotion_to_genres
+import numpy as np
+
+from catalogue import Catalogue, en_catalogue
+from lib_projet import calculer_scores_films, emotion_to_genres
+from recherche_titres import IndexTitres
+
+if TYPE_CHECKING:
+    from similarite import MoteurSimilarite
 
 Film = Dict
 
 
-def rechercher_par_titre(titre: str, films: List[Film]) -> Optional[Film]:
-    """Retourne le film correspondant le mieux au titre fourni (matching flou)."""
+def rechercher_par_titre(
+    titre: str,
+    films: Union[Catalogue, List[Film]],
+    index: Optional[IndexTitres] = None,
+) -> Optional[Film]:
+    """Retourne le film correspondant le mieux au titre fourni (matching flou).
+
+    `index` (construit une fois au chargement du catalogue) évite de reconstruire
+    l'index des titres à chaque appel.
+    """
     titre = (titre or "").strip()
     if not titre:
         return None
 
-    exact = next((film for film in films if film.get("title", "").lower() == titre.lower()), None)
-    if exact:
-        return exact
+    if index is None:
+        index = IndexTitres(films)
+    return index.rechercher(titre)
 
-    titres = [film.get("title", "") for film in films]
-    matches = get_close_matches(titre, titres, n=1, cutoff=0.55)
-    if not matches:
-        return None
 
-    match = matches[0]
-    return next((film for film in films if film.get("title") == match), None)
+def recommander_similaires(
+    film_ref: Film,
+    films: Union[Catalogue, List[Film]],
+    n: int = 5,
+    offset: int = 0,
+    moteur: Optional["MoteurSimilarite"] = None,
+) -> List[Film]:
+    """Recommande les films au contenu le plus proche de celui de référence.
 
-
-def recommander_similaires(film_ref: Film, films: List[Film], n: int = 5) -> List[Film]:
-    """Recommande des films partageant des genres avec celui de référence."""
+    La similarité (cosinus) porte sur le résumé (TF-IDF) et les genres, via le
+    moteur de `similarite` : `moteur` (construit une fois pour le catalogue, avec
+    éventuellement les voisins précalculés) évite de revectoriser le catalogue.
+    `offset` permet de paginer : les films de rangs offset..offset+n-1 sont retournés.
+    """
     if not film_ref:
         return []
 
-    ref_genres = set(film_ref.get("genres", []))
+    if moteur is None:
+        from similarite import MoteurSimilarite
+        moteur = MoteurSimilarite.construire(en_catalogue(films))
+
+    ligne = moteur.catalogue.ligne(film_ref.get("id"))
+    if ligne is None:
+        return []
+
+    lignes, scores = moteur.similaires(ligne, n, offset)
     recommandations = []
+    for ligne_similaire, score in zip(lignes, scores):
+        film = moteur.catalogue.film(ligne_similaire)
+        film["score_similarite"] = round(float(score), 3)
+        recommandations.append(film)
+    return recommandations
 
-    for film in films:
-        if film.get("id") == film_ref.get("id"):
-            continue
 
-        genres = set(film.get("genres", []))
-        overlap = len(ref_genres & genres)
-        if overlap == 0:
-            continue
+def selectionner_top_k(scores: np.ndarray, k: int, offset: int = 0) -> np.ndarray:
+    """Indices des éléments de rangs offset..offset+k-1 par score décroissant.
 
-        score = overlap * 0.7 + (film.get("vote_average", 0.0) / 10.0) * 0.3
-        film_copy = dict(film)
-        film_copy["score_similarite"] = round(score, 3)
-        recommandations.append(film_copy)
+    Sélection partielle (np.partition, O(N)) puis tri des seuls offset+k élus ;
+    à score égal, l'indice le plus petit passe en premier (même ordre qu'un tri
+    stable complet).
+    """
+    scores = np.nan_to_num(np.asarray(scores, dtype=np.float64), nan=0.0)
+    total = k + offset
+    if k <= 0 or total <= 0 or len(scores) == 0:
+        return np.empty(0, dtype=np.int64)
 
-    recommandations.sort(key=lambda film: film["score_similarite"], reverse=True)
-    return recommandations[:n]
+    if total >= len(scores):
+        ordre = np.argsort(-scores, kind="stable")
+    else:
+        # Score du total-ième meilleur élément : tous les scores supérieurs sont élus,
+        # puis les ex-aequo à ce seuil par indice croissant
+        seuil = np.partition(scores, len(scores) - total)[len(scores) - total]
+        superieurs = np.flatnonzero(scores > seuil)
+        egaux = np.flatnonzero(scores == seuil)[:total - len(superieurs)]
+        elus = np.concatenate([superieurs, egaux])
+        ordre = elus[np.lexsort((elus, -scores[elus]))]
 
+    return ordre[offset:total]
 
-def recommander_par_emotion(emotion: str, films: List[Film], n: int = 5) -> List[Film]:
-    """Filtre les films par genres liés à l'émotion et applique un scoring simple."""
-    if not emotion:
-        return []
 
+def _notes(catalogue: Catalogue) -> np.ndarray:
+    """Notes (vote_average) du catalogue, 0.0 pour les notes absentes."""
+    return np.nan_to_num(catalogue.colonne("vote_average"), nan=0.0)
+
+
+@dataclass
+class IndexGenres:
+    """Index inversé genre -> rangs des films, calculé une fois au chargement du catalogue.
+
+    Les films sont pré-triés par note décroissante (tri stable, donc à note égale
+    l'ordre du catalogue est conservé) : le rang d'un film est sa position dans
+    `ordre`. Chaque liste de postings contient des rangs croissants, ce qui
+    permet de fusionner les genres d'une émotion sans retrier les candidats.
+    """
+
+    catalogue: Catalogue
+    ordre: np.ndarray
+    postings: Dict[str, np.ndarray] = field(default_factory=dict)
+    nb_notes_positives: int = 0
+
+    def rangs_pour_genres(self, genres: List[str], k: Optional[int] = None) -> np.ndarray:
+        """Rangs croissants (sans doublons) des films ayant au moins un des genres.
+
+        Avec `k`, seuls les k plus petits rangs de l'union sont retournés : ils se
+        trouvent forcément parmi les k premiers de chaque posting (triés), il
+        suffit donc de fusionner ces préfixes.
+        """
+        listes = [self.postings[genre][:k] for genre in genres if genre in self.postings]
+        if not listes:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(listes))[:k]
+
+    def a_des_films(self, genres: List[str]) -> bool:
+        """True si au moins un film du catalogue a l'un des genres."""
+        return any(len(self.postings.get(genre, ())) for genre in genres)
+
+
+def construire_index_genres(films: Union[Catalogue, List[Film]]) -> IndexGenres:
+    """Construit l'index inversé genre -> films utilisé par `recommander_par_emotion`."""
+    catalogue = en_catalogue(films)
+    notes = _notes(catalogue)
+    ordre = np.argsort(-notes, kind="stable")
+
+    postings = {}
+    rangs_films = np.empty(len(catalogue), dtype=np.int64)
+    rangs_films[ordre] = np.arange(len(catalogue))
+    for genre in catalogue.genres:
+        lignes = np.flatnonzero(catalogue.lignes_avec_genres([genre]))
+        postings[genre] = np.sort(rangs_films[lignes])
+
+    return IndexGenres(
+        catalogue=catalogue,
+        ordre=ordre,
+        postings=postings,
+        nb_notes_positives=int(np.count_nonzero(notes > 0)),
+    )
+
+
+# Dernier index construit par `index_genres`, réutilisé tant que le catalogue est le même objet
+_dernier_index: Optional[IndexGenres] = None
+
+
+def index_genres(catalogue: Catalogue) -> IndexGenres:
+    """Index des genres du catalogue, construit une seule fois par catalogue (le dernier est gardé)."""
+    global _dernier_index
+    index = _dernier_index
+    if index is None or index.catalogue is not catalogue:
+        index = _dernier_index = construire_index_genres(catalogue)
+    return index
+
+
+def _lignes_par_emotion(
+    emotion: str,
+    index: IndexGenres,
+    n: int,
+    offset: int = 0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Retourne les lignes du catalogue recommandées pour l'émotion et leurs scores."""
     emotion_lower = emotion.lower()
-    
+    genres_cibles = emotion_to_genres.get(emotion_lower, [])
+
     # Cas spécial pour 'surprise' : retourner les meilleurs films notés de tous genres
-    if emotion_lower == "surprise":
-        candidats = []
-        for film in films:
-            # Filtrer les films avec une note valide (vote_average > 0)
-            if film.get("vote_average", 0.0) > 0:
-                film_copy = dict(film)
-                film_copy["score_emotion"] = film.get("vote_average", 0.0)
-                candidats.append(film_copy)
-        
-        # Trier par note décroissante (vote_average), du mieux noté au moins bien noté
-        candidats.sort(key=lambda f: f.get("vote_average", 0.0), reverse=True)
-        return candidats[:n]
+    if emotion_lower != "surprise" and index.a_des_films(genres_cibles):
+        rangs = index.rangs_pour_genres(genres_cibles, k=offset + n)[offset:]
+        lignes = index.ordre[rangs]
+        scores = calculer_scores_films(
+            index.catalogue.colonne("sentiment_score")[lignes],
+            index.catalogue.colonne("vote_average")[lignes],
+            emotion,
+        )
+        return lignes, scores
 
+    # 'surprise' ou aucun candidat (fallback) : meilleurs films notés (vote_average > 0)
+    return _lignes_meilleures_notes(index, n, offset)
+
+
+def _lignes_par_emotion_sans_index(
+    emotion: str,
+    catalogue: Catalogue,
+    n: int,
+    offset: int = 0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Comme `_lignes_par_emotion`, par sélection partielle O(N) des candidats (sans construire d'index)."""
+    emotion_lower = emotion.lower()
     genres_cibles = emotion_to_genres.get(emotion_lower, [])
-    genres_cibles_set = set(genres_cibles)
-    candidats: List[Film] = []
-
-    # Filtrer les films correspondant aux genres de l'émotion
-    for film in films:
-        film_genres = set(film.get("genres", []))
-        if genres_cibles_set.intersection(film_genres):
-            film_copy = dict(film)
-            film_copy["score_emotion"] = calculer_score_film(film_copy, emotion)
-            candidats.append(film_copy)
-
-    # Si aucun candidat trouvé, utiliser un fallback : retourner les meilleurs films de tous genres
-    if not candidats:
-        # Fallback : retourner les meilleurs films notés
-        for film in films:
-            if film.get("vote_average", 0.0) > 0:
-                film_copy = dict(film)
-                film_copy["score_emotion"] = film.get("vote_average", 0.0)
-                candidats.append(film_copy)
-
-    # Trier uniquement par note décroissante (vote_average), du mieux noté au moins bien noté
-    candidats.sort(key=lambda f: f.get("vote_average", 0.0), reverse=True)
-    return candidats[:n]
+    notes = _notes(catalogue)
+
+    if emotion_lower != "surprise":
+        candidats = np.flatnonzero(catalogue.lignes_avec_genres(genres_cibles))
+        if len(candidats):
+            lignes = candidats[selectionner_top_k(notes[candidats], n, offset)]
+            scores = calculer_scores_films(
+                catalogue.colonne("sentiment_score")[lignes],
+                catalogue.colonne("vote_average")[lignes],
+                emotion,
+            )
+            return lignes, scores
+
+    candidats = np.flatnonzero(notes > 0)
+    lignes = candidats[selectionner_top_k(notes[candidats], n, offset)]
+    return lignes, notes[lignes]
+
+
+def _lignes_meilleures_notes(index: IndexGenres, n: int, offset: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """Lignes des films les mieux notés (vote_average > 0) de rangs offset..offset+n-1, score = note."""
+    lignes = index.ordre[offset:min(offset + n, index.nb_notes_positives)]
+    return lignes, _notes(index.catalogue)[lignes]
+
+
+def _materialiser(catalogue: Catalogue, lignes: np.ndarray, scores: np.ndarray, n: int) -> List[Film]:
+    """Matérialise les `n` premiers films recommandés avec leur score_emotion."""
+    resultats = []
+    for ligne, score in zip(lignes[:n], scores[:n]):
+        film = catalogue.film(ligne)
+        film["score_emotion"] = float(score)
+        resultats.append(film)
+    return resultats
+
+
+def recommander_par_emotion(
+    emotion: str,
+    films: Union[Catalogue, List[Film]],
+    n: int = 5,
+    index: Optional[IndexGenres] = None,
+    offset: int = 0,
+) -> List[Film]:
+    """Filtre les films par genres liés à l'émotion et applique un scoring simple.
+
+    Les films sont triés par note décroissante (vote_average). Avec un index (fourni,
+    ou celui du Catalogue, construit une seule fois), seuls les `offset + n` premiers
+    rangs de chaque posting des genres de l'émotion sont fusionnés. Une simple liste
+    de films est parcourue une fois (sélection partielle), sans construire d'index.
+    `offset` permet de paginer. Seuls les `n` films retournés sont matérialisés en
+    dictionnaires.
+    """
+    if not emotion or n <= 0:
+        return []
+
+    if index is None:
+        if not isinstance(films, Catalogue):
+            catalogue = en_catalogue(films)
+            lignes, scores = _lignes_par_emotion_sans_index(emotion, catalogue, n, offset)
+            return _materialiser(catalogue, lignes, scores, n)
+        index = index_genres(films)
+
+    lignes, scores = _lignes_par_emotion(emotion, index, n, offset)
+    return _materialiser(index.catalogue, lignes, scores, n)
+
+
+@dataclass
+class TableEmotions:
+    """Top-N matérialisé de chaque émotion, calculé une fois par version du catalogue.
+
+    Le classement de `recommander_par_emotion` ne dépend que du catalogue : les
+    résultats de chaque émotion (y compris 'surprise' et le fallback des
+    émotions inconnues) sont donc précalculés (lignes du catalogue et scores)
+    et servis sans aucun scoring.
+    """
+
+    version: int
+    profondeur: int
+    resultats: Dict[str, Tuple[np.ndarray, np.ndarray]]
+    fallback: Tuple[np.ndarray, np.ndarray]
+    index: IndexGenres
+
+    def recommander(self, emotion: str, n: int = 5, offset: int = 0) -> List[Film]:
+        """Retourne les films de rangs offset..offset+n-1 pour l'émotion (nouveaux dictionnaires)."""
+        if not emotion or n <= 0:
+            return []
+        if offset + n > self.profondeur:
+            # Au-delà de la profondeur matérialisée : calcul à la demande via l'index
+            return recommander_par_emotion(emotion, self.index.catalogue, n=n, index=self.index, offset=offset)
+
+        lignes, scores = self.resultats.get(emotion.lower(), self.fallback)
+        return _materialiser(self.index.catalogue, lignes[offset:], scores[offset:], n)
+
+
+_versions_table = count(1)
+
+
+def construire_table_emotions(
+    films: Union[Catalogue, List[Film]],
+    index: Optional[IndexGenres] = None,
+    profondeur: int = 20,
+) -> TableEmotions:
+    """Précalcule les recommandations de toutes les émotions de `emotion_to_genres`.
+
+    Chaque appel produit une nouvelle version : la table doit être reconstruite
+    à chaque (re)chargement du catalogue.
+    """
+    if index is None:
+        index = construire_index_genres(films)
+
+    resultats = {
+        emotion: _lignes_par_emotion(emotion, index, profondeur)
+        for emotion in emotion_to_genres
+    }
+    fallback = _lignes_meilleures_notes(index, profondeur)
+
+    return TableEmotions(
+        version=next(_versions_table),
+        profondeur=profondeur,
+        resultats=resultats,
+        fallback=fallback,
+        index=index,
+    )
@@ -0,0 +1,200 @@
+"""Moteur de similarité de contenu : vecteurs creux TF-IDF (overview) + genres, voisins précalculés."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+from catalogue import Catalogue
+from recommendation import selectionner_top_k
+
+logger = logging.getLogger(__name__)
+
+# Fichier des k plus proches voisins précalculés (scripts/utils/precalculer_voisins.py)
+FICHIER_VOISINS = Path(__file__).resolve().parent.parent / "data" / "voisins_similaires.npz"
+
+# Poids relatif du bloc "genres" par rapport au bloc TF-IDF du résumé
+POIDS_GENRES = 0.5
+# Taille maximale du vocabulaire TF-IDF
+NB_TERMES_MAX = 20000
+# Nombre de voisins précalculés par film
+NB_VOISINS = 50
+# Nombre de films traités par bloc lors du précalcul des voisins
+TAILLE_BLOC_VOISINS = 512
+# Version du calcul des voisins : un fichier d'une autre version est ignoré
+VERSION_VOISINS = 1
+
+
+def _textes_resumes(catalogue: Catalogue) -> list[str]:
+    """Résumés (overview) du catalogue, chaîne vide si absent."""
+    return [t if isinstance(t, str) else "" for t in catalogue.colonne("overview")]
+
+
+def empreinte_catalogue(catalogue: Catalogue) -> str:
+    """
+    Empreinte SHA-256 de ce dont dépendent les voisins : ids, genres et résumés
+    des films (dans l'ordre du catalogue) et paramètres de vectorisation.
+    Indépendante de la source du catalogue (Hugging Face, CSV ou snapshot).
+    """
+    empreinte = hashlib.sha256(f"{VERSION_VOISINS}|{POIDS_GENRES}|{NB_TERMES_MAX}".encode("utf-8"))
+    empreinte.update(np.ascontiguousarray(catalogue.ids, dtype=np.int64).tobytes())
+    for genres, resume in zip(catalogue.genres_films, _textes_resumes(catalogue)):
+        empreinte.update(("\x1f".join(genres) + "\x1e" + resume + "\x1d").encode("utf-8"))
+    return empreinte.hexdigest()
+
+
+def construire_vecteurs(catalogue: Catalogue) -> sparse.csr_matrix:
+    """
+    Construit la matrice CSR (un film par ligne) des vecteurs de contenu :
+    TF-IDF du résumé concaténé aux genres en one-hot, chaque bloc normalisé (L2),
+    puis la ligne entière normalisée : le produit scalaire est une similarité cosinus.
+    """
+    textes = _textes_resumes(catalogue)
+    if any(textes):
+        vectoriseur = TfidfVectorizer(
+            stop_words="english",
+            max_features=NB_TERMES_MAX,
+            sublinear_tf=True,
+            dtype=np.float32,
+        )
+        try:
+            tfidf = vectoriseur.fit_transform(textes)
+        except ValueError:
+            # Vocabulaire vide (résumés ne contenant que des mots vides)
+            tfidf = sparse.csr_matrix((len(catalogue), 0), dtype=np.float32)
+    else:
+        tfidf = sparse.csr_matrix((len(catalogue), 0), dtype=np.float32)
+
+    genres = np.unpackbits(catalogue.matrice_genres, axis=1)[:, :len(catalogue.genres)]
+    genres = _normaliser(sparse.csr_matrix(genres, dtype=np.float32)) * POIDS_GENRES
+
+    vecteurs = sparse.hstack([_normaliser(tfidf), genres], format="csr", dtype=np.float32)
+    return _normaliser(vecteurs)
+
+
+def _normaliser(matrice: sparse.csr_matrix) -> sparse.csr_matrix:
+    """Normalise (L2) les lignes d'une matrice creuse, même sans colonnes."""
+    if matrice.shape[1] == 0:
+        return sparse.csr_matrix(matrice)
+    return normalize(matrice)
+
+
+class MoteurSimilarite:
+    """
+    Films similaires à un film du catalogue.
+
+    Les vecteurs de contenu sont précalculés (matrice CSR normalisée) : les
+    similarités d'un film avec tout le catalogue s'obtiennent par un produit
+    matrice creuse - vecteur, suivi d'une sélection top-k. Si les voisins ont été
+    précalculés hors ligne, la réponse est une simple lecture de tableau.
+    """
+
+    def __init__(self, catalogue: Catalogue, vecteurs: sparse.csr_matrix):
+        self.catalogue = catalogue
+        self.vecteurs = vecteurs
+        # Voisins précalculés, alignés sur les lignes du catalogue (-1 = absent)
+        self.voisins: Optional[np.ndarray] = None
+        self.scores_voisins: Optional[np.ndarray] = None
+
+    @classmethod
+    def construire(cls, catalogue: Catalogue) -> "MoteurSimilarite":
+        """Construit le moteur (vecteurs de contenu) pour le catalogue."""
+        return cls(catalogue, construire_vecteurs(catalogue))
+
+    def similarites(self, ligne: int) -> np.ndarray:
+        """Similarité cosinus du film `ligne` avec chaque film du catalogue."""
+        return (self.vecteurs @ self.vecteurs[ligne].T).toarray().ravel()
+
+    def similaires(self, ligne: int, n: int = 5, offset: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+        """Lignes et scores des films les plus similaires (hors le film lui-même)."""
+        if n <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        if self.voisins is not None and self.voisins.shape[1] >= offset + n and self.voisins[ligne, offset + n - 1] >= 0:
+            # Lecture directe des voisins précalculés (préfixe valide, puis -1)
+            return (
+                self.voisins[ligne, offset:offset + n].astype(np.int64),
+                self.scores_voisins[ligne, offset:offset + n],
+            )
+
+        scores = self.similarites(ligne)
+        scores[ligne] = -np.inf
+        candidats = np.flatnonzero(scores > 0)
+        lignes = candidats[selectionner_top_k(scores[candidats], n, offset)]
+        return lignes, scores[lignes]
+
+    def calculer_voisins(self, k: int = NB_VOISINS) -> Tuple[np.ndarray, np.ndarray]:
+        """Calcule les k plus proches voisins de chaque film (par blocs de lignes)."""
+        nb = len(self.catalogue)
+        k = min(k, max(nb - 1, 0))
+        voisins = np.full((nb, k), -1, dtype=np.int32)
+        scores_voisins = np.zeros((nb, k), dtype=np.float32)
+        transposee = self.vecteurs.T.tocsc()
+
+        for debut in range(0, nb, TAILLE_BLOC_VOISINS):
+            fin = min(debut + TAILLE_BLOC_VOISINS, nb)
+            bloc = (self.vecteurs[debut:fin] @ transposee).toarray()
+            for i, scores in enumerate(bloc):
+                scores[debut + i] = -np.inf
+                candidats = np.flatnonzero(scores > 0)
+                lignes = candidats[selectionner_top_k(scores[candidats], k)]
+                voisins[debut + i, :len(lignes)] = lignes
+                scores_voisins[debut + i, :len(lignes)] = scores[lignes]
+
+        return voisins, scores_voisins
+
+    def sauvegarder_voisins(self, voisins: np.ndarray, scores_voisins: np.ndarray, chemin: Path = FICHIER_VOISINS) -> None:
+        """Enregistre les voisins (par identifiants de films) et l'empreinte du catalogue dont ils sont issus."""
+        ids = self.catalogue.ids
+        voisins_ids = np.where(voisins >= 0, ids[np.maximum(voisins, 0)], -1)
+        chemin.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            chemin, ids=ids, voisins=voisins_ids, scores=scores_voisins,
+            empreinte=np.array(empreinte_catalogue(self.catalogue)),
+        )
+
+    def charger_voisins(self, chemin: Path = FICHIER_VOISINS) -> bool:
+        """Charge les voisins précalculés s'ils existent. Retourne True si chargés.
+
+        Des voisins calculés pour un autre catalogue (empreinte absente ou différente)
+        sont ignorés : les similaires sont alors calculés à la demande.
+        """
+        if not chemin.exists():
+            return False
+        try:
+            with np.load(chemin) as donnees:
+                empreinte = str(donnees["empreinte"]) if "empreinte" in donnees.files else None
+                if empreinte != empreinte_catalogue(self.catalogue):
+                    logger.warning(
+                        f"⚠️  Voisins précalculés ({chemin.name}) issus d'un autre catalogue, ignorés"
+                        " - relancez scripts/utils/precalculer_voisins.py"
+                    )
+                    return False
+                ids, voisins_ids, scores = donnees["ids"], donnees["voisins"], donnees["scores"]
+        except Exception as e:
+            logger.warning(f"⚠️  Voisins précalculés illisibles ({chemin}): {e}")
+            return False
+
+        # Traduction identifiants -> lignes du catalogue courant
+        lignes_films = self.catalogue.lignes(ids)
+        lignes_voisins = self.catalogue.lignes(voisins_ids)
+        connus = lignes_films >= 0
+
+        self.voisins = np.full((len(self.catalogue), voisins_ids.shape[1]), -1, dtype=np.int32)
+        self.scores_voisins = np.zeros(self.voisins.shape, dtype=np.float32)
+        self.voisins[lignes_films[connus]] = lignes_voisins[connus]
+        self.scores_voisins[lignes_films[connus]] = scores[connus]
+
+        # Voisins absents du catalogue courant : on ne garde que le préfixe valide
+        invalides = np.cumsum(self.voisins < 0, axis=1) > 0
+        self.voisins[invalides] = -1
+        self.scores_voisins[invalides] = 0.0
+
+        logger.info(f"🧭 Voisins précalculés chargés pour {int(connus.sum())} films ({chemin.name})")
+        return True
@@ -0,0 +1,268 @@
+"""Snapshot binaire versionné du catalogue : colonnes .npy (mappées en mémoire) + tables de chaînes."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import math
+import os
+import pickle
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from catalogue import _ABSENT, Catalogue, _interner
+
+logger = logging.getLogger(__name__)
+
+# Dossier du snapshot construit par scripts/utils/construire_snapshot_catalogue.py
+DOSSIER_SNAPSHOT = Path(__file__).resolve().parent.parent / "data" / "catalogue_snapshot"
+# Version du format : un snapshot d'une autre version est ignoré (à reconstruire)
+VERSION_SNAPSHOT = 1
+
+MANIFESTE = "manifest.json"
+# Séparateur des chaînes dans les tables de chaînes
+SEPARATEUR = "\x00"
+# Codes réservés des colonnes de chaînes
+CODE_ABSENT = -1
+CODE_NAN = -2
+
+
+def empreinte_fichier(chemin: Path) -> str:
+    """Empreinte SHA-256 d'un fichier (lu par blocs)."""
+    empreinte = hashlib.sha256()
+    with open(chemin, "rb") as f:
+        for bloc in iter(lambda: f.read(1 << 20), b""):
+            empreinte.update(bloc)
+    return empreinte.hexdigest()
+
+
+def _description_source(source: Path) -> Dict:
+    stat = source.stat()
+    return {
+        "nom": source.name,
+        "taille": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": empreinte_fichier(source),
+    }
+
+
+def _source_inchangee(description: Dict, source: Path) -> bool:
+    """Vérifie que le fichier source est celui du snapshot (taille + date, sinon empreinte)."""
+    stat = source.stat()
+    if stat.st_size != description.get("taille"):
+        return False
+    if stat.st_mtime_ns == description.get("mtime_ns"):
+        return True
+    # Fichier touché mais peut-être identique : seule l'empreinte fait foi
+    return empreinte_fichier(source) == description.get("sha256")
+
+
+def _est_nan(valeur) -> bool:
+    return isinstance(valeur, float) and math.isnan(valeur)
+
+
+def _type_colonne(valeurs: list) -> str:
+    """Encodage d'une colonne "objet" : chaînes, entiers, flottants, ou pickle (autres)."""
+    presentes = [v for v in valeurs if v is not _ABSENT]
+    if all(isinstance(v, str) or _est_nan(v) for v in presentes):
+        return "chaines"
+    if all(type(v) is int for v in presentes):
+        return "entiers"
+    if all(type(v) is float for v in presentes):
+        return "flottants"
+    return "pickle"
+
+
+def _ecrire_chaines(dossier: Path, nom: str, valeurs: list) -> bool:
+    """Table des chaînes distinctes + codes int32 par film. False si une chaîne contient le séparateur."""
+    positions: Dict[str, int] = {}
+    codes = np.empty(len(valeurs), dtype=np.int32)
+    for i, valeur in enumerate(valeurs):
+        if valeur is _ABSENT:
+            codes[i] = CODE_ABSENT
+        elif not isinstance(valeur, str):
+            codes[i] = CODE_NAN
+        else:
+            if SEPARATEUR in valeur:
+                return False
+            codes[i] = positions.setdefault(valeur, len(positions))
+    # En binaire : pas de conversion des fins de ligne contenues dans les chaînes
+    (dossier / f"{nom}.txt").write_bytes(SEPARATEUR.join(positions).encode("utf-8"))
+    np.save(dossier / f"{nom}.codes.npy", codes)
+    return True
+
+
+def _lire_chaines(dossier: Path, nom: str) -> list:
+    texte = (dossier / f"{nom}.txt").read_bytes().decode("utf-8")
+    # Chaînes distinctes : chaque valeur répétée est déjà partagée entre les films
+    valeurs = texte.split(SEPARATEUR)
+    codes = np.load(dossier / f"{nom}.codes.npy", mmap_mode="r")
+    if len(valeurs) == len(codes) and codes.min() >= 0:
+        # Une chaîne distincte par film (codes 0..n-1) : la table est la colonne
+        # (un film sans chaîne donne aussi une table d'un élément, la chaîne vide : d'où le test des codes)
+        return valeurs
+    # Les codes réservés (-2, -1) désignent les deux derniers éléments
+    valeurs += [math.nan, _ABSENT]
+    return list(map(valeurs.__getitem__, codes.tolist()))
+
+
+def _ecrire_absents(dossier: Path, nom: str, valeurs: list) -> None:
+    """Masque des champs absents (le marqueur _ABSENT ne survit pas à la sérialisation)."""
+    absents = np.fromiter((v is _ABSENT for v in valeurs), dtype=bool, count=len(valeurs))
+    np.save(dossier / f"{nom}.absents.npy", absents)
+
+
+def _restaurer_absents(dossier: Path, nom: str, valeurs: list) -> list:
+    for i in np.flatnonzero(np.load(dossier / f"{nom}.absents.npy", mmap_mode="r")).tolist():
+        valeurs[i] = _ABSENT
+    return valeurs
+
+
+def _ecrire_nombres(dossier: Path, nom: str, valeurs: list, dtype) -> None:
+    nombres = np.array([0 if v is _ABSENT else v for v in valeurs], dtype=dtype)
+    np.save(dossier / f"{nom}.valeurs.npy", nombres)
+    _ecrire_absents(dossier, nom, valeurs)
+
+
+def _lire_nombres(dossier: Path, nom: str) -> list:
+    valeurs = np.load(dossier / f"{nom}.valeurs.npy", mmap_mode="r").tolist()
+    return _restaurer_absents(dossier, nom, valeurs)
+
+
+def _ecrire_pickle(dossier: Path, nom: str, valeurs: list) -> None:
+    with open(dossier / f"{nom}.pickle", "wb") as f:
+        pickle.dump([None if v is _ABSENT else v for v in valeurs], f, protocol=pickle.HIGHEST_PROTOCOL)
+    _ecrire_absents(dossier, nom, valeurs)
+
+
+def _lire_pickle(dossier: Path, nom: str) -> list:
+    valeurs = pickle.loads((dossier / f"{nom}.pickle").read_bytes())
+    return _restaurer_absents(dossier, nom, valeurs)
+
+
+def ecrire_snapshot(catalogue: Catalogue, dossier: Path = DOSSIER_SNAPSHOT, source: Optional[Path] = None) -> None:
+    """
+    Écrit le snapshot du catalogue dans `dossier` (remplacé en bloc) :
+    - ids, colonnes numériques, matrice des genres, ordre des ids : un .npy chacun ;
+    - genres : tuples distincts + code par film ;
+    - colonnes "objet" : table de chaînes distinctes + codes, tableaux de nombres, ou pickle ;
+    - manifest.json : version du format, colonnes, et empreinte du fichier source.
+    """
+    temporaire = dossier.with_name(dossier.name + ".tmp")
+    shutil.rmtree(temporaire, ignore_errors=True)
+    temporaire.mkdir(parents=True)
+
+    np.save(temporaire / "ids.npy", catalogue.ids)
+    np.save(temporaire / "lignes_par_id.npy", catalogue._lignes_par_id)
+    np.save(temporaire / "matrice_genres.npy", catalogue.matrice_genres)
+    for nom, colonne in catalogue.numeriques.items():
+        np.save(temporaire / f"num.{nom}.npy", colonne)
+
+    tuples_genres: Dict[tuple, int] = {}
+    codes_genres = np.fromiter(
+        (tuples_genres.setdefault(t, len(tuples_genres)) for t in catalogue.genres_films),
+        dtype=np.int32,
+        count=len(catalogue),
+    )
+    np.save(temporaire / "genres.codes.npy", codes_genres)
+    with open(temporaire / "genres.pickle", "wb") as f:
+        pickle.dump(list(tuples_genres), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    colonnes = {}
+    for position, (nom, valeurs) in enumerate(catalogue.objets.items()):
+        fichier = f"obj{position}"
+        encodage = _type_colonne(valeurs)
+        if encodage == "chaines" and not _ecrire_chaines(temporaire, fichier, valeurs):
+            encodage = "pickle"
+        if encodage == "entiers":
+            _ecrire_nombres(temporaire, fichier, valeurs, np.int64)
+        elif encodage == "flottants":
+            _ecrire_nombres(temporaire, fichier, valeurs, np.float64)
+        elif encodage == "pickle":
+            _ecrire_pickle(temporaire, fichier, valeurs)
+        colonnes[nom] = {"fichier": fichier, "encodage": encodage}
+
+    manifeste = {
+        "version": VERSION_SNAPSHOT,
+        "cree_le": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "nb_films": len(catalogue),
+        "genres": catalogue.genres,
+        "numeriques": list(catalogue.numeriques),
+        "objets": colonnes,
+        "source": _description_source(source) if source is not None else None,
+    }
+    (temporaire / MANIFESTE).write_text(json.dumps(manifeste, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    # Remplacement du snapshot précédent une fois le nouveau complet
+    ancien = dossier.with_name(dossier.name + ".old")
+    shutil.rmtree(ancien, ignore_errors=True)
+    if dossier.exists():
+        os.replace(dossier, ancien)
+    os.replace(temporaire, dossier)
+    shutil.rmtree(ancien, ignore_errors=True)
+
+
+def charger_snapshot(dossier: Path = DOSSIER_SNAPSHOT, source: Optional[Path] = None) -> Optional[Catalogue]:
+    """
+    Charge le catalogue depuis le snapshot (colonnes NumPy mappées en mémoire).
+
+    Retourne None si le snapshot est absent, d'une autre version, illisible, ou
+    s'il ne correspond pas au fichier `source` (absent, différent de celui ayant
+    servi à le construire, ou snapshot construit sans source).
+    """
+    chemin_manifeste = dossier / MANIFESTE
+    if not chemin_manifeste.exists():
+        return None
+    try:
+        manifeste = json.loads(chemin_manifeste.read_text(encoding="utf-8"))
+        if manifeste.get("version") != VERSION_SNAPSHOT:
+            logger.warning(f"⚠️  Snapshot du catalogue d'une autre version ({dossier}), ignoré")
+            return None
+        description = manifeste.get("source")
+        if source is not None:
+            if not source.exists():
+                logger.info(f"ℹ️  Snapshot du catalogue ignoré: {source.name} absent, rien ne garantit qu'il est à jour")
+                return None
+            if not description or description.get("nom") != source.name:
+                logger.warning(f"⚠️  Snapshot du catalogue construit sans {source.name}, ignoré")
+                return None
+            if not _source_inchangee(description, source):
+                logger.warning(f"⚠️  Snapshot du catalogue périmé ({source.name} a changé), ignoré")
+                return None
+
+        def tableau(nom: str) -> np.ndarray:
+            return np.load(dossier / f"{nom}.npy", mmap_mode="r")
+
+        tuples_genres: List[tuple] = [
+            tuple(_interner(g) for g in t)
+            for t in pickle.loads((dossier / "genres.pickle").read_bytes())
+        ]
+        genres_films = list(map(tuples_genres.__getitem__, tableau("genres.codes").tolist()))
+
+        objets = {}
+        for nom, colonne in manifeste["objets"].items():
+            fichier, encodage = colonne["fichier"], colonne["encodage"]
+            if encodage == "chaines":
+                objets[nom] = _lire_chaines(dossier, fichier)
+            elif encodage in ("entiers", "flottants"):
+                objets[nom] = _lire_nombres(dossier, fichier)
+            else:
+                objets[nom] = _lire_pickle(dossier, fichier)
+
+        return Catalogue(
+            tableau("ids"),
+            {nom: tableau(f"num.{nom}") for nom in manifeste["numeriques"]},
+            manifeste["genres"],
+            genres_films,
+            objets,
+            matrice_genres=tableau("matrice_genres"),
+            lignes_par_id=tableau("lignes_par_id"),
+        )
+    except Exception as e:
+        logger.warning(f"⚠️  Snapshot du catalogue illisible ({dossier}): {e}")
+        return None
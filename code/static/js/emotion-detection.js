@@ -117,10 +117,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
   // Fonction pour arrêter la webcam
   function stopWebcam() {
-    if (faceDetectionInterval) {
-      clearInterval(faceDetectionInterval);
-      faceDetectionInterval = null;
-    }
+    stopFaceDetection();
     
     if (stream) {
       stream.getTracks().forEach(track => track.stop());
@@ -134,49 +131,147 @@ document.addEventListener('DOMContentLoaded', () => {
   }
 });
 
-// Détection de visage en temps réel (toutes les 200ms)
+// Largeur (px) des images envoyées pour le suivi du visage (réduites, sans classification d'émotion)
+const FACE_TRACKING_WIDTH = 320;
+let trackingCanvas = null;
+let trackingScale = 1;
+let trackingRequestPending = false;
+let trackingSocket = null;
+
+// Suivi du visage en temps réel : encadrement et qualité seulement, l'émotion n'est classée qu'à la capture.
+// Flux WebSocket si le serveur le propose, sinon requêtes HTTP toutes les 500ms
 function startFaceDetection() {
+  stopFaceDetection();
+  if ('WebSocket' in window) {
+    startFaceStreaming();
+  } else {
+    startFacePolling();
+  }
+}
+
+function stopFaceDetection() {
   if (faceDetectionInterval) {
     clearInterval(faceDetectionInterval);
+    faceDetectionInterval = null;
   }
-  
+  if (trackingSocket) {
+    const socket = trackingSocket;
+    trackingSocket = null;
+    socket.close();
+  }
+  trackingRequestPending = false;
+}
+
+// Dessiner la frame courante, réduite, dans le canvas de suivi (réutilisé d'un envoi à l'autre)
+function captureTrackingFrame() {
+  if (!video || video.readyState !== video.HAVE_ENOUGH_DATA) return false;
+  trackingScale = Math.min(1, FACE_TRACKING_WIDTH / video.videoWidth);
+  if (!trackingCanvas) {
+    trackingCanvas = document.createElement('canvas');
+  }
+  trackingCanvas.width = Math.round(video.videoWidth * trackingScale);
+  trackingCanvas.height = Math.round(video.videoHeight * trackingScale);
+  const ctx = trackingCanvas.getContext('2d');
+  ctx.drawImage(video, 0, 0, trackingCanvas.width, trackingCanvas.height);
+  return true;
+}
+
+// Afficher l'encadrement et les messages renvoyés par le serveur pour une frame de suivi
+function handleTrackingResult(result) {
+  if (result.face_bbox) {
+    // Ramener l'encadrement aux dimensions de la vidéo
+    const bbox = result.face_bbox.map(v => v / trackingScale);
+    currentFaceBbox = bbox;
+    drawFaceOverlay(bbox, result.quality);
+    displayHelpMessages(result, true); // true = mode temps réel
+  } else {
+    currentFaceBbox = null;
+    clearFaceOverlay();
+    if (result.quality && result.quality.messages) {
+      displayHelpMessages(result, true);
+    }
+  }
+}
+
+// Flux WebSocket : une frame JPEG réduite envoyée dès que la précédente a reçu sa réponse (200ms min)
+function startFaceStreaming() {
+  const protocol = window.location.protocol === 'https:' ? 'wss://' : 'ws://';
+  const socket = new WebSocket(protocol + window.location.host + '/ws/face-quality');
+  socket.binaryType = 'arraybuffer';
+  trackingSocket = socket;
+  let opened = false;
+
+  socket.addEventListener('open', () => {
+    opened = true;
+    faceDetectionInterval = setInterval(() => {
+      if (trackingRequestPending || socket.readyState !== WebSocket.OPEN) return;
+      if (!captureTrackingFrame()) return;
+      trackingRequestPending = true;
+      trackingCanvas.toBlob((blob) => {
+        if (blob && socket.readyState === WebSocket.OPEN) {
+          socket.send(blob);
+        } else {
+          trackingRequestPending = false;
+        }
+      }, 'image/jpeg', 0.7);
+    }, 200);
+  });
+
+  socket.addEventListener('message', (event) => {
+    trackingRequestPending = false;
+    try {
+      const result = JSON.parse(event.data);
+      if (result.face_bbox !== undefined) {
+        handleTrackingResult(result);
+      }
+    } catch (err) {
+      console.error('Erreur suivi visage:', err);
+    }
+  });
+
+  socket.addEventListener('close', () => {
+    // Fermeture inattendue (serveur sans WebSocket, coupure) : retour aux requêtes HTTP
+    if (trackingSocket !== socket) return;
+    trackingSocket = null;
+    if (faceDetectionInterval) {
+      clearInterval(faceDetectionInterval);
+      faceDetectionInterval = null;
+    }
+    trackingRequestPending = false;
+    if (!opened) {
+      console.info('WebSocket indisponible, suivi du visage par requêtes HTTP');
+    }
+    if (stream) {
+      startFacePolling();
+    }
+  });
+}
+
+// Requêtes HTTP toutes les 500ms (serveur sans WebSocket)
+function startFacePolling() {
   faceDetectionInterval = setInterval(async () => {
-    if (!video || video.readyState !== video.HAVE_ENOUGH_DATA) return;
-    
-    // Capturer une frame
-    const tempCanvas = document.createElement('canvas');
-    tempCanvas.width = video.videoWidth;
-    tempCanvas.height = video.videoHeight;
-    const ctx = tempCanvas.getContext('2d');
-    ctx.drawImage(video, 0, 0);
+    // Ne pas empiler les requêtes si le serveur n'a pas encore répondu
+    if (trackingRequestPending) return;
+    if (!captureTrackingFrame()) return;
     
-    // Envoyer au serveur pour détection (version légère, juste pour le bbox)
-    tempCanvas.toBlob(async (blob) => {
+    trackingRequestPending = true;
+    trackingCanvas.toBlob(async (blob) => {
       try {
         const formData = new FormData();
         formData.append('image', blob);
         
-        const response = await fetch('/api/detect-emotion', {
+        const response = await fetch('/api/face-quality', {
           method: 'POST',
           body: formData
         });
         
         if (response.ok) {
-          const result = await response.json();
-          if (result.face_bbox) {
-            currentFaceBbox = result.face_bbox;
-            drawFaceOverlay(result.face_bbox, result.quality);
-            displayHelpMessages(result, true); // true = mode temps réel
-          } else {
-            currentFaceBbox = null;
-            clearFaceOverlay();
-            if (result.quality && result.quality.messages) {
-              displayHelpMessages(result, true);
-            }
-          }
+          handleTrackingResult(await response.json());
         }
       } catch (err) {
         console.error('Erreur détection visage:', err);
+      } finally {
+        trackingRequestPending = false;
       }
     }, 'image/jpeg', 0.7);
   }, 500); // Détection toutes les 500ms pour ne pas surcharger
@@ -0,0 +1,160 @@
+// Enrichissement progressif des résultats : les cartes affichées avant la fin des appels TMDB
+// (data-enrichissement="en-attente") sont mises à jour dès que le serveur a leurs données.
+
+const ENRICHISSEMENT_INTERVALLE_MS = 1000;
+const ENRICHISSEMENT_NB_ESSAIS_MAX = 30;
+
+function ouvrirBandeAnnonce(trailerUrl, title) {
+  if (typeof showTrailerModal === 'function') {
+    showTrailerModal(trailerUrl, title);
+  } else {
+    window.open(trailerUrl, '_blank', 'noopener');
+  }
+}
+
+function creerBoutonBandeAnnonce(classe, texte, film, titre) {
+  const btn = document.createElement('button');
+  btn.className = classe;
+  btn.dataset.trailer = film.trailer_url;
+  btn.dataset.title = titre;
+  btn.title = 'Voir la bande annonce';
+  btn.textContent = texte;
+  btn.addEventListener('click', (e) => {
+    e.preventDefault();
+    ouvrirBandeAnnonce(film.trailer_url, titre);
+  });
+  return btn;
+}
+
+function mettreAJourCarte(card, film) {
+  const titre = card.querySelector('.film-title')?.textContent || '';
+
+  // Affiche et image de fond
+  if (film.poster_url) {
+    card.dataset.poster = film.poster_url;
+    let poster = card.querySelector('.card-poster');
+    if (!poster) {
+      poster = document.createElement('div');
+      poster.className = 'card-poster';
+      poster.appendChild(document.createElement('img'));
+      card.querySelector('.card-visual')?.appendChild(poster);
+    }
+    const img = poster.querySelector('img');
+    if (img) {
+      img.src = film.poster_url;
+      img.alt = titre;
+    }
+  }
+  if (film.backdrop_url) {
+    card.dataset.backdrop = film.backdrop_url;
+    const backdrop = card.querySelector('.card-backdrop');
+    if (backdrop) {
+      backdrop.dataset.bg = film.backdrop_url;
+      backdrop.style.backgroundImage = `url('${film.backdrop_url}')`;
+    }
+  }
+
+  // Résumé en français
+  if (film.overview_fr) {
+    card.dataset.overviewFr = film.overview_fr;
+    const overview = card.querySelector('.overview');
+    if (overview) overview.textContent = film.overview_fr;
+  }
+
+  // Durée
+  if (film.runtime && !card.querySelector('.film-info')) {
+    const info = document.createElement('p');
+    info.className = 'film-info';
+    info.textContent = `⏱️ ${film.runtime} min`;
+    card.querySelector('.film-title')?.after(info);
+  }
+
+  // Bande annonce : bouton sur l'affiche et dans les actions
+  if (film.trailer_url && !card.querySelector('.btn-trailer')) {
+    const poster = card.querySelector('.card-poster');
+    if (poster && !poster.querySelector('.play-overlay')) {
+      const overlay = document.createElement('div');
+      overlay.className = 'play-overlay';
+      overlay.appendChild(creerBoutonBandeAnnonce('btn-play-trailer', '▶️', film, titre));
+      poster.appendChild(overlay);
+    }
+    card.querySelector('.card-multimedia')
+      ?.prepend(creerBoutonBandeAnnonce('btn-action btn-trailer', '🎬 Bande annonce', film, titre));
+  }
+
+  // Plateformes de streaming
+  const liens = card.querySelector('.streaming-links');
+  if (liens && Array.isArray(film.streaming_links) && film.streaming_links.length) {
+    const filmId = card.dataset.filmId;
+    liens.innerHTML = '';
+    film.streaming_links.forEach((link) => {
+      const a = document.createElement('a');
+      a.href = `https://www.themoviedb.org/movie/${filmId}?language=fr-FR`;
+      a.target = '_blank';
+      a.rel = 'noopener noreferrer';
+      a.className = `stream-link stream-${link.type}`;
+      a.title = link.name;
+      if (link.logo) {
+        const logo = document.createElement('img');
+        logo.src = link.logo;
+        logo.alt = link.name;
+        logo.className = 'stream-logo';
+        a.appendChild(logo);
+      } else {
+        const nom = document.createElement('span');
+        nom.className = 'stream-name';
+        nom.textContent = link.name;
+        a.appendChild(nom);
+      }
+      liens.appendChild(a);
+    });
+    const titreSection = liens.parentElement?.querySelector('strong');
+    if (titreSection) titreSection.textContent = '📺 Regarder sur :';
+  }
+
+  card.classList.remove('card-en-attente');
+  delete card.dataset.enrichissement;
+}
+
+document.addEventListener('DOMContentLoaded', () => {
+  const enAttente = new Map();
+  document.querySelectorAll('.card[data-enrichissement="en-attente"]').forEach((card) => {
+    enAttente.set(card.dataset.filmId, card);
+  });
+  if (!enAttente.size) return;
+
+  let essais = 0;
+  const interroger = async () => {
+    essais += 1;
+    try {
+      const ids = Array.from(enAttente.keys()).join(',');
+      const response = await fetch(`/api/enrichissement?ids=${encodeURIComponent(ids)}`);
+      if (response.ok) {
+        const data = await response.json();
+        Object.entries(data.films || {}).forEach(([id, film]) => {
+          const card = enAttente.get(id);
+          if (card) {
+            mettreAJourCarte(card, film);
+            enAttente.delete(id);
+          }
+        });
+        // Films inconnus du serveur (ni en cours ni en cache) : inutile d'insister
+        const enCours = new Set((data.en_attente || []).map(String));
+        Array.from(enAttente.keys()).forEach((id) => {
+          if (!enCours.has(id)) {
+            enAttente.get(id).classList.remove('card-en-attente');
+            enAttente.delete(id);
+          }
+        });
+      }
+    } catch (err) {
+      console.error('Erreur enrichissement progressif:', err);
+    }
+    if (enAttente.size && essais < ENRICHISSEMENT_NB_ESSAIS_MAX) {
+      setTimeout(interroger, ENRICHISSEMENT_INTERVALLE_MS);
+    } else {
+      enAttente.forEach((card) => card.classList.remove('card-en-attente'));
+    }
+  };
+  setTimeout(interroger, ENRICHISSEMENT_INTERVALLE_MS);
+});
@@ -0,0 +1,45 @@
+// Autocomplétion du champ titre : suggestions par préfixe, classées par popularité
+
+document.addEventListener('DOMContentLoaded', () => {
+  const titreInput = document.getElementById('titre');
+  const datalist = document.getElementById('titre-suggestions');
+  if (!titreInput || !datalist) return;
+
+  let controller = null;
+  let dernierPrefixe = '';
+
+  titreInput.addEventListener('input', async () => {
+    const prefixe = titreInput.value.trim();
+    if (prefixe === dernierPrefixe) return;
+    dernierPrefixe = prefixe;
+
+    // Annuler la requête précédente : seule la dernière frappe compte
+    if (controller) controller.abort();
+
+    if (prefixe.length < 2) {
+      datalist.innerHTML = '';
+      return;
+    }
+
+    controller = new AbortController();
+    try {
+      const response = await fetch(`/api/suggestions?q=${encodeURIComponent(prefixe)}`, {
+        signal: controller.signal
+      });
+      if (!response.ok) return;
+
+      const data = await response.json();
+      datalist.innerHTML = '';
+      (data.suggestions || []).forEach((film) => {
+        const option = document.createElement('option');
+        option.value = film.title;
+        if (film.release_year) option.label = `${film.title} (${film.release_year})`;
+        datalist.appendChild(option);
+      });
+    } catch (err) {
+      if (err.name !== 'AbortError') {
+        console.error('Erreur suggestions titres:', err);
+      }
+    }
+  });
+});
@@ -4,12 +4,18 @@ from __future__ import annotations
 
 import os
 import logging
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
-import requests
 from dotenv import load_dotenv
 
+import http_client
+from cache_traductions import cache_traductions
+
 # Charger les variables d'environnement depuis .env
 BASE_DIR = Path(__file__).resolve().parent.parent
 load_dotenv(BASE_DIR / ".env")
@@ -28,6 +34,19 @@ TMDB_BASE_URL = "https://api.themoviedb.org/3"
 TMDB_IMAGE_BASE = "https://image.tmdb.org/t/p/w500"
 TMDB_POSTER_BASE = "https://image.tmdb.org/t/p/w780"
 
+# Débit maximal des appels TMDB (requêtes/s, toutes requêtes confondues) et taille des rafales
+TMDB_REQUETES_PAR_SECONDE = float(os.getenv("TMDB_REQUETES_PAR_SECONDE", "40"))
+TMDB_RAFALE_MAX = int(os.getenv("TMDB_RAFALE_MAX", "20"))
+# Nombre maximal d'enrichissements TMDB menés en parallèle (tous appelants confondus)
+TMDB_CONCURRENCE_MAX = int(os.getenv("TMDB_CONCURRENCE_MAX", "8"))
+
+# Traduction des résumés pendant les requêtes. Désactivée par défaut : les résumés sont
+# pré-traduits hors ligne (scripts/utils/traduire_resumes.py) et seulement lus dans le cache
+TRADUCTION_EN_LIGNE = os.getenv("TRADUCTION_EN_LIGNE", "false").lower() == "true"
+# Débit maximal des appels au service de traduction (requêtes/s) et taille des rafales
+TRADUCTION_REQUETES_PAR_SECONDE = float(os.getenv("TRADUCTION_REQUETES_PAR_SECONDE", "2"))
+TRADUCTION_RAFALE_MAX = int(os.getenv("TRADUCTION_RAFALE_MAX", "5"))
+
 # Mapping des providers de streaming
 PROVIDER_MAPPING = {
     "netflix": {"name": "Netflix", "color": "#E50914"},
@@ -37,6 +56,50 @@ PROVIDER_MAPPING = {
 }
 
 
+class LimiteurDebit:
+    """
+    Limiteur de débit "seau à jetons", partagé entre threads.
+
+    Le seau se remplit de `debit` jetons par seconde, jusqu'à `capacite` ; chaque
+    appel à `acquerir` consomme un jeton et attend s'il n'y en a plus.
+    """
+
+    def __init__(self, debit: float, capacite: int = 1):
+        self.debit = debit
+        self.capacite = max(capacite, 1)
+        self._jetons = float(self.capacite)
+        self._dernier = time.monotonic()
+        self._verrou = threading.Lock()
+
+    def acquerir(self) -> None:
+        """Bloque jusqu'à obtenir un jeton."""
+        if self.debit <= 0:
+            return
+        with self._verrou:
+            maintenant = time.monotonic()
+            self._jetons = min(self.capacite, self._jetons + (maintenant - self._dernier) * self.debit)
+            self._dernier = maintenant
+            # Le jeton est réservé tout de suite : les appelants suivants attendent leur tour
+            self._jetons -= 1
+            attente = -self._jetons / self.debit if self._jetons < 0 else 0.0
+        if attente > 0:
+            time.sleep(attente)
+
+
+# Limiteur global : respecte le quota TMDB quel que soit le nombre de threads appelants
+limiteur_tmdb = LimiteurDebit(TMDB_REQUETES_PAR_SECONDE, TMDB_RAFALE_MAX)
+# Limiteur des appels au service de traduction (MyMemory)
+limiteur_traduction = LimiteurDebit(TRADUCTION_REQUETES_PAR_SECONDE, TRADUCTION_RAFALE_MAX)
+
+# Enrichissements en cours dans ce processus (id du film -> résultat attendu par les appelants concurrents)
+_enrichissements_en_vol: Dict[int, Future] = {}
+_verrou_en_vol = threading.Lock()
+
+# Pool partagé des enrichissements concurrents (créé à la première utilisation)
+_executeur_tmdb: Optional[ThreadPoolExecutor] = None
+_verrou_executeur = threading.Lock()
+
+
 def _get_tmdb_params_and_headers(language: str = "fr-FR") -> Tuple[dict, dict]:
         """Retourne les params et headers à utiliser pour les appels à l'API TMDB.
 
@@ -61,18 +124,21 @@ def check_tmdb_env() -> bool:
 
 
 
-def traduire_texte_avec_google_translate(text: str, source_lang: str = "en", target_lang: str = "fr") -> Optional[str]:
-    """Traduit un texte en utilisant l'API MyMemory (gratuite et fiable)."""
-    if not text or len(text) < 5:
-        return text
-    
+# Longueur maximale (octets UTF-8) d'un texte envoyé à MyMemory en une requête (limite du service)
+MYMEMORY_LONGUEUR_MAX = 500
+# Séparateur des textes regroupés dans une même requête de traduction
+SEPARATEUR_LOT_TRADUCTION = "\n|||\n"
+# Fin de phrase : les résumés sont découpés en phrases pour remplir chaque requête
+_FIN_DE_PHRASE = re.compile(r"(?<=[.!?])\s+")
+
+
+def _traduire_via_mymemory(text: str, source_lang: str, target_lang: str) -> Optional[str]:
+    """Un appel MyMemory ; renvoie la traduction, ou None si elle a échoué ou est identique au texte."""
     try:
         import urllib.parse
-        # Limiter à 500 caractères pour éviter les erreurs
-        text_to_translate = text[:500] if len(text) > 500 else text
-        url = f"https://api.mymemory.translated.net/get?q={urllib.parse.quote(text_to_translate)}&langpair={source_lang}|{target_lang}"
-        # MyMemory API: no special headers/params needed
-        response = requests.get(url, timeout=5)
+        url = f"https://api.mymemory.translated.net/get?q={urllib.parse.quote(text)}&langpair={source_lang}|{target_lang}"
+        # MyMemory API: no special headers/params needed (session partagée, connexions réutilisées)
+        response = http_client.get(url, acquerir=limiteur_traduction.acquerir, timeout=5)
         
         if response.status_code == 200:
             data = response.json()
@@ -82,12 +148,123 @@ def traduire_texte_avec_google_translate(text: str, source_lang: str = "en", tar
                     return translated
     except Exception as e:
         logger.warning(f"⚠️ Erreur traduction MyMemory: {e}")
+    return None
+
+
+def traduire_texte_avec_google_translate(text: str, source_lang: str = "en", target_lang: str = "fr") -> Optional[str]:
+    """Traduit un texte en utilisant l'API MyMemory (gratuite et fiable), via le cache des traductions."""
+    if not text or len(text) < 5:
+        return text
+    
+    traduction = cache_traductions.get(text, source_lang, target_lang)
+    if traduction is not None:
+        return traduction
+    
+    # Limiter à 500 caractères pour éviter les erreurs
+    traduction = _traduire_via_mymemory(text[:MYMEMORY_LONGUEUR_MAX], source_lang, target_lang)
+    if traduction is not None:
+        cache_traductions.set(text, source_lang, target_lang, traduction)
+        return traduction
     
     # Fallback: retourner le texte original si rien ne marche
     return text
 
 
-def enrichir_film_avec_api(film: Dict) -> Dict:
+def _longueur_requete(texte: str) -> int:
+    """Longueur d'un texte telle que la compte MyMemory (octets UTF-8)."""
+    return len(texte.encode("utf-8"))
+
+
+def _phrases(texte: str) -> List[str]:
+    """Découpe un texte en phrases d'au plus MYMEMORY_LONGUEUR_MAX octets (une phrase plus longue est coupée entre deux mots)."""
+    morceaux: List[str] = []
+    for phrase in _FIN_DE_PHRASE.split(texte.strip()):
+        while _longueur_requete(phrase) > MYMEMORY_LONGUEUR_MAX:
+            fin = MYMEMORY_LONGUEUR_MAX
+            while _longueur_requete(phrase[:fin]) > MYMEMORY_LONGUEUR_MAX:
+                fin -= 1
+            espace = phrase.rfind(" ", 0, fin)
+            fin = espace if espace > 0 else fin
+            morceaux.append(phrase[:fin])
+            phrase = phrase[fin:].lstrip()
+        if phrase:
+            morceaux.append(phrase)
+    return morceaux
+
+
+def _lots_de_traduction(textes: List[str]) -> List[List[str]]:
+    """Regroupe les textes en lots dont la requête jointe tient dans la limite de MyMemory."""
+    lots: List[List[str]] = []
+    lot: List[str] = []
+    longueur = 0
+    separateur = _longueur_requete(SEPARATEUR_LOT_TRADUCTION)
+    for texte in textes:
+        longueur_jointe = longueur + separateur + _longueur_requete(texte)
+        if lot and longueur_jointe <= MYMEMORY_LONGUEUR_MAX:
+            lot.append(texte)
+            longueur = longueur_jointe
+        else:
+            if lot:
+                lots.append(lot)
+            lot, longueur = [texte], _longueur_requete(texte)
+    if lot:
+        lots.append(lot)
+    return lots
+
+
+def traduire_textes(
+    textes: List[str], source_lang: str = "en", target_lang: str = "fr", en_ligne: bool = True
+) -> List[str]:
+    """
+    Traduit plusieurs textes ; l'ordre est conservé.
+
+    Les traductions en cache sont servies sans appel réseau. Avec `en_ligne`, les
+    autres textes sont découpés en phrases, et les phrases (dédoublonnées, de
+    textes différents) regroupées à plusieurs par requête MyMemory, au plus près
+    de sa limite de longueur : des résumés d'environ 300 caractères ne partent pas
+    un par requête. Un lot dont la réponse ne se redécoupe pas en autant de
+    phrases est retraduit phrase par phrase ; un texte dont une phrase n'a pas pu
+    être traduite n'est pas mis en cache. Sans `en_ligne`, seul le cache est lu. Comme pour
+    `traduire_texte_avec_google_translate`, un texte non traduit est renvoyé tel quel.
+    """
+    a_traduire = [t for t in dict.fromkeys(textes) if t and len(t) >= 5]
+    traductions = cache_traductions.get_many(a_traduire, source_lang, target_lang)
+    manquants = [t for t in a_traduire if t not in traductions]
+
+    if manquants and en_ligne:
+        decoupes = {texte: _phrases(texte) for texte in manquants}
+        phrases = list(dict.fromkeys(phrase for morceaux in decoupes.values() for phrase in morceaux))
+        traduites: Dict[str, str] = {}
+        for lot in _lots_de_traduction(phrases):
+            if len(lot) > 1:
+                reponse = _traduire_via_mymemory(SEPARATEUR_LOT_TRADUCTION.join(lot), source_lang, target_lang)
+                morceaux = reponse.split(SEPARATEUR_LOT_TRADUCTION.strip()) if reponse else []
+                if len(morceaux) == len(lot):
+                    traduites.update(
+                        (phrase, morceau.strip()) for phrase, morceau in zip(lot, morceaux) if morceau.strip()
+                    )
+                    continue
+            for phrase in lot:
+                traduction = _traduire_via_mymemory(phrase, source_lang, target_lang)
+                if traduction is not None:
+                    traduites[phrase] = traduction
+        nouvelles: Dict[str, str] = {
+            texte: " ".join(traduites[phrase] for phrase in morceaux)
+            for texte, morceaux in decoupes.items()
+            if morceaux and all(phrase in traduites for phrase in morceaux)
+        }
+        cache_traductions.set_many(nouvelles, source_lang, target_lang)
+        traductions.update(nouvelles)
+        logger.info(f"🌐 {len(nouvelles)}/{len(manquants)} textes traduits ({len(a_traduire) - len(manquants)} en cache)")
+
+    return [traductions.get(texte, texte) for texte in textes]
+
+
+class EchecEnrichissement(RuntimeError):
+    """L'appel TMDB n'a pas abouti (statut HTTP, délai dépassé, erreur) : le film n'est pas enrichi."""
+
+
+def enrichir_film_tmdb(film: Dict) -> Dict:
     """
     Enrichit un film avec :
     - Affiche (poster_path)
@@ -97,6 +274,9 @@ def enrichir_film_avec_api(film: Dict) -> Dict:
     - Description en français
     - Durée du film
     - Budget et revenus
+
+    Lève EchecEnrichissement si TMDB n'a pas répondu : l'appelant ne doit pas
+    mettre en cache le film comme s'il venait d'être enrichi.
     """
     film_id = film.get("id")
     if not film_id:
@@ -110,10 +290,11 @@ def enrichir_film_avec_api(film: Dict) -> Dict:
         # Récupérer les détails du film en français
         url = f"{TMDB_BASE_URL}/movie/{film_id}"
         params, headers = _get_tmdb_params_and_headers(language="fr-FR")
-        response = requests.get(url, params=params, headers=headers, timeout=5)
+        # Chaque essai (reprises sur 429 / 5xx comprises) passe par le limiteur
+        response = http_client.get(url, acquerir=limiteur_tmdb.acquerir, params=params, headers=headers, timeout=5)
         
         if response.status_code != 200:
-            return film
+            raise EchecEnrichissement(f"Réponse TMDB {response.status_code} pour le film {film_id}")
 
         data = response.json()
 
@@ -137,7 +318,9 @@ def enrichir_film_avec_api(film: Dict) -> Dict:
         if not overview or len(overview.strip()) < 10:
             try:
                 params_en, headers_en = _get_tmdb_params_and_headers(language="en-US")
-                response_en = requests.get(url, params=params_en, headers=headers_en, timeout=5)
+                response_en = http_client.get(
+                    url, acquerir=limiteur_tmdb.acquerir, params=params_en, headers=headers_en, timeout=5
+                )
                 if response_en.status_code == 200:
                     data_en = response_en.json()
                     overview = data_en.get("overview", "")
@@ -155,7 +338,10 @@ def enrichir_film_avec_api(film: Dict) -> Dict:
             
             # Si moins de 30% de mots français, on traduit
             if word_count > 0 and (french_matches / max(word_count, 1)) < 0.3:
-                film["overview_fr"] = traduire_texte_avec_google_translate(overview, "en", "fr")
+                traduction = traduire_textes([overview], "en", "fr", en_ligne=TRADUCTION_EN_LIGNE)[0]
+                if traduction != overview or TRADUCTION_EN_LIGNE:
+                    film["overview_fr"] = traduction
+                # Sinon (pas encore pré-traduit) : on garde le résumé FR déjà connu, s'il y en a un
             else:
                 film["overview_fr"] = overview
         else:
@@ -230,12 +416,92 @@ def enrichir_film_avec_api(film: Dict) -> Dict:
 
         return film
 
+    except EchecEnrichissement:
+        raise
     except Exception as e:
         logger.error(f"Erreur API TMDB pour film {film_id}: {e}")
+        raise EchecEnrichissement(f"Erreur API TMDB pour le film {film_id}: {e}") from e
+
+
+def enrichir_film_avec_api(film: Dict) -> Dict:
+    """Enrichit un film avec TMDB (voir enrichir_film_tmdb) ; en cas d'échec, le film est retourné tel quel."""
+    try:
+        return enrichir_film_tmdb(film)
+    except EchecEnrichissement as e:
+        logger.debug(f"Film {film.get('id')} non enrichi: {e}")
         return film
 
 
-def enrichir_liste_films(films: list[Dict]) -> list[Dict]:
-    """Enrichit une liste de films avec les données de l'API TMDB."""
-    return [enrichir_film_avec_api(film) for film in films]
+def executeur_tmdb() -> ThreadPoolExecutor:
+    """Pool de threads partagé : borne le nombre d'appels TMDB simultanés pour tout le processus."""
+    global _executeur_tmdb
+    with _verrou_executeur:
+        if _executeur_tmdb is None:
+            _executeur_tmdb = ThreadPoolExecutor(
+                max_workers=max(TMDB_CONCURRENCE_MAX, 1),
+                thread_name_prefix="tmdb",
+            )
+        return _executeur_tmdb
+
+
+def enrichir_film_sans_doublon(film: Dict, enrichir: Callable[[Dict], Dict] = enrichir_film_avec_api) -> Dict:
+    """
+    Enrichit un film avec `enrichir`, un seul appel à la fois par id dans le processus.
+
+    Le premier appelant fait l'appel ; les appelants concurrents pour le même film
+    attendent son résultat (ou son exception) au lieu de refaire la requête TMDB.
+    Ne pas imbriquer deux appels pour le même film (l'appel interne attendrait l'externe).
+    """
+    film_id = film.get("id")
+    if not film_id:
+        return enrichir(film)
+
+    with _verrou_en_vol:
+        en_vol = _enrichissements_en_vol.get(int(film_id))
+        if en_vol is None:
+            en_vol = _enrichissements_en_vol[int(film_id)] = Future()
+            premier = True
+        else:
+            premier = False
+
+    if not premier:
+        logger.debug(f"🔗 Film {film_id} déjà en cours d'enrichissement : résultat partagé")
+        return {**film, **en_vol.result()}
+
+    try:
+        resultat = enrichir(film)
+        en_vol.set_result(resultat)
+        return resultat
+    except BaseException as e:
+        en_vol.set_exception(e)
+        raise
+    finally:
+        with _verrou_en_vol:
+            _enrichissements_en_vol.pop(int(film_id), None)
+
+
+def _enrichir_film_sans_erreur(film: Dict, enrichir: Callable[[Dict], Dict] = enrichir_film_avec_api) -> Dict:
+    """Enrichit un film ; en cas d'erreur, le film est retourné tel quel."""
+    try:
+        return enrichir(film)
+    except Exception as e:
+        logger.warning(f"⚠️ Erreur enrichissement film {film.get('id')}: {e}")
+        return film
+
+
+def enrichir_liste_films(films: List[Dict], enrichir: Callable[[Dict], Dict] = enrichir_film_sans_doublon) -> List[Dict]:
+    """
+    Enrichit une liste de films avec les données de l'API TMDB, en parallèle.
+
+    Les appels sont répartis sur le pool partagé (au plus TMDB_CONCURRENCE_MAX à la
+    fois) et cadencés par le limiteur global : la durée totale est proche de celle
+    de l'appel le plus lent plutôt que de la somme des appels. L'ordre des films est
+    conservé ; un film dont l'enrichissement échoue est retourné tel quel.
+    Un film déjà en cours d'enrichissement (autre requête) n'est pas redemandé à TMDB.
+    `enrichir` remplace `enrichir_film_sans_doublon` (par exemple pour coordonner
+    aussi les appels entre processus).
+    """
+    if len(films) <= 1:
+        return [_enrichir_film_sans_erreur(film, enrichir) for film in films]
+    return list(executeur_tmdb().map(lambda film: _enrichir_film_sans_erreur(film, enrichir), films))
 
@@ -0,0 +1,56 @@
+"""Script hors ligne : construit l'index de recherche sémantique des résumés (data/index_semantique/)."""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+# Configuration
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+CODE_DIR = BASE_DIR / "code"
+
+# Ajouter le dossier code au path pour les imports
+if str(CODE_DIR) not in sys.path:
+    sys.path.insert(0, str(CODE_DIR))
+
+from catalogue import Catalogue
+from data_loading import charger_films_enrichis, charger_films_prepares
+from recherche_semantique import DIMENSION, DOSSIER_INDEX_SEMANTIQUE, IndexSemantique, construire_index
+
+DATA_ENRICHED_COMPLETE = BASE_DIR / "data" / "films_enriched_complete.csv"
+DATASET_TMBD = BASE_DIR / "dataset" / "tmdb_5000_movies.csv"
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def construire_index_semantique(dimension: int = DIMENSION, dossier: Path = DOSSIER_INDEX_SEMANTIQUE) -> None:
+    """Encode les résumés du catalogue et enregistre l'index ANN."""
+    if DATA_ENRICHED_COMPLETE.exists():
+        logger.info(f"📥 Chargement du catalogue enrichi: {DATA_ENRICHED_COMPLETE}")
+        films = charger_films_enrichis(str(DATA_ENRICHED_COMPLETE))
+    else:
+        logger.info(f"📥 Chargement du dataset brut: {DATASET_TMBD}")
+        films = charger_films_prepares(str(DATASET_TMBD))
+
+    catalogue = Catalogue.depuis_films(films)
+    logger.info(f"✅ {len(catalogue)} films chargés")
+
+    debut = time.perf_counter()
+    construire_index(catalogue, dossier, dimension)
+    logger.info(f"✅ Index sémantique enregistré dans {dossier} ({time.perf_counter() - debut:.1f}s)")
+
+    index = IndexSemantique.charger(dossier)
+    if index is not None:
+        logger.info(f"🔎 Vérification: {len(index)} films indexés, dimension {index.encodeur.dimension}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dimension", type=int, default=DIMENSION, help="Dimension des plongements")
+    parser.add_argument("--dossier", type=Path, default=DOSSIER_INDEX_SEMANTIQUE, help="Dossier de sortie")
+    args = parser.parse_args()
+    construire_index_semantique(args.dimension, args.dossier)
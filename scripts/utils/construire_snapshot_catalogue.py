@@ -0,0 +1,57 @@
+"""Script de build : écrit le snapshot binaire du catalogue (data/catalogue_snapshot/) chargé au démarrage de l'app."""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+# Configuration
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+CODE_DIR = BASE_DIR / "code"
+
+# Ajouter le dossier code au path pour les imports
+if str(CODE_DIR) not in sys.path:
+    sys.path.insert(0, str(CODE_DIR))
+
+from catalogue import Catalogue
+from data_loading import charger_films_enrichis
+from snapshot_catalogue import DOSSIER_SNAPSHOT, charger_snapshot, ecrire_snapshot
+
+DATA_ENRICHED_COMPLETE = BASE_DIR / "data" / "films_enriched_complete.csv"
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def construire_snapshot(source: Path = DATA_ENRICHED_COMPLETE, dossier: Path = DOSSIER_SNAPSHOT) -> None:
+    """Charge le CSV enrichi, construit le catalogue par colonnes et l'écrit en snapshot."""
+    if not source.exists():
+        logger.error(f"❌ Fichier source introuvable: {source}")
+        logger.info("   💡 Lancez d'abord enrich_all_films.py")
+        sys.exit(1)
+
+    debut = time.perf_counter()
+    logger.info(f"📥 Chargement du catalogue enrichi: {source}")
+    catalogue = Catalogue.depuis_films(charger_films_enrichis(str(source)))
+    logger.info(f"✅ {len(catalogue)} films chargés ({time.perf_counter() - debut:.1f}s)")
+
+    ecrire_snapshot(catalogue, dossier, source)
+    logger.info(f"💾 Snapshot écrit dans {dossier}")
+
+    debut = time.perf_counter()
+    verification = charger_snapshot(dossier, source)
+    if verification is None or len(verification) != len(catalogue):
+        logger.error("❌ Le snapshot écrit n'a pas pu être relu")
+        sys.exit(1)
+    logger.info(f"⚡ Vérification: snapshot relu en {time.perf_counter() - debut:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--source", type=Path, default=DATA_ENRICHED_COMPLETE, help="CSV des films enrichis")
+    parser.add_argument("--dossier", type=Path, default=DOSSIER_SNAPSHOT, help="Dossier du snapshot")
+    args = parser.parse_args()
+    construire_snapshot(args.source, args.dossier)
@@ -1,14 +1,28 @@
-"""Script pour enrichir TOUS les films avec l'API TMDB (bandes annonces, images, etc.)."""
+"""Script pour enrichir TOUS les films avec l'API TMDB (bandes annonces, images, etc.).
+
+Pipeline reprenable et parallèle :
+- N workers concurrents, cadencés par le limiteur de débit global de tmdb_api
+  (seau à jetons réglé sur le quota TMDB) ;
+- chaque résultat est ajouté au fil de l'eau à un fichier de reprise JSONL
+  (append-only) : une relance ne traite que les films absents, en erreur ou
+  trop anciens ;
+- progression et temps restant estimé affichés régulièrement ;
+- compaction finale : catalogue CSV (et, en option, snapshot binaire).
+"""
 
 from __future__ import annotations
 
-import time
+import argparse
+import json
 import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Dict
+from typing import Dict, List, Optional
 
 import pandas as pd
-import sys
 
 # Configuration
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
@@ -18,107 +32,269 @@ CODE_DIR = BASE_DIR / "code"
 if str(CODE_DIR) not in sys.path:
     sys.path.insert(0, str(CODE_DIR))
 
+import tmdb_api
 from data_loading import charger_films_prepares
 from sentiment import ajouter_sentiment_aux_films
-from tmdb_api import enrichir_film_avec_api, check_tmdb_env
+from tmdb_api import LimiteurDebit, enrichir_film_avec_api, check_tmdb_env
 from sound_manager import add_sound_to_film
 DATASET_TMBD = BASE_DIR / "dataset" / "tmdb_5000_movies.csv"
 OUTPUT_FILE = BASE_DIR / "data" / "films_enriched_complete.csv"
+# Fichier de reprise : une ligne JSON par film traité (la dernière ligne d'un film fait foi)
+CHECKPOINT_FILE = BASE_DIR / "data" / "enrichissement_checkpoint.jsonl"
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Rate limiting : 40 requêtes toutes les 10 secondes (limite TMDB)
-DELAY_BETWEEN_REQUESTS = 0.25  # 250ms entre chaque requête
-BATCH_SIZE = 40  # Pause après chaque batch
+# Nombre de workers concurrents (le débit reste borné par le limiteur TMDB)
+NB_WORKERS = tmdb_api.TMDB_CONCURRENCE_MAX
+# Âge maximal (jours) d'un enrichissement avant qu'il soit refait
+AGE_MAX_JOURS = 30
+# Intervalle (s) entre deux rapports de progression
+INTERVALLE_PROGRESSION = 10
+# Écriture forcée sur disque du fichier de reprise toutes les N lignes
+LIGNES_PAR_FSYNC = 50
+
+# Champs apportés par l'API TMDB (seuls ceux-ci sont stockés dans le fichier de reprise)
+CHAMPS_ENRICHIS = (
+    "poster_url", "backdrop_url", "overview_fr", "trailer_url", "trailer_key",
+    "runtime", "budget", "revenue", "streaming_links", "streaming_providers",
+)
+RESUME_PAR_DEFAUT = "Pas de description disponible."
+
+
+def lire_checkpoint(chemin: Path = CHECKPOINT_FILE) -> Dict[int, Dict]:
+    """Dernier état enregistré de chaque film (id -> entrée). Ignore une dernière ligne tronquée."""
+    etats: Dict[int, Dict] = {}
+    if not chemin.exists():
+        return etats
+    with open(chemin, "r", encoding="utf-8") as f:
+        for numero, ligne in enumerate(f, 1):
+            try:
+                entree = json.loads(ligne)
+                etats[int(entree["id"])] = entree
+            except (ValueError, KeyError, TypeError):
+                logger.warning(f"⚠️  Ligne {numero} du fichier de reprise illisible (ignorée)")
+    return etats
+
+
+def films_a_traiter(films: List[Dict], etats: Dict[int, Dict], age_max_jours: float) -> List[Dict]:
+    """Films absents du fichier de reprise, en erreur, ou enrichis depuis plus de `age_max_jours`."""
+    limite = time.time() - age_max_jours * 86400
+    a_traiter = []
+    for film in films:
+        entree = etats.get(int(film["id"]))
+        if entree is None or not entree.get("ok") or entree.get("enrichi_le", 0) < limite:
+            a_traiter.append(film)
+    return a_traiter
+
+
+def _enrichir(film: Dict) -> Dict:
+    """Enrichit un film ; retourne l'entrée du fichier de reprise (ok=False si TMDB n'a rien rendu)."""
+    base = {k: v for k, v in film.items() if k not in CHAMPS_ENRICHIS}
+    try:
+        enrichi = enrichir_film_avec_api(dict(base))
+        champs = {k: enrichi[k] for k in CHAMPS_ENRICHIS if k in enrichi}
+        erreur = None if champs else "aucune donnée TMDB"
+    except Exception as e:
+        champs, erreur = {}, str(e)
+    entree = {"id": int(film["id"]), "ok": erreur is None, "enrichi_le": time.time(), "champs": champs}
+    if erreur:
+        entree["erreur"] = erreur
+    return entree
+
+
+def _rapport_progression(faits: int, total: int, erreurs: int, debut: float) -> None:
+    ecoule = time.monotonic() - debut
+    debit = faits / ecoule if ecoule > 0 else 0.0
+    restant = (total - faits) / debit if debit > 0 else float("inf")
+    eta = time.strftime("%H:%M:%S", time.gmtime(restant)) if restant != float("inf") else "?"
+    logger.info(
+        f"   📊 Progression: {faits}/{total} films ({faits * 100 // max(total, 1)}%) - "
+        f"{debit:.1f} films/s - {erreurs} erreurs - reste ~{eta}"
+    )
+
 
+def enrichir_en_parallele(films: List[Dict], nb_workers: int = NB_WORKERS, chemin: Path = CHECKPOINT_FILE) -> int:
+    """Enrichit les films avec `nb_workers` threads et ajoute chaque résultat au fichier de reprise.
+
+    Retourne le nombre d'erreurs. Une interruption (Ctrl+C) annule les films non
+    commencés ; ceux déjà écrits ne seront pas refaits à la relance.
+    """
+    total = len(films)
+    erreurs = 0
+    debut = dernier_rapport = time.monotonic()
+    chemin.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(chemin, "a", encoding="utf-8") as sortie:
+        executeur = ThreadPoolExecutor(max_workers=max(nb_workers, 1), thread_name_prefix="enrichissement")
+        try:
+            taches = [executeur.submit(_enrichir, film) for film in films]
+            for faits, tache in enumerate(as_completed(taches), 1):
+                entree = tache.result()
+                erreurs += not entree["ok"]
+                sortie.write(json.dumps(entree, ensure_ascii=False) + "\n")
+                if faits % LIGNES_PAR_FSYNC == 0:
+                    sortie.flush()
+                    os.fsync(sortie.fileno())
+                if time.monotonic() - dernier_rapport >= INTERVALLE_PROGRESSION or faits == total:
+                    _rapport_progression(faits, total, erreurs, debut)
+                    dernier_rapport = time.monotonic()
+        except KeyboardInterrupt:
+            logger.warning("⏹️  Interruption : les films déjà traités sont conservés, relancez pour reprendre")
+            raise
+        finally:
+            executeur.shutdown(wait=True, cancel_futures=True)
+            sortie.flush()
+            os.fsync(sortie.fileno())
+    return erreurs
+
+
+def _resume_fr_utile(resume, overview) -> bool:
+    """True pour un vrai résumé français (ni vide, ni le texte par défaut, ni le résumé anglais non traduit)."""
+    return isinstance(resume, str) and resume.strip() != "" and resume != RESUME_PAR_DEFAUT and resume != overview
+
+
+def resumes_fr_existants(sortie: Path = OUTPUT_FILE) -> Dict[int, str]:
+    """Résumés français du catalogue déjà écrit (par exemple par traduire_resumes.py), par id."""
+    if not sortie.exists():
+        return {}
+    try:
+        df = pd.read_csv(sortie, usecols=lambda colonne: colonne in ("id", "overview", "overview_fr"))
+    except (ValueError, OSError, pd.errors.ParserError) as e:
+        logger.warning(f"⚠️  Catalogue existant illisible, résumés FR non repris: {e}")
+        return {}
+    if "id" not in df.columns or "overview_fr" not in df.columns:
+        return {}
+    df = df.dropna(subset=["id"])
+    overview = df["overview"] if "overview" in df.columns else [None] * len(df)
+    return {
+        int(film_id): resume
+        for film_id, resume, anglais in zip(df["id"], df["overview_fr"], overview)
+        if _resume_fr_utile(resume, anglais)
+    }
+
+
+def compacter(films: List[Dict], etats: Dict[int, Dict], sortie: Path = OUTPUT_FILE) -> List[Dict]:
+    """Fusionne les films de base et leurs champs enrichis, puis écrit le catalogue CSV (remplacement atomique).
+
+    Un résumé français déjà présent dans le catalogue (traduit par traduire_resumes.py)
+    est conservé quand le fichier de reprise n'en apporte pas de meilleur.
+    """
+    resumes_fr = resumes_fr_existants(sortie)
+    enriched_films = []
+    for film in films:
+        entree = etats.get(int(film["id"]))
+        film_enrichi = {**film, **(entree.get("champs", {}) if entree else {})}
+        resume_existant = resumes_fr.get(int(film["id"]))
+        if resume_existant and not _resume_fr_utile(film_enrichi.get("overview_fr"), film.get("overview")):
+            film_enrichi["overview_fr"] = resume_existant
+        add_sound_to_film(film_enrichi)
+        enriched_films.append(film_enrichi)
+
+    sortie.parent.mkdir(parents=True, exist_ok=True)
+    df = pd.DataFrame(enriched_films)
+    # Convertir les listes en string pour le CSV
+    if "genres" in df.columns:
+        df["genres"] = df["genres"].apply(lambda g: str(g) if g else "[]")
+    if "streaming_links" in df.columns:
+        df["streaming_links"] = df["streaming_links"].apply(lambda s: str(s) if isinstance(s, list) and s else "[]")
+    if "streaming_providers" in df.columns:
+        df["streaming_providers"] = df["streaming_providers"].apply(lambda s: str(s) if isinstance(s, list) and s else "[]")
+
+    temporaire = sortie.with_suffix(sortie.suffix + ".tmp")
+    df.to_csv(temporaire, index=False)
+    os.replace(temporaire, sortie)
+    return enriched_films
+
+
+def compacter_checkpoint(etats: Dict[int, Dict], chemin: Path = CHECKPOINT_FILE) -> None:
+    """Réécrit le fichier de reprise avec une seule ligne (la dernière) par film."""
+    temporaire = chemin.with_suffix(chemin.suffix + ".tmp")
+    with open(temporaire, "w", encoding="utf-8") as f:
+        for entree in etats.values():
+            f.write(json.dumps(entree, ensure_ascii=False) + "\n")
+    os.replace(temporaire, chemin)
+
+
+def enrichir_tous_films(
+    nb_workers: int = NB_WORKERS,
+    debit: Optional[float] = None,
+    age_max_jours: float = AGE_MAX_JOURS,
+    snapshot: bool = False,
+) -> List[Dict]:
+    """Enrichit TOUS les films avec l'API TMDB (reprise automatique), puis écrit le catalogue."""
 
-def enrichir_tous_films() -> List[Dict]:
-    """Enrichit TOUS les films avec l'API TMDB."""
-    
     if not check_tmdb_env():
         logger.error("❌ Clé API TMDB non configurée. Configurez TMDB_API_KEY dans l'environnement.")
         return []
-    
+
+    if debit is not None:
+        tmdb_api.limiteur_tmdb = LimiteurDebit(debit, tmdb_api.TMDB_RAFALE_MAX)
+
     logger.info("📥 Chargement du dataset brut...")
     films = charger_films_prepares(str(DATASET_TMBD))
     films = ajouter_sentiment_aux_films(films)
     total = len(films)
     logger.info(f"✅ {total} films chargés")
-    
-    logger.info("🔄 Enrichissement avec API TMDB (cela peut prendre 10-15 minutes)...")
-    logger.info("   ⚠️  Rate limiting activé pour respecter les limites de l'API")
-    
-    enriched_films = []
-    errors = 0
-    
-    for i, film in enumerate(films, 1):
-        try:
-            # Enrichir le film
-            film_enriched = enrichir_film_avec_api(film)
-            # Ajouter le son
-            add_sound_to_film(film_enriched)
-            enriched_films.append(film_enriched)
-            
-            # Log progress
-            if i % 50 == 0:
-                logger.info(f"   📊 Progression: {i}/{total} films ({i*100//total}%)")
-            
-            # Rate limiting : pause entre chaque requête
-            time.sleep(DELAY_BETWEEN_REQUESTS)
-            
-            # Pause plus longue après chaque batch
-            if i % BATCH_SIZE == 0:
-                logger.info(f"   ⏸️  Pause de 10 secondes (rate limit)...")
-                time.sleep(10)
-                
-        except Exception as e:
-            errors += 1
-            logger.warning(f"⚠️  Erreur pour film {film.get('id')} ({film.get('title')}): {e}")
-            # Ajouter quand même le film sans enrichissement
-            add_sound_to_film(film)
-            enriched_films.append(film)
-    
-    logger.info(f"✅ Enrichissement terminé: {len(enriched_films)} films ({errors} erreurs)")
-    
+
+    etats = lire_checkpoint()
+    a_traiter = films_a_traiter(films, etats, age_max_jours)
+    logger.info(f"🔁 {total - len(a_traiter)} films déjà enrichis (fichier de reprise), {len(a_traiter)} à traiter")
+
+    if a_traiter:
+        logger.info(
+            f"🔄 Enrichissement avec API TMDB: {nb_workers} workers, "
+            f"{tmdb_api.limiteur_tmdb.debit:g} requêtes/s max"
+        )
+        erreurs = enrichir_en_parallele(a_traiter, nb_workers)
+        logger.info(f"✅ Enrichissement terminé: {len(a_traiter)} films ({erreurs} erreurs)")
+        etats = lire_checkpoint()
+        compacter_checkpoint(etats)
+
     # Sauvegarder
-    logger.info(f"💾 Sauvegarde dans {OUTPUT_FILE}...")
-    OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
-    
-    df = pd.DataFrame(enriched_films)
-    # Convertir les listes en string pour le CSV
-    if "genres" in df.columns:
-        df["genres"] = df["genres"].apply(lambda g: str(g) if g else "[]")
-    if "streaming_links" in df.columns:
-        df["streaming_links"] = df["streaming_links"].apply(lambda s: str(s) if s else "[]")
-    if "streaming_providers" in df.columns:
-        df["streaming_providers"] = df["streaming_providers"].apply(lambda s: str(s) if s else "[]")
-    
-    df.to_csv(OUTPUT_FILE, index=False)
+    logger.info(f"💾 Compaction dans {OUTPUT_FILE}...")
+    enriched_films = compacter(films, etats)
     logger.info(f"✅ Fichier sauvegardé: {OUTPUT_FILE}")
-    
+
+    if snapshot:
+        from catalogue import Catalogue
+        from data_loading import charger_films_enrichis
+        from snapshot_catalogue import DOSSIER_SNAPSHOT, ecrire_snapshot
+
+        # Relu depuis le CSV : le snapshot est identique à ce que charge l'app
+        catalogue = Catalogue.depuis_films(charger_films_enrichis(str(OUTPUT_FILE)))
+        ecrire_snapshot(catalogue, DOSSIER_SNAPSHOT, OUTPUT_FILE)
+        logger.info(f"⚡ Snapshot du catalogue écrit: {DOSSIER_SNAPSHOT}")
+
     # Statistiques
     films_avec_trailer = sum(1 for f in enriched_films if f.get("trailer_url"))
     films_avec_poster = sum(1 for f in enriched_films if f.get("poster_url"))
     logger.info(f"\n📊 Statistiques:")
     logger.info(f"   - Films avec bande annonce: {films_avec_trailer}/{total}")
     logger.info(f"   - Films avec affiche: {films_avec_poster}/{total}")
-    
+
     return enriched_films
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Enrichit tous les films avec l'API TMDB (reprenable).")
+    parser.add_argument("--workers", type=int, default=NB_WORKERS, help="Nombre de workers concurrents")
+    parser.add_argument("--debit", type=float, default=None, help="Requêtes TMDB par seconde (défaut: TMDB_REQUETES_PAR_SECONDE)")
+    parser.add_argument("--age-max-jours", type=float, default=AGE_MAX_JOURS, help="Refaire les films enrichis depuis plus de N jours")
+    parser.add_argument("--snapshot", action="store_true", help="Écrire aussi le snapshot binaire du catalogue")
+    parser.add_argument("--oui", action="store_true", help="Ne pas demander de confirmation")
+    args = parser.parse_args()
+
     print("=" * 80)
     print("🎬 ENRICHISSEMENT COMPLET DE TOUS LES FILMS")
     print("=" * 80)
     print()
     print("⚠️  ATTENTION: Ce script va faire ~5000 requêtes à l'API TMDB")
-    print("   Temps estimé: 10-15 minutes")
+    print("   Temps estimé: quelques minutes (reprise automatique si interrompu)")
     print("   Assurez-vous d'avoir configuré TMDB_API_KEY")
     print()
-    response = input("Continuer? (oui/non): ")
+    response = "oui" if args.oui else input("Continuer? (oui/non): ")
     if response.lower() in ["oui", "o", "yes", "y"]:
-        enrichir_tous_films()
+        enrichir_tous_films(args.workers, args.debit, args.age_max_jours, args.snapshot)
     else:
         print("❌ Annulé")
-
@@ -0,0 +1,56 @@
+"""Script hors ligne : précalcule les k films les plus similaires de chaque film ("plus comme celui-ci")."""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+# Configuration
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+CODE_DIR = BASE_DIR / "code"
+
+# Ajouter le dossier code au path pour les imports
+if str(CODE_DIR) not in sys.path:
+    sys.path.insert(0, str(CODE_DIR))
+
+from catalogue import Catalogue
+from data_loading import charger_films_enrichis, charger_films_prepares
+from similarite import FICHIER_VOISINS, NB_VOISINS, MoteurSimilarite
+
+DATA_ENRICHED_COMPLETE = BASE_DIR / "data" / "films_enriched_complete.csv"
+DATASET_TMBD = BASE_DIR / "dataset" / "tmdb_5000_movies.csv"
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def precalculer_voisins(k: int = NB_VOISINS, sortie: Path = FICHIER_VOISINS) -> None:
+    """Vectorise le catalogue, calcule les k plus proches voisins de chaque film et les enregistre."""
+    if DATA_ENRICHED_COMPLETE.exists():
+        logger.info(f"📥 Chargement du catalogue enrichi: {DATA_ENRICHED_COMPLETE}")
+        films = charger_films_enrichis(str(DATA_ENRICHED_COMPLETE))
+    else:
+        logger.info(f"📥 Chargement du dataset brut: {DATASET_TMBD}")
+        films = charger_films_prepares(str(DATASET_TMBD))
+
+    catalogue = Catalogue.depuis_films(films)
+    logger.info(f"✅ {len(catalogue)} films chargés")
+
+    debut = time.perf_counter()
+    moteur = MoteurSimilarite.construire(catalogue)
+    logger.info(f"🧮 Vecteurs construits: {moteur.vecteurs.shape[1]} dimensions, {moteur.vecteurs.nnz} valeurs non nulles")
+
+    voisins, scores = moteur.calculer_voisins(k)
+    moteur.sauvegarder_voisins(voisins, scores, sortie)
+    logger.info(f"✅ {voisins.shape[1]} voisins/film enregistrés dans {sortie} ({time.perf_counter() - debut:.1f}s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-k", type=int, default=NB_VOISINS, help="Nombre de voisins par film")
+    parser.add_argument("--sortie", type=Path, default=FICHIER_VOISINS, help="Fichier .npz de sortie")
+    args = parser.parse_args()
+    precalculer_voisins(args.k, args.sortie)
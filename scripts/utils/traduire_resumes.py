@@ -0,0 +1,169 @@
+"""Pré-traduction hors ligne des résumés : remplit overview_fr de tout le catalogue enrichi.
+
+- Les résumés à traduire (overview_fr absent, vide ou resté en anglais) sont
+  traduits par lots avec `tmdb_api.traduire_textes`, par N workers concurrents
+  cadencés par le limiteur de débit du service de traduction ;
+- chaque traduction est enregistrée au fil de l'eau dans le cache des traductions
+  (data/traductions.sqlite3) : une relance ne retraduit que les résumés manquants ;
+- les traductions sont ensuite réécrites dans le catalogue CSV et, par défaut, dans
+  le snapshot binaire. L'app n'a plus qu'à lire le cache : aucun appel réseau de
+  traduction pendant les requêtes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+# Configuration
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+CODE_DIR = BASE_DIR / "code"
+
+# Ajouter le dossier code au path pour les imports
+if str(CODE_DIR) not in sys.path:
+    sys.path.insert(0, str(CODE_DIR))
+
+import tmdb_api
+from tmdb_api import LimiteurDebit, traduire_textes
+
+DATA_ENRICHED_COMPLETE = BASE_DIR / "data" / "films_enriched_complete.csv"
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Nombre de workers concurrents (le débit reste borné par le limiteur de traduction)
+NB_WORKERS = 4
+# Nombre de résumés confiés à un worker en une tâche (regroupés ensuite par requête)
+TAILLE_LOT = 20
+# Intervalle (s) entre deux rapports de progression
+INTERVALLE_PROGRESSION = 10
+
+RESUME_PAR_DEFAUT = "Pas de description disponible."
+
+
+def resumes_a_traduire(df: pd.DataFrame) -> pd.Series:
+    """Masque des films dont overview_fr manque, vaut le texte par défaut ou est resté identique à overview."""
+    overview = df["overview"].fillna("").astype(str)
+    if "overview_fr" not in df.columns:
+        return overview.str.len() > 10
+    overview_fr = df["overview_fr"].fillna("").astype(str)
+    manquant = (overview_fr.str.strip() == "") | (overview_fr == RESUME_PAR_DEFAUT) | (overview_fr == overview)
+    return manquant & (overview.str.len() > 10)
+
+
+def traduire_en_parallele(textes: List[str], nb_workers: int = NB_WORKERS, taille_lot: int = TAILLE_LOT) -> Dict[str, str]:
+    """Traduit les textes par lots avec `nb_workers` threads ; retourne texte -> traduction (réussies seulement).
+
+    Une interruption (Ctrl+C) annule les lots non commencés ; les traductions déjà
+    obtenues sont dans le cache et ne seront pas refaites à la relance.
+    """
+    lots = [textes[i:i + taille_lot] for i in range(0, len(textes), taille_lot)]
+    traductions: Dict[str, str] = {}
+    faits = 0
+    debut = dernier_rapport = time.monotonic()
+
+    executeur = ThreadPoolExecutor(max_workers=max(nb_workers, 1), thread_name_prefix="traduction")
+    try:
+        taches = {executeur.submit(traduire_textes, lot, "en", "fr"): lot for lot in lots}
+        for tache in as_completed(taches):
+            lot = taches[tache]
+            traductions.update((t, r) for t, r in zip(lot, tache.result()) if r != t)
+            faits += len(lot)
+            if time.monotonic() - dernier_rapport >= INTERVALLE_PROGRESSION or faits == len(textes):
+                ecoule = time.monotonic() - debut
+                logger.info(
+                    f"   📊 Progression: {faits}/{len(textes)} résumés - {len(traductions)} traduits - "
+                    f"{faits / max(ecoule, 1e-9):.1f} résumés/s"
+                )
+                dernier_rapport = time.monotonic()
+    except KeyboardInterrupt:
+        logger.warning("⏹️  Interruption : les traductions déjà faites sont en cache, relancez pour reprendre")
+        raise
+    finally:
+        executeur.shutdown(wait=True, cancel_futures=True)
+    return traductions
+
+
+def ecrire_catalogue(df: pd.DataFrame, sortie: Path) -> None:
+    """Écrit le catalogue CSV (remplacement atomique)."""
+    temporaire = sortie.with_suffix(sortie.suffix + ".tmp")
+    df.to_csv(temporaire, index=False)
+    os.replace(temporaire, sortie)
+
+
+def traduire_resumes(
+    source: Path = DATA_ENRICHED_COMPLETE,
+    nb_workers: int = NB_WORKERS,
+    debit: Optional[float] = None,
+    snapshot: bool = True,
+) -> int:
+    """Traduit les résumés manquants du catalogue et les y réécrit ; retourne le nombre de résumés ajoutés."""
+    if not source.exists():
+        logger.error(f"❌ Fichier source introuvable: {source}")
+        logger.info("   💡 Lancez d'abord enrich_all_films.py")
+        sys.exit(1)
+
+    if debit is not None:
+        tmdb_api.limiteur_traduction = LimiteurDebit(debit, tmdb_api.TRADUCTION_RAFALE_MAX)
+
+    logger.info(f"📥 Chargement du catalogue enrichi: {source}")
+    df = pd.read_csv(source)
+    masque = resumes_a_traduire(df)
+    textes = list(dict.fromkeys(df.loc[masque, "overview"].astype(str)))
+    logger.info(f"✅ {len(df)} films, {int(masque.sum())} résumés à traduire ({len(textes)} textes distincts)")
+    if not textes:
+        return 0
+
+    # Reprise : les résumés déjà traduits lors d'un passage précédent sont lus dans le cache
+    en_cache = traduire_textes(textes, "en", "fr", en_ligne=False)
+    traductions = {t: r for t, r in zip(textes, en_cache) if r != t}
+    restants = [t for t in textes if t not in traductions]
+    logger.info(f"🔁 {len(traductions)} déjà traduits (cache), {len(restants)} à traduire")
+
+    if restants:
+        logger.info(
+            f"🌐 Traduction: {nb_workers} workers, "
+            f"{tmdb_api.limiteur_traduction.debit:g} requêtes/s max"
+        )
+        traductions.update(traduire_en_parallele(restants, nb_workers))
+
+    if "overview_fr" not in df.columns:
+        df["overview_fr"] = None
+    nouvelles = df.loc[masque, "overview"].astype(str).map(traductions)
+    nouvelles = nouvelles.dropna()
+    df.loc[nouvelles.index, "overview_fr"] = nouvelles
+    logger.info(f"✅ {len(nouvelles)}/{int(masque.sum())} résumés traduits")
+
+    if len(nouvelles):
+        ecrire_catalogue(df, source)
+        logger.info(f"💾 Catalogue mis à jour: {source}")
+
+        if snapshot:
+            from catalogue import Catalogue
+            from data_loading import charger_films_enrichis
+            from snapshot_catalogue import DOSSIER_SNAPSHOT, ecrire_snapshot
+
+            # Relu depuis le CSV : le snapshot est identique à ce que charge l'app
+            catalogue = Catalogue.depuis_films(charger_films_enrichis(str(source)))
+            ecrire_snapshot(catalogue, DOSSIER_SNAPSHOT, source)
+            logger.info(f"⚡ Snapshot du catalogue écrit: {DOSSIER_SNAPSHOT}")
+
+    return len(nouvelles)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pré-traduit en français les résumés du catalogue (reprenable).")
+    parser.add_argument("--source", type=Path, default=DATA_ENRICHED_COMPLETE, help="CSV des films enrichis")
+    parser.add_argument("--workers", type=int, default=NB_WORKERS, help="Nombre de workers concurrents")
+    parser.add_argument("--debit", type=float, default=None, help="Requêtes de traduction par seconde (défaut: TRADUCTION_REQUETES_PAR_SECONDE)")
+    parser.add_argument("--sans-snapshot", action="store_true", help="Ne pas réécrire le snapshot binaire du catalogue")
+    args = parser.parse_args()
+    traduire_resumes(args.source, args.workers, args.debit, not args.sans_snapshot)
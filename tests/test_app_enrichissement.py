@@ -0,0 +1,146 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "code"))
+
+import cache_manager
+import tmdb_api
+from cache_traductions import CacheTraductions
+
+app = None
+_dossier = None
+_patcheurs = []
+
+
+def setUpModule():
+    """Importe l'app avec un cache des films enrichis temporaire (pas de Hugging Face)."""
+    global app, _dossier
+    os.environ.setdefault("USE_HF", "false")
+    _dossier = tempfile.mkdtemp()
+    cache_manager.fermer_cache()
+    for nom, valeur in (("_cache_db", Path(_dossier) / "cache.sqlite3"), ("_cache_file", Path(_dossier) / "absent.json")):
+        _patcheurs.append(patch.object(cache_manager, nom, valeur))
+        _patcheurs[-1].start()
+    try:
+        import app as module_app
+    except Exception as e:
+        raise unittest.SkipTest(f"Application non chargeable ici (catalogue absent ?): {e}")
+    app = module_app
+
+
+def tearDownModule():
+    cache_manager.fermer_cache()
+    for patcheur in _patcheurs:
+        patcheur.stop()
+    shutil.rmtree(_dossier, ignore_errors=True)
+
+
+class TestEnrichissementProgressif(unittest.TestCase):
+    def setUp(self):
+        self.client = app.app.test_client()
+        with self.client.session_transaction() as session:
+            session["user_id"] = 1
+
+    def _attendre_fin(self, film_id):
+        limite = time.monotonic() + 5
+        while film_id in app._enrichissements_en_cours and time.monotonic() < limite:
+            time.sleep(0.01)
+
+    def test_films_hors_cache_marques_en_attente(self):
+        cache_manager.cache_film({"id": 101, "title": "En cache", "poster_url": "https://p/101.jpg"})
+        with patch.object(app, "_lancer_enrichissements") as lancer, patch.object(app, "TRADUCTION_EN_LIGNE", False):
+            films = app._preparer_films_progressifs([{"id": 101, "title": "En cache"}, {"id": 102, "title": "Absent"}])
+        self.assertEqual([film["id"] for film in films], [101, 102])
+        self.assertFalse(films[0]["enrichissement_en_attente"])
+        self.assertEqual(films[0]["poster_url"], "https://p/101.jpg")
+        self.assertTrue(films[1]["enrichissement_en_attente"])
+        self.assertTrue(films[1]["poster_url"])
+        (lances,), _ = lancer.call_args
+        self.assertEqual([(film["id"], depuis_api) for film, depuis_api in lances], [(102, True)])
+
+    def test_lancement_unique_et_annonce_partagee(self):
+        debut, fin = threading.Event(), threading.Event()
+
+        def enrichir(film, depuis_api):
+            debut.set()
+            fin.wait(5)
+            film["poster_url"] = "https://p/201.jpg"
+            cache_manager.cache_film(film)
+            return film
+
+        with patch.object(app, "_enrichir_et_completer", side_effect=enrichir) as tache:
+            app._lancer_enrichissements([({"id": 201}, True)])
+            app._lancer_enrichissements([({"id": 201}, True)])
+            self.assertTrue(debut.wait(5))
+            # Un autre worker ne voit que la table partagée
+            self.assertEqual(cache_manager.enrichissements_annonces([201, 202]), {201})
+            fin.set()
+            self._attendre_fin(201)
+        self.assertEqual(tache.call_count, 1)
+        self.assertEqual(cache_manager.enrichissements_annonces([201]), set())
+        # Film écrit dans la base avant d'être retiré des attentes
+        ligne = cache_manager._base().execute("SELECT donnees FROM films WHERE id = 201").fetchone()
+        self.assertIn("https://p/201.jpg", ligne[0])
+
+    def test_valeurs_d_affichage_jamais_mises_en_cache(self):
+        resume = "A thief who steals corporate secrets through dream-sharing technology."
+        film = {"id": 401, "title": "T", "overview": resume}
+        traductions = CacheTraductions(Path(_dossier) / "traductions.sqlite3")
+        self.addCleanup(traductions.fermer)
+
+        # TMDB sans affiche ni résumé FR, traduction pas encore disponible
+        def tmdb(film):
+            return {**film, "poster_url": None, "overview_fr": resume}
+
+        with patch.object(tmdb_api, "cache_traductions", traductions), \
+                patch.object(app, "_enrichir_film_partage", side_effect=tmdb), \
+                patch.object(app, "TRADUCTION_EN_LIGNE", False):
+            affiche = app._enrichir_et_completer(dict(film), True)
+            self.assertTrue(affiche["poster_url"].startswith(cache_manager.IMAGE_PAR_DEFAUT))
+            en_cache = cache_manager.get_cached_film(401)
+            self.assertNotIn("overview_fr", en_cache)
+            self.assertFalse((en_cache.get("poster_url") or "").startswith(cache_manager.IMAGE_PAR_DEFAUT))
+
+            # Résumé traduit ensuite hors ligne : la recherche suivante l'affiche
+            traductions.set(resume, "en", "fr", "Un voleur qui dérobe des secrets par le rêve.")
+            with patch.object(app, "_lancer_enrichissements"):
+                (seconde,) = app._preparer_films_progressifs([dict(film)])
+        self.assertEqual(seconde["overview_fr"], "Un voleur qui dérobe des secrets par le rêve.")
+
+    def test_resume_anglais_recopie_considere_non_traduit(self):
+        resume = "Two friends travel across the country looking for a lost record."
+        self.assertTrue(app._resume_a_traduire({"overview": resume, "overview_fr": resume}))
+        self.assertTrue(app._resume_a_traduire({"overview": resume, "overview_fr": "Pas de description disponible."}))
+        self.assertFalse(app._resume_a_traduire({"overview": resume, "overview_fr": "Deux amis traversent le pays."}))
+
+        traductions = CacheTraductions(Path(_dossier) / "traductions_resume.sqlite3")
+        self.addCleanup(traductions.fermer)
+        traductions.set(resume, "en", "fr", "Deux amis traversent le pays.")
+        with patch.object(tmdb_api, "cache_traductions", traductions), \
+                patch.object(app, "_lancer_enrichissements"), patch.object(app, "TRADUCTION_EN_LIGNE", False):
+            (film,) = app._preparer_films_progressifs([{"id": 501, "title": "T", "overview": resume, "overview_fr": resume}])
+        self.assertEqual(film["overview_fr"], "Deux amis traversent le pays.")
+
+    def test_api_enrichissement_etat_partage_entre_workers(self):
+        cache_manager.cache_films([{"id": 301, "title": "T", "poster_url": "https://p/301.jpg"}])
+        # Enrichissements lancés par un autre worker : l'un en cours, l'autre abandonné (annonce expirée)
+        cache_manager.annoncer_enrichissements([302])
+        cache_manager.annoncer_enrichissements([304], duree=-1)
+
+        donnees = self.client.get("/api/enrichissement?ids=301,302,303,304,x").get_json()
+        self.assertEqual(donnees["en_attente"], [302])
+        self.assertEqual(donnees["films"]["301"]["poster_url"], "https://p/301.jpg")
+        self.assertEqual(set(donnees["films"]), {"301"})
+
+        self.assertEqual(app.app.test_client().get("/api/enrichissement?ids=301").status_code, 401)
+
+
+if __name__ == '__main__':
+    unittest.main()
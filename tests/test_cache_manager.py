@@ -0,0 +1,206 @@
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "code"))
+
+import cache_manager
+import tmdb_api
+
+
+def _enrichir_lentement(journal, film):
+    """Enrichissement factice : trace l'appel puis simule la latence TMDB."""
+    with open(journal, "a", encoding="utf-8") as f:
+        f.write(f"{os.getpid()}\n")
+    time.sleep(0.5)
+    return {**film, "poster_url": "https://image/p.jpg"}
+
+
+def _processus_enrichissement(journal, resultats):
+    film = cache_manager.enrichir_coordonne({"id": 42, "title": "T"}, lambda f: _enrichir_lentement(journal, f))
+    resultats.put(film.get("poster_url"))
+
+
+class TestCacheManager(unittest.TestCase):
+    def setUp(self):
+        self.dossier = tempfile.TemporaryDirectory()
+        dossier = Path(self.dossier.name)
+        self.json = dossier / "enrichment_cache.json"
+        self.json.write_text(json.dumps({"7": {"id": 7, "title": "Ancien", "runtime": 90}}), encoding="utf-8")
+        for nom, valeur in (("_cache_db", dossier / "cache.sqlite3"), ("_cache_file", self.json)):
+            patcheur = patch.object(cache_manager, nom, valeur)
+            patcheur.start()
+            self.addCleanup(patcheur.stop)
+        patcheur = patch.dict(cache_manager._echecs_enrichissement, clear=True)
+        patcheur.start()
+        self.addCleanup(patcheur.stop)
+        cache_manager.fermer_cache()
+
+    def tearDown(self):
+        cache_manager.fermer_cache()
+        self.dossier.cleanup()
+
+    def test_migration_json_une_seule_fois(self):
+        self.assertEqual(cache_manager.get_cached_film(7)["title"], "Ancien")
+        cache_manager.fermer_cache()
+        self.json.write_text(json.dumps({"8": {"id": 8}}), encoding="utf-8")
+        self.assertIsNone(cache_manager.get_cached_film(8))
+        self.assertIsNotNone(cache_manager.get_cached_film("7"))
+
+    def test_ecriture_incrementale_et_relecture(self):
+        cache_manager.cache_film({"id": 1, "title": "Un", "vote_average": 7.5})
+        self.assertEqual(cache_manager.get_cached_film(1)["title"], "Un")
+        cache_manager.cache_films([{"id": 2, "title": "Deux"}])
+        self.assertEqual(cache_manager._films_modifies, {})
+
+        cache_manager.fermer_cache()
+        # Rien à écrire : la base n'est même pas rouverte
+        cache_manager.save_cache()
+        self.assertIsNone(cache_manager._connexion)
+
+        caches, a_enrichir = cache_manager.get_cached_films([{"id": 2, "note": "x"}, {"id": 3}, {"title": "?"}])
+        self.assertEqual(caches, [{"id": 2, "note": "x", "title": "Deux"}])
+        self.assertEqual(a_enrichir, [{"id": 3}, {"title": "?"}])
+        self.assertEqual(cache_manager.get_cached_film(1)["vote_average"], 7.5)
+
+    def _vieillir(self, film_id, heures):
+        """Recule la date d'écriture d'un film dans la base, puis vide la mémoire."""
+        cache_manager.save_cache()
+        with cache_manager._base() as base:
+            base.execute("UPDATE films SET maj_le = maj_le - ? WHERE id = ?", (heures * 3600, film_id))
+        cache_manager.fermer_cache()
+
+    def test_ttl_par_champ_et_rafraichissement(self):
+        rafraichis = []
+        cache_manager.definir_rafraichissement(rafraichis.extend)
+        self.addCleanup(cache_manager.definir_rafraichissement, None)
+        cache_manager.cache_films([
+            {"id": 1, "poster_url": "p", "streaming_links": [{"name": "Netflix"}]},
+            {"id": 2, "poster_url": "p"},
+        ])
+        for film_id in (1, 2):
+            self._vieillir(film_id, 48)
+        avant = cache_manager.statistiques_cache()
+
+        # Plateformes expirées (24 h) : servi tout de suite, rafraîchi en arrière-plan
+        self.assertEqual(cache_manager.get_cached_film(1)["poster_url"], "p")
+        self.assertEqual([film["id"] for film in rafraichis], [1])
+        # Affiches seules (30 jours) : encore frais
+        self.assertIsNotNone(cache_manager.get_cached_film(2))
+        self.assertEqual(len(rafraichis), 1)
+
+        stats = cache_manager.statistiques_cache()
+        self.assertEqual(stats["hits_perimes"] - avant["hits_perimes"], 1)
+        self.assertEqual(stats["hits"] - avant["hits"], 1)
+
+    def test_expiration_et_elagage(self):
+        cache_manager.cache_films([{"id": 1, "title": "Vieux"}, {"id": 2, "title": "Récent"}])
+        self._vieillir(1, cache_manager.CACHE_AGE_MAX_HEURES + 1)
+        avant = cache_manager.statistiques_cache()
+        self.assertIsNone(cache_manager.get_cached_film(1))
+        self.assertEqual(cache_manager.statistiques_cache()["expirations"] - avant["expirations"], 1)
+
+        # Film 7 importé du JSON, film 2 récent, film 1 trop ancien
+        self._vieillir(7, 1)
+        with patch.object(cache_manager, "CACHE_NB_FILMS_MAX", 1):
+            self.assertEqual(cache_manager.elaguer_cache(), 2)
+        self.assertEqual(cache_manager._base().execute("SELECT id FROM films").fetchall(), [(2,)])
+
+    def test_lru_memoire_borne(self):
+        with patch.object(cache_manager, "CACHE_TAILLE_MEMOIRE", 2):
+            avant = cache_manager.statistiques_cache()["evictions"]
+            cache_manager.cache_films([{"id": i} for i in (1, 2, 3)])
+            self.assertEqual(list(cache_manager._enrichment_cache), [2, 3])
+            # Film évincé de la mémoire : relu dans la base
+            self.assertEqual(cache_manager.get_cached_film(1), {"id": 1})
+            self.assertEqual(list(cache_manager._enrichment_cache), [3, 1])
+            self.assertEqual(cache_manager.statistiques_cache()["evictions"] - avant, 2)
+
+    def test_enrichissement_coordonne_entre_processus(self):
+        journal = Path(self.dossier.name) / "appels.txt"
+        contexte = multiprocessing.get_context("fork")
+        resultats = contexte.Queue()
+        cache_manager._base()  # connexion héritée par les processus : doit être rouverte
+        processus = [
+            contexte.Process(target=_processus_enrichissement, args=(journal, resultats)) for _ in range(3)
+        ]
+        for p in processus:
+            p.start()
+        for p in processus:
+            p.join(30)
+        self.assertEqual([resultats.get(timeout=5) for _ in processus], ["https://image/p.jpg"] * 3)
+        self.assertEqual(len(journal.read_text(encoding="utf-8").split()), 1)
+
+        # Déjà frais dans la base : repris sans nouvel appel
+        film = cache_manager.enrichir_coordonne({"id": 42}, lambda f: _enrichir_lentement(journal, f))
+        self.assertEqual(film["title"], "T")
+        self.assertEqual(len(journal.read_text(encoding="utf-8").split()), 1)
+
+    def test_bail_exclusif_et_expiration(self):
+        self.assertTrue(cache_manager.prendre_bail(5))
+        autre = multiprocessing.get_context("fork").Pool(1)
+        try:
+            self.assertFalse(autre.apply(cache_manager.prendre_bail, (5,)))
+            cache_manager.liberer_bail(5)
+            self.assertTrue(autre.apply(cache_manager.prendre_bail, (5, 0)))
+            # Bail expiré (durée nulle) : repris
+            time.sleep(0.01)
+            self.assertTrue(cache_manager.prendre_bail(5))
+        finally:
+            autre.terminate()
+
+    def _maj_le(self, film_id):
+        cache_manager.save_cache()
+        ligne = cache_manager._base().execute("SELECT maj_le FROM films WHERE id = ?", (film_id,)).fetchone()
+        return ligne[0] if ligne else None
+
+    def test_echec_tmdb_jamais_mis_en_cache(self):
+        # TMDB en erreur : enrichir_film_avec_api rend le film tel quel, enrichir_film_tmdb lève
+        reponse = type("Reponse", (), {"status_code": 503})()
+        with patch.object(tmdb_api.http_client, "get", return_value=reponse):
+            self.assertEqual(tmdb_api.enrichir_film_avec_api({"id": 9, "title": "T"}), {"id": 9, "title": "T"})
+            with self.assertRaises(tmdb_api.EchecEnrichissement):
+                cache_manager.enrichir_coordonne({"id": 9, "title": "T"}, tmdb_api.enrichir_film_tmdb)
+        self.assertIsNone(cache_manager.get_cached_film(9))
+        self.assertIsNone(self._maj_le(9))
+        self.assertGreaterEqual(cache_manager.statistiques_cache()["echecs_enrichissement"], 1)
+
+    def test_rafraichissement_echoue_garde_la_date(self):
+        rafraichis = []
+        cache_manager.definir_rafraichissement(rafraichis.extend)
+        self.addCleanup(cache_manager.definir_rafraichissement, None)
+        cache_manager.cache_films([{"id": 1, "poster_url": "p", "streaming_links": [{"name": "Netflix"}]}])
+        self._vieillir(1, 48)
+        avant = self._maj_le(1)
+
+        def echouer(film):
+            raise tmdb_api.EchecEnrichissement("TMDB indisponible")
+
+        with self.assertRaises(tmdb_api.EchecEnrichissement):
+            cache_manager.enrichir_coordonne({"id": 1}, echouer)
+        self.assertEqual(self._maj_le(1), avant)
+        # Toujours servi (périmé), mais pas de nouvel essai avant le délai
+        self.assertEqual(cache_manager.get_cached_film(1)["poster_url"], "p")
+        self.assertEqual(rafraichis, [])
+        with patch.object(cache_manager, "CACHE_DELAI_NOUVEL_ESSAI_SECONDES", 0):
+            cache_manager.get_cached_film(1)
+        self.assertEqual([film["id"] for film in rafraichis], [1])
+
+        # Une mise à jour qui ne vient pas de TMDB (traduction) ne rafraîchit pas la date
+        cache_manager.cache_film({"id": 1, "poster_url": "p", "overview_fr": "Résumé"}, conserver_date=True)
+        self.assertEqual(self._maj_le(1), avant)
+
+    def test_compaction(self):
+        cache_manager.cache_films([{"id": i, "title": "x" * 100} for i in range(1, 50)])
+        cache_manager.compacter_cache()
+        self.assertEqual(cache_manager.get_cached_film(49)["title"], "x" * 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
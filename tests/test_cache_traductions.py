@@ -0,0 +1,126 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "code"))
+
+import tmdb_api
+from cache_traductions import CacheTraductions
+
+
+class TestCacheTraductions(unittest.TestCase):
+    def setUp(self):
+        self.dossier = tempfile.TemporaryDirectory()
+        self.chemin = Path(self.dossier.name) / "traductions.sqlite3"
+        self.cache = CacheTraductions(self.chemin, taille_lru=2)
+
+    def tearDown(self):
+        self.cache.fermer()
+        self.dossier.cleanup()
+
+    def test_cle_inclut_les_langues(self):
+        self.cache.set("Hello", "en", "fr", "Bonjour")
+        self.assertEqual(self.cache.get("Hello", "en", "fr"), "Bonjour")
+        self.assertIsNone(self.cache.get("Hello", "en", "de"))
+
+    def test_persistance_et_lru(self):
+        self.cache.set_many({"a a a": "A", "b b b": "B", "c c c": "C"}, "en", "fr")
+        self.assertEqual(len(self.cache._lru), 2)
+        # Le texte sorti du LRU est relu sur disque
+        self.assertEqual(self.cache.get_many(["a a a", "c c c", "z z z"], "en", "fr"), {"a a a": "A", "c c c": "C"})
+        autre = CacheTraductions(self.chemin)
+        self.assertEqual(autre.get("b b b", "en", "fr"), "B")
+        self.assertEqual(len(autre), 3)
+        autre.fermer()
+
+    def test_base_illisible_repli_sur_le_lru(self):
+        self.cache.set_many({"a a a": "A", "b b b": "B"}, "en", "fr")
+        # Table disparue (base corrompue ou remplacée) : les lectures ne lèvent pas
+        self.cache._base().execute("DROP TABLE traductions")
+        with self.assertLogs("cache_traductions", level="WARNING"):
+            self.assertEqual(self.cache.get_many(["a a a", "z z z"], "en", "fr"), {"a a a": "A"})
+        with self.assertLogs("cache_traductions", level="WARNING"):
+            self.assertEqual(len(self.cache), 2)
+
+
+class TestTraduireTextes(unittest.TestCase):
+    def setUp(self):
+        self.dossier = tempfile.TemporaryDirectory()
+        self.cache = CacheTraductions(Path(self.dossier.name) / "traductions.sqlite3")
+        patcheur = patch.object(tmdb_api, "cache_traductions", self.cache)
+        patcheur.start()
+        self.addCleanup(patcheur.stop)
+        self.appels = []
+
+    def tearDown(self):
+        self.cache.fermer()
+        self.dossier.cleanup()
+
+    def _mymemory(self, texte, source, cible):
+        self.appels.append(texte)
+        return texte.upper()
+
+    def test_requetes_regroupees_puis_cache(self):
+        textes = ["first film", "second film", "first film", "x", "third film"]
+        with patch.object(tmdb_api, "_traduire_via_mymemory", side_effect=self._mymemory):
+            resultat = tmdb_api.traduire_textes(textes)
+            self.assertEqual(resultat, ["FIRST FILM", "SECOND FILM", "FIRST FILM", "x", "THIRD FILM"])
+            self.assertEqual(len(self.appels), 1)
+            # Recherche répétée : aucun appel de traduction
+            self.assertEqual(tmdb_api.traduire_textes(textes), resultat)
+            self.assertEqual(len(self.appels), 1)
+
+    def test_lecture_seule_sans_appel_reseau(self):
+        self.cache.set("first film", "en", "fr", "premier film")
+        with patch.object(tmdb_api, "_traduire_via_mymemory", side_effect=self._mymemory):
+            resultat = tmdb_api.traduire_textes(["first film", "second film"], en_ligne=False)
+        self.assertEqual(resultat, ["premier film", "second film"])
+        self.assertEqual(self.appels, [])
+
+    def test_resumes_realistes_regroupes(self):
+        # Résumés d'environ 300 caractères, en 3 phrases : trop longs pour tenir à deux dans une requête entière
+        textes = [
+            f"Film {i} follows a retired detective who returns to the city where he grew up after many years away. "
+            f"He soon discovers that friend number {i} has vanished without a trace, leaving only a cryptic letter behind. "
+            f"Together with journalist {i}, he must uncover a conspiracy reaching the highest levels of power."
+            for i in range(10)
+        ]
+        self.assertTrue(all(280 <= len(texte) <= 330 for texte in textes))
+        with patch.object(tmdb_api, "_traduire_via_mymemory", side_effect=self._mymemory):
+            resultat = tmdb_api.traduire_textes(textes)
+        self.assertEqual(resultat, [texte.upper() for texte in textes])
+        # 30 phrases distinctes d'environ 100 caractères : 4 par requête
+        self.assertLessEqual(len(self.appels), 8)
+        for requete in self.appels:
+            self.assertLessEqual(len(requete.encode("utf-8")), tmdb_api.MYMEMORY_LONGUEUR_MAX)
+
+    def test_phrase_trop_longue_coupee_entre_deux_mots(self):
+        texte = "word " * 150 + "end. Short one."
+        morceaux = tmdb_api._phrases(texte)
+        self.assertTrue(all(len(m.encode("utf-8")) <= tmdb_api.MYMEMORY_LONGUEUR_MAX for m in morceaux))
+        self.assertEqual(" ".join(morceaux).split(), texte.split())
+        self.assertEqual(morceaux[-1], "Short one.")
+
+    def test_lots_limites_et_repli_texte_par_texte(self):
+        textes = [f"overview numero {i} " * 12 for i in range(5)]
+        lots = tmdb_api._lots_de_traduction(textes)
+        self.assertEqual(sum(lots, []), textes)
+        for lot in lots:
+            self.assertLessEqual(len(tmdb_api.SEPARATEUR_LOT_TRADUCTION.join(lot)), tmdb_api.MYMEMORY_LONGUEUR_MAX)
+
+        # Réponse groupée qui perd le séparateur : chaque texte est retraduit seul
+        def sans_separateur(texte, source, cible):
+            self.appels.append(texte)
+            return texte.replace("|||", "").upper()
+
+        with patch.object(tmdb_api, "_traduire_via_mymemory", side_effect=sans_separateur):
+            resultat = tmdb_api.traduire_textes(["hello world", "good night"])
+        self.assertEqual(resultat, ["HELLO WORLD", "GOOD NIGHT"])
+        self.assertEqual(len(self.appels), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
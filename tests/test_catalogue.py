@@ -0,0 +1,60 @@
+import math
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "code"))
+
+from catalogue import Catalogue, en_catalogue
+
+
+class TestCatalogue(unittest.TestCase):
+    def setUp(self):
+        self.films = [
+            {"id": 10, "title": "A", "genres": ["Drama", "Comedy"], "vote_average": 7.5,
+             "popularity": 12.0, "release_year": 1999, "poster_url": "a.jpg"},
+            {"id": 20, "title": "B", "genres": ["Horror"], "vote_average": 5.0,
+             "sentiment_score": -0.2, "release_year": math.nan},
+            {"id": 30, "title": "C", "genres": [], "streaming_links": []},
+        ]
+        self.catalogue = Catalogue.depuis_films(self.films)
+
+    def test_aller_retour(self):
+        film = self.catalogue.film(0)
+        self.assertEqual(film["genres"], ["Drama", "Comedy"])
+        self.assertEqual(film["release_year"], 1999)
+        self.assertEqual(film["poster_url"], "a.jpg")
+        self.assertNotIn("sentiment_score", film)
+
+    def test_champs_absents_non_materialises(self):
+        film = self.catalogue.film(1)
+        self.assertNotIn("release_year", film)
+        self.assertNotIn("poster_url", film)
+        self.assertEqual(self.catalogue.film(2)["streaming_links"], [])
+
+    def test_films_materialises_independants(self):
+        film = self.catalogue.film(0)
+        film["genres"].append("War")
+        film["title"] = "modifié"
+        self.assertEqual(self.catalogue.film(0)["genres"], ["Drama", "Comedy"])
+        self.assertEqual(self.catalogue.film(0)["title"], "A")
+
+    def test_genres(self):
+        self.assertEqual(self.catalogue.lignes_avec_genres(["Horror", "Comedy"]).tolist(), [True, True, False])
+        self.assertEqual(self.catalogue.nb_genres_communs(["Drama", "Comedy", "War"]).tolist(), [2, 0, 0])
+
+    def test_ligne_par_id(self):
+        self.assertEqual(self.catalogue.ligne(20), 1)
+        self.assertEqual(self.catalogue.ligne("30"), 2)
+        self.assertIsNone(self.catalogue.ligne(99))
+        self.assertIsNone(self.catalogue.ligne(None))
+
+    def test_valeur_et_conversion(self):
+        self.assertEqual(self.catalogue.valeur(0, "vote_average"), 7.5)
+        self.assertEqual(self.catalogue.valeur(2, "vote_average", 0.0), 0.0)
+        self.assertIs(en_catalogue(self.catalogue), self.catalogue)
+        self.assertEqual(len(en_catalogue(self.films)), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
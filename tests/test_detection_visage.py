@@ -0,0 +1,82 @@
+import os
+import sys
+import threading
+import unittest
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "code"))
+
+import detection_visage
+
+
+class DetecteurFactice:
+    """Détecteur de test : compte les chargements et rend une boîte fixe."""
+
+    nom = "factice"
+    chargements = 0
+
+    def __init__(self):
+        DetecteurFactice.chargements += 1
+
+    def detecter(self, img):
+        return [(1, 2, 60, 60)]
+
+
+class DetecteurCasse:
+    def __init__(self):
+        raise RuntimeError("modèle absent")
+
+
+class TestDetectionVisage(unittest.TestCase):
+    def setUp(self):
+        DetecteurFactice.chargements = 0
+        for nom, valeur in (("_pools", {}), ("_metriques", {}), ("_indisponibles", set()),
+                            ("DETECTEURS", dict(detection_visage.DETECTEURS)), ("DETECTEUR_VISAGE", "factice")):
+            patcheur = patch.object(detection_visage, nom, valeur)
+            patcheur.start()
+            self.addCleanup(patcheur.stop)
+        detection_visage.enregistrer_detecteur("factice", DetecteurFactice)
+
+    def test_charge_une_fois_et_reutilise(self):
+        img = np.zeros((100, 100), dtype=np.uint8)
+        for _ in range(5):
+            self.assertEqual(detection_visage.detecter_visages(img), [(1, 2, 60, 60)])
+        self.assertEqual(DetecteurFactice.chargements, 1)
+        self.assertEqual(detection_visage.metriques_detecteurs()["chargements"]["factice"]["instances"], 1)
+
+    def test_une_instance_par_utilisation_simultanee(self):
+        dans_le_bloc = threading.Barrier(3)
+
+        def utiliser():
+            with detection_visage.detecteur_visage():
+                dans_le_bloc.wait(5)
+
+        threads = [threading.Thread(target=utiliser) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(DetecteurFactice.chargements, 3)
+        # Les trois instances sont ensuite réutilisées
+        detection_visage.prechauffer_detecteurs(3)
+        self.assertEqual(DetecteurFactice.chargements, 3)
+        self.assertGreater(detection_visage.metriques_detecteurs()["chargements"]["factice"]["duree_prechauffage_ms"], 0)
+
+    def test_repli_sur_haar(self):
+        detection_visage.enregistrer_detecteur("factice", DetecteurCasse)
+        with patch.object(detection_visage.DetecteurHaar, "__init__", return_value=None), \
+                patch.object(detection_visage.DetecteurHaar, "detecter", return_value=[]):
+            self.assertEqual(detection_visage.detecter_visages(np.zeros((10, 10), dtype=np.uint8)), [])
+        self.assertEqual(detection_visage.nom_detecteur(), "haar")
+
+    @unittest.skipUnless(hasattr(cv2, "CascadeClassifier"), "cascade de Haar absente de cette version d'OpenCV")
+    def test_haar_image_vide(self):
+        with patch.object(detection_visage, "DETECTEUR_VISAGE", "haar"):
+            self.assertEqual(detection_visage.detecter_visages(np.zeros((120, 160, 3), dtype=np.uint8)), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "code"))
+
+import emotion_detection
+from emotion_detection import ETIQUETTES_EMOTIONS, ClassifieurEmotions
+
+
+class ModeleFactice:
+    """Modèle Keras factice : "happy" pour un visage clair, "sad" sinon."""
+
+    def __init__(self):
+        self.entrees = []
+
+    def predict(self, entree, verbose=0):
+        self.entrees.append(entree)
+        sorties = np.zeros((len(entree), len(ETIQUETTES_EMOTIONS)), dtype=np.float32)
+        for i, visage in enumerate(entree):
+            sorties[i, ETIQUETTES_EMOTIONS.index("happy" if visage.mean() > 0.5 else "sad")] = 0.9
+        return sorties
+
+
+class TestClassifieurEmotions(unittest.TestCase):
+    def test_lot_en_une_passe(self):
+        modele = ModeleFactice()
+        classifieur = ClassifieurEmotions(modele)
+        visages = [np.full((120, 100, 3), 230, np.uint8), np.full((64, 64, 3), 20, np.uint8)]
+        scores = classifieur.predire_lot(visages)
+        self.assertEqual(len(modele.entrees), 1)
+        self.assertEqual(modele.entrees[0].shape, (2, 48, 48, 1))
+        self.assertEqual([emotion_detection.emotion_dominante(s)[0] for s in scores], ["heureux", "triste"])
+        self.assertAlmostEqual(emotion_detection.emotion_dominante(scores[0])[1], 0.9, places=5)
+
+    def test_detection_sans_fichier_temporaire(self):
+        modele = ModeleFactice()
+        image = cv2.imencode(".jpg", np.full((200, 200, 3), 220, np.uint8))[1].tobytes()
+        with patch.object(emotion_detection, "DEEPFACE_AVAILABLE", True), \
+                patch.object(emotion_detection, "_classifieur", ClassifieurEmotions(modele)), \
+                patch.object(emotion_detection, "detecter_visages", return_value=[(50, 50, 100, 100)]), \
+                patch.object(tempfile, "NamedTemporaryFile", side_effect=AssertionError("fichier temporaire")):
+            resultat = emotion_detection.detecter_emotion_image(image)
+            emotion_detection.detecter_emotion_image(image)
+        self.assertEqual(resultat["emotion"], "heureux")
+        self.assertEqual(resultat["face_bbox"], (50, 50, 100, 100))
+        self.assertEqual(len(modele.entrees), 2)
+
+    def test_modele_construit_une_fois(self):
+        with patch.object(emotion_detection, "_classifieur", None), \
+                patch.object(emotion_detection, "_construire_modele_emotion", return_value=ModeleFactice()) as construire:
+            self.assertIs(emotion_detection.classifieur_emotions(), emotion_detection.classifieur_emotions())
+        construire.assert_called_once()
+
+
+class TestAnalyseQualiteVisage(unittest.TestCase):
+    def test_image_reduite_en_gris_sans_classification(self):
+        image = cv2.imencode(".jpg", np.full((480, 640, 3), 120, np.uint8))[1].tobytes()
+        with patch.object(emotion_detection, "detecter_visages", return_value=[(80, 60, 100, 100)]) as detecter, \
+                patch.object(emotion_detection, "classifieur_emotions", side_effect=AssertionError("classification")):
+            resultat = emotion_detection.analyser_qualite_visage(image)
+        self.assertEqual(detecter.call_args[0][0].shape, (240, 320))
+        self.assertEqual(resultat["face_bbox"], (160, 120, 200, 200))
+        self.assertTrue(resultat["quality"]["face_detected"])
+        self.assertEqual(resultat["quality"]["brightness_status"], "ok")
+        self.assertNotIn("emotion", resultat)
+
+    def test_image_illisible(self):
+        resultat = emotion_detection.analyser_qualite_visage(b"pas une image")
+        self.assertIsNone(resultat["face_bbox"])
+        self.assertEqual(resultat["quality"]["brightness_status"], "erreur")
+
+
+class TestSuiviVisage(unittest.TestCase):
+    @staticmethod
+    def _image(valeur, largeur=640, hauteur=480):
+        return cv2.imencode(".png", np.full((hauteur, largeur), valeur, np.uint8))[1].tobytes()
+
+    def test_image_inchangee_reutilisee(self):
+        suivi = emotion_detection.SuiviVisage()
+        with patch.object(emotion_detection, "detecter_visages", return_value=[(80, 60, 100, 100)]) as detecter:
+            premier = suivi.analyser(self._image(120))
+            second = suivi.analyser(self._image(121))
+        detecter.assert_called_once()
+        self.assertEqual(premier["detection"], "complete")
+        self.assertEqual(second["detection"], "reutilisee")
+        self.assertEqual(second["face_bbox"], (160, 120, 200, 200))
+
+    def test_visage_cherche_autour_de_sa_derniere_position(self):
+        suivi = emotion_detection.SuiviVisage()
+        with patch.object(emotion_detection, "detecter_visages", return_value=[(80, 60, 100, 100)]):
+            suivi.analyser(self._image(120))
+        with patch.object(emotion_detection, "detecter_visages", return_value=[(40, 40, 100, 100)]) as detecter:
+            resultat = suivi.analyser(self._image(160))
+        # Zone : boîte (80, 60, 100, 100) agrandie de 50 px de chaque côté, bornée à l'image 320x240
+        self.assertEqual(detecter.call_args[0][0].shape, (200, 200))
+        self.assertEqual(resultat["detection"], "zone")
+        self.assertEqual(resultat["face_bbox"], (140, 100, 200, 200))
+
+    def test_detection_complete_si_visage_perdu(self):
+        suivi = emotion_detection.SuiviVisage()
+        with patch.object(emotion_detection, "detecter_visages", return_value=[(80, 60, 100, 100)]):
+            suivi.analyser(self._image(120))
+        with patch.object(emotion_detection, "detecter_visages", return_value=[]) as detecter:
+            resultat = suivi.analyser(self._image(160))
+        self.assertEqual(detecter.call_count, 2)
+        self.assertEqual(detecter.call_args[0][0].shape, (240, 320))
+        self.assertEqual(resultat["detection"], "complete")
+        self.assertIsNone(resultat["face_bbox"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import pandas as pd
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RACINE, "code"))
+sys.path.insert(0, os.path.join(RACINE, "scripts", "utils"))
+
+import enrich_all_films
+from enrich_all_films import compacter, enrichir_en_parallele, films_a_traiter, lire_checkpoint
+
+
+def _enrichir_factice(film):
+    """Enrichissement TMDB factice ; le film 3 est interrompu (Ctrl+C)."""
+    if film["id"] == 3:
+        raise KeyboardInterrupt
+    return {**film, "poster_url": f"https://p/{film['id']}.jpg"}
+
+
+class TestEnrichissementReprenable(unittest.TestCase):
+    def setUp(self):
+        self.dossier = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dossier.cleanup)
+        self.checkpoint = Path(self.dossier.name) / "checkpoint.jsonl"
+        self.sortie = Path(self.dossier.name) / "films.csv"
+
+    def test_lecture_checkpoint_derniere_ligne_tronquee(self):
+        lignes = [
+            {"id": 1, "ok": False, "enrichi_le": 1.0, "champs": {}},
+            {"id": 2, "ok": True, "enrichi_le": 2.0, "champs": {"runtime": 90}},
+            {"id": 1, "ok": True, "enrichi_le": 3.0, "champs": {"runtime": 100}},
+        ]
+        self.checkpoint.write_text(
+            "".join(json.dumps(ligne) + "\n" for ligne in lignes) + '{"id": 3, "ok": tr', encoding="utf-8"
+        )
+        etats = lire_checkpoint(self.checkpoint)
+        self.assertEqual(sorted(etats), [1, 2])
+        self.assertEqual(etats[1]["champs"], {"runtime": 100})
+        self.assertEqual(lire_checkpoint(Path(self.dossier.name) / "absent.jsonl"), {})
+
+    def test_films_a_traiter(self):
+        maintenant = time.time()
+        etats = {
+            1: {"id": 1, "ok": True, "enrichi_le": maintenant},
+            2: {"id": 2, "ok": False, "enrichi_le": maintenant, "erreur": "HTTP 500"},
+            3: {"id": 3, "ok": True, "enrichi_le": maintenant - 40 * 86400},
+        }
+        films = [{"id": i} for i in (1, 2, 3, 4)]
+        self.assertEqual([film["id"] for film in films_a_traiter(films, etats, 30)], [2, 3, 4])
+
+    def test_compaction_garde_les_resumes_traduits(self):
+        pd.DataFrame([
+            {"id": 1, "title": "Un", "overview": "An overview", "overview_fr": "Un résumé traduit"},
+            {"id": 2, "title": "Deux", "overview": "Another one", "overview_fr": "Ancien résumé"},
+        ]).to_csv(self.sortie, index=False)
+        films = [
+            {"id": 1, "title": "Un", "overview": "An overview"},
+            {"id": 2, "title": "Deux", "overview": "Another one"},
+            {"id": 3, "title": "Trois", "overview": "Third"},
+        ]
+        etats = {
+            # TMDB n'a rendu que le résumé anglais (non traduit) : la traduction existante est gardée
+            1: {"id": 1, "ok": True, "champs": {"overview_fr": "An overview", "poster_url": "https://p/1.jpg"}},
+            2: {"id": 2, "ok": True, "champs": {"overview_fr": "Nouveau résumé TMDB"}},
+            3: {"id": 3, "ok": False, "champs": {}},
+        }
+        films_ecrits = compacter(films, etats, self.sortie)
+        self.assertEqual([film.get("overview_fr") for film in films_ecrits], ["Un résumé traduit", "Nouveau résumé TMDB", None])
+        df = pd.read_csv(self.sortie)
+        self.assertEqual(df.loc[df["id"] == 1, "overview_fr"].item(), "Un résumé traduit")
+        self.assertEqual(df.loc[df["id"] == 1, "poster_url"].item(), "https://p/1.jpg")
+        self.assertFalse(self.sortie.with_suffix(".csv.tmp").exists())
+
+    def test_reprise_apres_interruption(self):
+        films = [{"id": i, "title": f"Film {i}"} for i in (1, 2, 3, 4)]
+        with patch.object(enrich_all_films, "enrichir_film_avec_api", side_effect=_enrichir_factice):
+            with self.assertRaises(KeyboardInterrupt):
+                enrichir_en_parallele(films, nb_workers=1, chemin=self.checkpoint)
+        etats = lire_checkpoint(self.checkpoint)
+        self.assertEqual(sorted(etats), [1, 2])
+        restants = films_a_traiter(films, etats, 30)
+        self.assertEqual([film["id"] for film in restants], [3, 4])
+
+        with patch.object(enrich_all_films, "enrichir_film_avec_api", side_effect=lambda film: {**film, "runtime": 90}) as enrichir:
+            self.assertEqual(enrichir_en_parallele(restants, nb_workers=2, chemin=self.checkpoint), 0)
+        self.assertEqual(enrichir.call_count, 2)
+        etats = lire_checkpoint(self.checkpoint)
+        self.assertEqual(sorted(etats), [1, 2, 3, 4])
+        self.assertEqual(etats[1]["champs"], {"poster_url": "https://p/1.jpg"})
+        self.assertEqual(films_a_traiter(films, etats, 30), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "code"))
+
+import emotion_detection
+from inference_emotions import FileInferencePleine, ServiceInferenceEmotions, ServiceInferenceIndisponible
+
+
+def predire_lot_factice(entree):
+    """Scores factices : taille du lot et processus qui l'a classé."""
+    return [{"taille_lot": float(len(entree)), "pid": float(os.getpid())} for _ in entree]
+
+
+def predire_lot_lent(entree):
+    time.sleep(0.3)
+    return predire_lot_factice(entree)
+
+
+def service(**options):
+    options.setdefault("initialiseur", None)
+    options.setdefault("contexte", "fork")
+    return ServiceInferenceEmotions(**options)
+
+
+class TestServiceInferenceEmotions(unittest.TestCase):
+    def test_requetes_simultanees_regroupees_dans_les_workers(self):
+        inference = service(nb_workers=1, attente_lot_ms=200, predire_lot=predire_lot_factice)
+        try:
+            inference.prechauffer()
+            visage = np.full((80, 80, 3), 128, np.uint8)
+            resultats = [None] * 6
+            def requete(i):
+                resultats[i] = inference.predire(visage)
+            threads = [threading.Thread(target=requete, args=(i,)) for i in range(6)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            inference.arreter()
+        self.assertTrue(all(r is not None for r in resultats))
+        self.assertNotEqual(resultats[0]["pid"], os.getpid())
+        self.assertGreater(max(r["taille_lot"] for r in resultats), 1)
+        statistiques = inference.statistiques()
+        self.assertEqual(statistiques["visages_classes"], 7)
+        self.assertLess(statistiques["lots"], 7)
+
+    def test_workers_demarres_en_spawn_par_defaut(self):
+        inference = ServiceInferenceEmotions(nb_workers=1, predire_lot=predire_lot_factice, initialiseur=None)
+        try:
+            scores = inference.predire(np.zeros((48, 48, 3), np.uint8))
+        finally:
+            inference.arreter()
+        self.assertEqual(inference._contexte, "spawn")
+        self.assertNotEqual(scores["pid"], os.getpid())
+
+    def test_file_pleine_refusee(self):
+        inference = service(nb_workers=1, taille_file_max=2, attente_lot_ms=0, predire_lot=predire_lot_lent)
+        visage = np.zeros((48, 48, 3), np.uint8)
+        try:
+            premier = inference.soumettre(visage)
+            time.sleep(0.1)
+            suivants = [inference.soumettre(visage), inference.soumettre(visage)]
+            with self.assertRaises(FileInferencePleine):
+                inference.soumettre(visage)
+            for future in [premier, *suivants]:
+                self.assertGreaterEqual(future.result(timeout=10)["taille_lot"], 1)
+        finally:
+            inference.arreter()
+        self.assertEqual(inference.statistiques()["refus_file_pleine"], 1)
+
+    def test_delai_depasse_et_arret(self):
+        inference = service(nb_workers=1, delai_max_s=0.05, predire_lot=predire_lot_lent)
+        try:
+            with self.assertRaises(ServiceInferenceIndisponible):
+                inference.predire(np.zeros((48, 48, 3), np.uint8))
+        finally:
+            inference.arreter()
+        with self.assertRaises(ServiceInferenceIndisponible):
+            inference.soumettre(np.zeros((48, 48, 3), np.uint8))
+
+    def test_refus_propage_par_la_detection(self):
+        image = cv2.imencode(".jpg", np.full((200, 200, 3), 220, np.uint8))[1].tobytes()
+        with patch.object(emotion_detection, "DEEPFACE_AVAILABLE", True), \
+                patch.object(emotion_detection, "detecter_visages", return_value=[(50, 50, 100, 100)]):
+            with self.assertRaises(FileInferencePleine):
+                emotion_detection.detecter_emotion_image(image, predire=self._refuser)
+
+    @staticmethod
+    def _refuser(visage):
+        raise FileInferencePleine("pleine")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import math
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "code"))
+
+import lib_projet
+from lib_projet import calculer_score_film, calculer_scores_films
+
+
+class TestCalculerScoresFilms(unittest.TestCase):
+    def test_identique_au_calcul_film_par_film(self):
+        sentiments = [-3.0, -0.5, 0.0, 0.4, 2.0]
+        notes = [-1.0, 3.2, 10.0, 7.7, 12.0]
+        attendus = [
+            calculer_score_film({"sentiment_score": s, "vote_average": n}, "triste")
+            for s, n in zip(sentiments, notes)
+        ]
+        np.testing.assert_allclose(calculer_scores_films(sentiments, notes, "triste"), attendus)
+
+    def test_valeurs_absentes(self):
+        scores = calculer_scores_films([math.nan], [math.nan])
+        self.assertAlmostEqual(float(scores[0]), 0.6 * 0.5)
+
+    def test_poids_par_emotion(self):
+        poids = {"triste": {"sentiment": 1.0, "note": 0.0}}
+        with patch.dict(lib_projet.POIDS_SCORE_PAR_EMOTION, poids):
+            self.assertEqual(calculer_scores_films([1.0], [0.0], "Triste").tolist(), [1.0])
+            self.assertEqual(calculer_score_film({"sentiment_score": 1.0}, "triste"), 1.0)
+            self.assertAlmostEqual(float(calculer_scores_films([1.0], [0.0], "peur")[0]), 0.6)
+
+    def test_poids_explicites(self):
+        scores = calculer_scores_films([0.0, 1.0], [10.0, 0.0], poids={"sentiment": 0.0, "note": 1.0})
+        self.assertEqual(scores.tolist(), [1.0, 0.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
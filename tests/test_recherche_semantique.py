@@ -0,0 +1,66 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "code"))
+
+from catalogue import Catalogue
+from recherche_semantique import IndexSemantique, construire_index
+
+
+class TestRechercheSemantique(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        resumes = [
+            "A crew of thieves plans a bank heist, but a twist reveals a traitor among them.",
+            "A lonely robot falls in love while cleaning a deserted planet.",
+            "Two detectives hunt a serial killer through a rainy city.",
+            "A family of superheroes must save the city from a villain.",
+            "An astronaut is stranded on Mars and must grow food to survive.",
+            "A young wizard attends a school of magic and faces a dark lord.",
+            "A shark terrorizes a beach town during the summer holidays.",
+            "A boxer from Philadelphia gets a shot at the heavyweight title.",
+        ]
+        films = [{"id": 100 + i, "title": f"Film {i}", "overview": r} for i, r in enumerate(resumes)]
+        films.append({"id": 200, "title": "Sans résumé"})
+        films[2]["overview_fr"] = "Deux inspecteurs traquent un tueur en série sous la pluie."
+        cls.catalogue = Catalogue.depuis_films(films)
+
+        cls.dossier = tempfile.TemporaryDirectory()
+        construire_index(cls.catalogue, Path(cls.dossier.name), dimension=6)
+        cls.index = IndexSemantique.charger(Path(cls.dossier.name))
+
+    @classmethod
+    def tearDownClass(cls):
+        del cls.index
+        cls.dossier.cleanup()
+
+    def test_chargement_mappe_en_memoire(self):
+        self.assertEqual(len(self.index), len(self.catalogue))
+        self.assertIsInstance(self.index.vecteurs, np.memmap)
+
+    def test_requete_texte_libre(self):
+        ids, scores = self.index.rechercher("a heist movie with a twist", n=3)
+        self.assertEqual(int(ids[0]), 100)
+        self.assertTrue(np.all(np.diff(scores) <= 1e-6))
+
+    def test_resume_francais_indexe(self):
+        ids, _ = self.index.rechercher("inspecteurs tueur", n=1)
+        self.assertEqual(ids.tolist(), [102])
+
+    def test_requete_inconnue(self):
+        ids, scores = self.index.rechercher("zzzz qqqq", n=3)
+        self.assertEqual(len(ids), 0)
+        self.assertEqual(len(scores), 0)
+
+    def test_index_absent(self):
+        with tempfile.TemporaryDirectory() as dossier:
+            self.assertIsNone(IndexSemantique.charger(Path(dossier)))
+
+
+if __name__ == '__main__':
+    unittest.main()
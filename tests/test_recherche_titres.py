@@ -0,0 +1,59 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "code"))
+
+from recherche_titres import IndexTitres, normaliser_titre
+from recommendation import rechercher_par_titre
+
+
+class TestIndexTitres(unittest.TestCase):
+    def setUp(self):
+        self.films = [
+            {"id": 1, "title": "Avatar"},
+            {"id": 2, "title": "The Dark Knight Rises"},
+            {"id": 3, "title": "Amélie"},
+            {"id": 4, "title": "Inception"},
+            {"id": 5, "title": "avatar"},
+            {"id": 6, "title": "Spider-Man 3"},
+            {"id": 7, "title": "The Dark Knight", "popularity": 187.3},
+            {"id": 8, "title": "The Departed", "popularity": 63.4},
+            {"id": 9, "title": "Theeb", "popularity": 1.2},
+        ]
+        self.index = IndexTitres(self.films)
+
+    def test_normalisation(self):
+        self.assertEqual(normaliser_titre("  Amélie (Le Fabuleux  Destin) "), "amelie le fabuleux destin")
+
+    def test_exact_insensible_a_la_casse_premier_film_gagne(self):
+        self.assertEqual(self.index.rechercher("AVATAR")["id"], 1)
+
+    def test_exact_accents_et_ponctuation(self):
+        self.assertEqual(self.index.rechercher("amelie")["id"], 3)
+        self.assertEqual(self.index.rechercher("spider man 3")["id"], 6)
+
+    def test_flou(self):
+        self.assertEqual(self.index.rechercher("The Dark Knigt Rises")["id"], 2)
+        self.assertEqual(self.index.rechercher("Incepton")["id"], 4)
+
+    def test_aucun_resultat(self):
+        self.assertIsNone(self.index.rechercher("zzzzqqqq"))
+
+    def test_rechercher_par_titre(self):
+        self.assertEqual(rechercher_par_titre("inception", self.films)["id"], 4)
+        self.assertEqual(rechercher_par_titre("Incepton", self.films, index=self.index)["id"], 4)
+        self.assertIsNone(rechercher_par_titre("  ", self.films, index=self.index))
+
+    def test_suggestions_par_popularite(self):
+        ids = [film["id"] for film in self.index.suggerer("the d")]
+        self.assertEqual(ids, [7, 8, 2])
+
+    def test_suggestions_limite_et_prefixe_inconnu(self):
+        self.assertEqual([film["id"] for film in self.index.suggerer("THE", n=2)], [7, 8])
+        self.assertEqual(self.index.suggerer("xyz"), [])
+        self.assertEqual(self.index.suggerer(""), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
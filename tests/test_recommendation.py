@@ -0,0 +1,194 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "code"))
+
+import recommendation
+from catalogue import Catalogue
+from recommendation import (
+    construire_index_genres,
+    construire_table_emotions,
+    recommander_par_emotion,
+    recommander_similaires,
+    selectionner_top_k,
+)
+from similarite import MoteurSimilarite
+
+
+def _film(film_id, genres, note, sentiment=0.0):
+    return {
+        "id": film_id,
+        "title": f"Film {film_id}",
+        "genres": genres,
+        "vote_average": note,
+        "sentiment_score": sentiment,
+    }
+
+
+class TestRecommanderParEmotion(unittest.TestCase):
+    def setUp(self):
+        self.films = [
+            _film(1, ["Comedy"], 6.5),
+            _film(2, ["Horror", "Thriller"], 7.9),
+            _film(3, ["Drama", "Romance"], 8.1),
+            _film(4, ["Comedy", "Family"], 8.1),
+            _film(5, ["Documentary"], 0.0),
+            _film(6, ["Horror"], 5.0),
+            _film(7, ["Western"], 9.0),
+        ]
+        self.index = construire_index_genres(self.films)
+
+    def test_union_des_genres_triee_par_note(self):
+        res = recommander_par_emotion("heureux", self.films, n=10, index=self.index)
+        # Comedy/Family/Romance : notes égales -> ordre du catalogue conservé
+        self.assertEqual([f["id"] for f in res], [3, 4, 1])
+        self.assertIn("score_emotion", res[0])
+
+    def test_top_n(self):
+        res = recommander_par_emotion("peur", self.films, n=1, index=self.index)
+        self.assertEqual([f["id"] for f in res], [2])
+
+    def test_surprise_exclut_les_films_sans_note(self):
+        res = recommander_par_emotion("surprise", self.films, n=10, index=self.index)
+        self.assertEqual([f["id"] for f in res], [7, 3, 4, 2, 1, 6])
+        self.assertEqual(res[0]["score_emotion"], 9.0)
+
+    def test_fallback_emotion_inconnue(self):
+        res = recommander_par_emotion("inconnue", self.films, n=2, index=self.index)
+        self.assertEqual([f["id"] for f in res], [7, 3])
+
+    def test_copies_sans_modifier_le_catalogue(self):
+        res = recommander_par_emotion("triste", self.films, n=3, index=self.index)
+        res[0]["poster_url"] = "x"
+        self.assertNotIn("poster_url", self.films[2])
+
+    def test_sans_index(self):
+        for emotion in ["colere", "heureux", "surprise", "inconnue", "peur"]:
+            for offset in (0, 2):
+                self.assertEqual(
+                    recommander_par_emotion(emotion, self.films, n=3, offset=offset),
+                    recommander_par_emotion(emotion, self.films, n=3, index=self.index, offset=offset),
+                )
+
+    def test_index_construit_une_fois_par_catalogue(self):
+        catalogue = Catalogue.depuis_films(self.films)
+        with patch("recommendation.construire_index_genres", wraps=recommendation.construire_index_genres) as construire:
+            for _ in range(3):
+                recommander_par_emotion("heureux", catalogue, n=2)
+            self.assertEqual(construire.call_count, 1)
+            recommander_par_emotion("heureux", Catalogue.depuis_films(self.films), n=2)
+            self.assertEqual(construire.call_count, 2)
+
+    def test_pagination(self):
+        toutes = recommander_par_emotion("surprise", self.films, n=10, index=self.index)
+        page = recommander_par_emotion("surprise", self.films, n=2, index=self.index, offset=2)
+        self.assertEqual(page, toutes[2:4])
+        self.assertEqual(recommander_par_emotion("peur", self.films, n=5, index=self.index, offset=5), [])
+
+
+class TestSelectionTopK(unittest.TestCase):
+    def test_identique_au_tri_stable(self):
+        rng = np.random.default_rng(0)
+        scores = rng.integers(0, 6, size=200).astype(float)
+        attendu = np.argsort(-scores, kind="stable")
+        for k, offset in [(1, 0), (5, 0), (7, 13), (50, 180), (300, 0)]:
+            self.assertEqual(selectionner_top_k(scores, k, offset).tolist(), attendu[offset:offset + k].tolist())
+
+    def test_cas_limites(self):
+        self.assertEqual(selectionner_top_k(np.array([]), 3).tolist(), [])
+        self.assertEqual(selectionner_top_k(np.array([1.0, 2.0]), 0).tolist(), [])
+
+
+class TestRecommanderSimilaires(unittest.TestCase):
+    def test_genres_communs(self):
+        films = [
+            _film(1, ["Action", "Sci-Fi"], 7.0),
+            _film(2, ["Action"], 9.0),
+            _film(3, ["Action", "Sci-Fi"], 6.0),
+            _film(4, ["Drama"], 9.5),
+            _film(5, ["Sci-Fi", "Action"], 6.0),
+        ]
+        res = recommander_similaires(films[0], films, n=3)
+        self.assertEqual([f["id"] for f in res], [3, 5, 2])
+        self.assertEqual([f["id"] for f in recommander_similaires(films[0], films, n=3, offset=2)], [2])
+
+    def test_resume_et_voisins_precalcules(self):
+        films = [
+            dict(_film(1, ["Drama"], 7.0), overview="A heist crew plans a bank robbery in Paris."),
+            dict(_film(2, ["Drama"], 7.0), overview="A family reunion at the seaside."),
+            dict(_film(3, ["Drama"], 7.0), overview="The robbery of a bank goes wrong for the heist crew."),
+            dict(_film(4, ["Horror"], 7.0), overview="Zombies attack a small village."),
+        ]
+        moteur = MoteurSimilarite.construire(Catalogue.depuis_films(films))
+        res = recommander_similaires(films[0], films, n=2, moteur=moteur)
+        self.assertEqual([f["id"] for f in res], [3, 2])
+
+        voisins, scores = moteur.calculer_voisins(k=3)
+        with tempfile.TemporaryDirectory() as dossier:
+            chemin = Path(dossier) / "voisins.npz"
+            moteur.sauvegarder_voisins(voisins, scores, chemin)
+            self.assertTrue(moteur.charger_voisins(chemin))
+        self.assertEqual(recommander_similaires(films[0], films, n=2, moteur=moteur), res)
+        self.assertEqual(recommander_similaires({"id": 99}, films, moteur=moteur), [])
+
+    def test_voisins_d_un_autre_catalogue_ignores(self):
+        films = [
+            dict(_film(1, ["Drama"], 7.0), overview="A heist crew plans a bank robbery in Paris."),
+            dict(_film(2, ["Drama"], 7.0), overview="A family reunion at the seaside."),
+            dict(_film(3, ["Drama"], 7.0), overview="The robbery of a bank goes wrong for the heist crew."),
+        ]
+        moteur = MoteurSimilarite.construire(Catalogue.depuis_films(films))
+        with tempfile.TemporaryDirectory() as dossier:
+            chemin = Path(dossier) / "voisins.npz"
+            moteur.sauvegarder_voisins(*moteur.calculer_voisins(k=2), chemin)
+            # Catalogue reconstruit : un résumé a changé
+            films[1]["overview"] = "A bank robbery in Paris, planned by a heist crew."
+            reconstruit = MoteurSimilarite.construire(Catalogue.depuis_films(films))
+            self.assertFalse(reconstruit.charger_voisins(chemin))
+            self.assertIsNone(reconstruit.voisins)
+            # Ancien format, sans empreinte
+            np.savez_compressed(chemin, ids=np.array([1]), voisins=np.array([[2]]), scores=np.array([[0.5]]))
+            self.assertFalse(moteur.charger_voisins(chemin))
+        self.assertEqual([f["id"] for f in recommander_similaires(films[0], films, n=1, moteur=reconstruit)], [2])
+
+
+class TestTableEmotions(unittest.TestCase):
+    def setUp(self):
+        self.films = [_film(i, ["Comedy"] if i % 2 else ["Horror"], i % 10) for i in range(1, 40)]
+        self.index = construire_index_genres(self.films)
+        self.table = construire_table_emotions(self.films, index=self.index, profondeur=5)
+
+    def test_resultats_identiques_au_calcul_direct(self):
+        for emotion in ["heureux", "peur", "surprise", "inconnue"]:
+            self.assertEqual(
+                self.table.recommander(emotion, n=5),
+                recommander_par_emotion(emotion, self.films, n=5, index=self.index),
+            )
+
+    def test_au_dela_de_la_profondeur(self):
+        self.assertEqual(len(self.table.recommander("peur", n=12)), 12)
+        self.assertEqual(
+            self.table.recommander("peur", n=3, offset=4),
+            recommander_par_emotion("peur", self.films, n=3, index=self.index, offset=4),
+        )
+
+    def test_pagination_dans_la_table(self):
+        self.assertEqual(self.table.recommander("heureux", n=2, offset=1), self.table.recommander("heureux", n=3)[1:])
+
+    def test_nouvelle_version_a_chaque_construction(self):
+        table = construire_table_emotions(self.films, index=self.index, profondeur=5)
+        self.assertGreater(table.version, self.table.version)
+
+    def test_copies(self):
+        self.table.recommander("peur", n=1)[0]["title"] = "modifié"
+        self.assertNotEqual(self.table.recommander("peur", n=1)[0]["title"], "modifié")
+
+
+if __name__ == '__main__':
+    unittest.main()
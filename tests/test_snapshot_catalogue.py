@@ -0,0 +1,87 @@
+import json
+import math
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "code"))
+
+from catalogue import Catalogue
+from snapshot_catalogue import MANIFESTE, charger_snapshot, ecrire_snapshot
+
+
+class TestSnapshotCatalogue(unittest.TestCase):
+    def setUp(self):
+        self.films = [
+            {"id": 30, "title": "A", "genres": ["Drama", "Comedy"], "vote_average": 7.5,
+             "release_year": 1999, "overview": "Ligne 1\r\nLigne 2", "trailer_url": math.nan,
+             "runtime": 97, "streaming_links": [{"name": "Netflix"}]},
+            {"id": 10, "title": "B", "genres": ["Horror"], "sentiment_score": -0.2,
+             "overview": "", "runtime": 120, "note": "avec\x00séparateur"},
+            {"id": 20, "title": "A", "genres": [], "trailer_url": "https://youtu.be/x"},
+        ]
+        self.catalogue = Catalogue.depuis_films(self.films)
+        self.dossier_temp = tempfile.TemporaryDirectory()
+        self.dossier = Path(self.dossier_temp.name) / "snapshot"
+        self.source = Path(self.dossier_temp.name) / "films.csv"
+        self.source.write_text("id,title\n30,A\n10,B\n20,A\n", encoding="utf-8")
+
+    def tearDown(self):
+        self.dossier_temp.cleanup()
+
+    def _films(self, catalogue):
+        return [
+            {k: ("nan" if isinstance(v, float) and math.isnan(v) else v) for k, v in film.items()}
+            for film in catalogue
+        ]
+
+    def test_aller_retour(self):
+        ecrire_snapshot(self.catalogue, self.dossier, self.source)
+        charge = charger_snapshot(self.dossier, self.source)
+        self.assertIsNotNone(charge)
+        self.assertEqual(self._films(charge), self._films(self.catalogue))
+        self.assertEqual(charge.ligne(10), 1)
+        self.assertEqual(charge.lignes_avec_genres(["Comedy"]).tolist(), [True, False, False])
+        self.assertIsInstance(charge.colonne("vote_average"), np.memmap)
+
+    def test_source_modifiee(self):
+        ecrire_snapshot(self.catalogue, self.dossier, self.source)
+        self.source.write_text("id,title\n30,A\n10,B\n20,C\n", encoding="utf-8")
+        self.assertIsNone(charger_snapshot(self.dossier, self.source))
+
+    def test_source_touchee_mais_identique(self):
+        ecrire_snapshot(self.catalogue, self.dossier, self.source)
+        stat = self.source.stat()
+        os.utime(self.source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertIsNotNone(charger_snapshot(self.dossier, self.source))
+
+    def test_source_absente_ou_inconnue(self):
+        ecrire_snapshot(self.catalogue, self.dossier)
+        # Snapshot construit sans source : on ne peut pas vérifier qu'il correspond au CSV
+        self.assertIsNone(charger_snapshot(self.dossier, self.source))
+        ecrire_snapshot(self.catalogue, self.dossier, self.source)
+        self.source.unlink()
+        self.assertIsNone(charger_snapshot(self.dossier, self.source))
+
+    def test_colonne_d_un_seul_film_sans_chaine(self):
+        catalogue = Catalogue.depuis_films([{"id": 1, "title": "Seul", "genres": [], "trailer_url": math.nan}])
+        ecrire_snapshot(catalogue, self.dossier, self.source)
+        charge = charger_snapshot(self.dossier, self.source)
+        self.assertEqual(self._films(charge), self._films(catalogue))
+        self.assertTrue(math.isnan(charge.objets["trailer_url"][0]))
+
+    def test_version_differente_ou_absent(self):
+        self.assertIsNone(charger_snapshot(self.dossier))
+        ecrire_snapshot(self.catalogue, self.dossier)
+        manifeste = json.loads((self.dossier / MANIFESTE).read_text(encoding="utf-8"))
+        manifeste["version"] = -1
+        (self.dossier / MANIFESTE).write_text(json.dumps(manifeste), encoding="utf-8")
+        self.assertIsNone(charger_snapshot(self.dossier))
+
+
+if __name__ == '__main__':
+    unittest.main()
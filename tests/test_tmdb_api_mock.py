@@ -1,13 +1,26 @@
+import os
+import sys
+import tempfile
+import threading
+import time
 import unittest
 from unittest.mock import patch
-import code.tmdb_api as tmdb
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "code"))
+
+import http_client
+import tmdb_api as tmdb
+from cache_traductions import CacheTraductions
 
 class FakeResponse:
-    def __init__(self, json_data, status_code=200):
+    def __init__(self, json_data, status_code=200, headers=None):
         self._json_data = json_data
         self.status_code = status_code
+        self.headers = headers or {}
     def json(self):
         return self._json_data
+    def close(self):
+        pass
 
 class TestTMDBAPIMock(unittest.TestCase):
     def setUp(self):
@@ -23,11 +36,11 @@ class TestTMDBAPIMock(unittest.TestCase):
             "watch/providers": {"results": {"FR": {"flatrate": [{"provider_name": "Netflix", "logo_path": "/netflix.jpg"}]}}}
         }
 
-    def fake_requests_get(self, url, params=None, headers=None, timeout=5):
+    def fake_requests_get(self, url, acquerir=None, params=None, headers=None, timeout=5):
         # Return our sample data for any TMDB call
         return FakeResponse(self.sample_data, status_code=200)
 
-    @patch('code.tmdb_api.requests.get')
+    @patch('tmdb_api.http_client.get')
     def test_enrichir_film_avec_api_mock(self, mock_get):
         mock_get.side_effect = self.fake_requests_get
         film = {"id": 123}
@@ -43,6 +56,170 @@ class TestTMDBAPIMock(unittest.TestCase):
         self.assertEqual(res.get('revenue'), 500000)
         self.assertIsInstance(res.get('streaming_links'), list)
         self.assertGreater(len(res.get('streaming_links')), 0)
+    @patch('tmdb_api.http_client.get')
+    def test_enrichir_liste_films_concurrente(self, mock_get):
+        actifs, max_actifs = [0], [0]
+        verrou = threading.Lock()
+
+        def lent(url, acquerir=None, params=None, headers=None, timeout=5):
+            with verrou:
+                actifs[0] += 1
+                max_actifs[0] = max(max_actifs[0], actifs[0])
+            time.sleep(0.2)
+            with verrou:
+                actifs[0] -= 1
+            if url.endswith("/3"):
+                raise RuntimeError("échec réseau")
+            return FakeResponse(self.sample_data, status_code=200)
+
+        mock_get.side_effect = lent
+        films = [{"id": i} for i in range(1, 9)]
+        debut = time.monotonic()
+        res = tmdb.enrichir_liste_films(films)
+        duree = time.monotonic() - debut
+
+        self.assertEqual([f["id"] for f in res], list(range(1, 9)))
+        self.assertNotIn("poster_url", res[2])
+        self.assertEqual(res[0].get("runtime"), 100)
+        self.assertLessEqual(max_actifs[0], tmdb.TMDB_CONCURRENCE_MAX)
+        self.assertLess(duree, 8 * 0.2)
+
+
+class TestEnrichissementSansDoublon(unittest.TestCase):
+    def test_appels_concurrents_partages(self):
+        appels = []
+        depart = threading.Barrier(5)
+
+        def enrichir(film):
+            appels.append(film["id"])
+            time.sleep(0.2)
+            return {**film, "poster_url": "p.jpg"}
+
+        resultats = []
+
+        def appeler(titre):
+            depart.wait()
+            resultats.append(tmdb.enrichir_film_sans_doublon({"id": 7, "title": titre}, enrichir))
+
+        threads = [threading.Thread(target=appeler, args=(f"t{i}",)) for i in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(appels, [7])
+        self.assertEqual(len(resultats), 5)
+        self.assertTrue(all(r["poster_url"] == "p.jpg" for r in resultats))
+        # Chaque appelant en attente reçoit sa propre copie
+        self.assertEqual(len({id(r) for r in resultats}), 5)
+        self.assertEqual(tmdb._enrichissements_en_vol, {})
+
+    def test_erreur_transmise_puis_nouvel_appel(self):
+        depart = threading.Event()
+
+        def echouer(film):
+            depart.wait(2)
+            raise RuntimeError("TMDB indisponible")
+
+        erreurs = []
+
+        def attendre():
+            try:
+                tmdb.enrichir_film_sans_doublon({"id": 8})
+            except RuntimeError as e:
+                erreurs.append(str(e))
+
+        premier = threading.Thread(target=lambda: self.assertRaises(
+            RuntimeError, tmdb.enrichir_film_sans_doublon, {"id": 8}, echouer))
+        premier.start()
+        while 8 not in tmdb._enrichissements_en_vol:
+            time.sleep(0.001)
+        second = threading.Thread(target=attendre)
+        second.start()
+        time.sleep(0.05)
+        depart.set()
+        premier.join()
+        second.join()
+        self.assertEqual(erreurs, ["TMDB indisponible"])
+        # Plus rien en cours : l'appel suivant est refait
+        self.assertEqual(tmdb.enrichir_film_sans_doublon({"id": 8}, lambda f: {**f, "ok": True})["ok"], True)
+
+
+class TestLimiteurDebit(unittest.TestCase):
+    def test_rafale_puis_debit(self):
+        limiteur = tmdb.LimiteurDebit(debit=20, capacite=5)
+        debut = time.monotonic()
+        for _ in range(5):
+            limiteur.acquerir()
+        self.assertLess(time.monotonic() - debut, 0.05)
+        for _ in range(4):
+            limiteur.acquerir()
+        self.assertGreaterEqual(time.monotonic() - debut, 4 / 20 - 0.02)
+
+    def test_partage_entre_threads(self):
+        limiteur = tmdb.LimiteurDebit(debit=50, capacite=1)
+        debut = time.monotonic()
+        threads = [threading.Thread(target=limiteur.acquerir) for _ in range(11)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertGreaterEqual(time.monotonic() - debut, 10 / 50 - 0.02)
+
+
+class TestHttpClient(unittest.TestCase):
+    def tearDown(self):
+        http_client.fermer_sessions()
+
+    def test_une_session_par_hote(self):
+        s1 = http_client.session_pour("https://api.themoviedb.org/3/movie/1")
+        s2 = http_client.session_pour("https://API.themoviedb.org/3/movie/2?x=1")
+        s3 = http_client.session_pour("https://api.mymemory.translated.net/get")
+        self.assertIs(s1, s2)
+        self.assertIsNot(s1, s3)
+
+    def test_reprises_et_pool(self):
+        adaptateur = http_client.session_pour("https://api.themoviedb.org/3").get_adapter("https://api.themoviedb.org/3")
+        self.assertEqual(adaptateur._pool_maxsize, http_client.HTTP_CONNEXIONS_PAR_HOTE)
+        self.assertEqual(adaptateur.max_retries.connect, http_client.HTTP_NB_REPRISES)
+        # Les statuts 429 / 5xx sont repris par http_client.get, pas par urllib3 (qui contournerait le limiteur)
+        self.assertEqual(adaptateur.max_retries.status, 0)
+        self.assertFalse(adaptateur.max_retries.status_forcelist)
+
+    def test_reprises_sur_429_passent_par_le_limiteur(self):
+        reponses = [FakeResponse({}, 429, {"Retry-After": "0"}), FakeResponse({}, 503), FakeResponse({"ok": True})]
+        limiteur = tmdb.LimiteurDebit(0)
+        with patch("requests.Session.get", side_effect=reponses) as mock_get, \
+                patch.object(limiteur, "acquerir") as acquerir, patch.object(http_client, "HTTP_FACTEUR_ATTENTE", 0):
+            response = http_client.get("https://api.themoviedb.org/3/movie/1", acquerir=limiteur.acquerir)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_get.call_count, 3)
+        self.assertEqual(acquerir.call_count, 3)
+
+    def test_derniere_reponse_rendue_apres_les_reprises(self):
+        with patch("requests.Session.get", return_value=FakeResponse({}, 503)) as mock_get, \
+                patch.object(http_client, "HTTP_FACTEUR_ATTENTE", 0):
+            response = http_client.get("https://api.themoviedb.org/3/movie/1")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(mock_get.call_count, http_client.HTTP_NB_REPRISES + 1)
+
+    def test_delai_par_defaut(self):
+        with patch("requests.Session.get") as mock_get:
+            http_client.get("https://example.org/x", params={"a": 1})
+        mock_get.assert_called_once_with("https://example.org/x", params={"a": 1}, timeout=http_client.HTTP_DELAI_DEFAUT)
+
+    @patch('tmdb_api.http_client.get')
+    def test_traduction_via_client_partage(self, mock_get):
+        mock_get.return_value = FakeResponse({"responseStatus": 200, "responseData": {"translatedText": "Bonjour le monde"}})
+        with tempfile.TemporaryDirectory() as dossier:
+            cache = CacheTraductions(os.path.join(dossier, "traductions.sqlite3"))
+            with patch.object(tmdb, "cache_traductions", cache):
+                self.assertEqual(tmdb.traduire_texte_avec_google_translate("Hello world"), "Bonjour le monde")
+                self.assertIn("mymemory", mock_get.call_args[0][0])
+                # Deuxième appel servi par le cache
+                self.assertEqual(tmdb.traduire_texte_avec_google_translate("Hello world"), "Bonjour le monde")
+                self.assertEqual(mock_get.call_count, 1)
+            cache.fermer()
+
 
 if __name__ == '__main__':
     unittest.main()